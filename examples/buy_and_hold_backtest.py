@@ -3,7 +3,7 @@ import datetime
 from qstrader import settings
 from qstrader.strategy.base import AbstractStrategy
 from qstrader.event import SignalEvent, EventType
-from qstrader.compat import queue
+from qstrader.event_bus import make_event_bus
 from qstrader.trading_session import TradingSession
 
 
@@ -22,6 +22,8 @@ class BuyAndHoldStrategy(AbstractStrategy):
         self.base_quantity = base_quantity
         self.bars = 0
         self.invested = False
+        self.subscribed_tickers = [ticker]
+        self.subscribed_event_types = [EventType.BAR, EventType.TICK]
 
     def calculate_signals(self, event):
         if (
@@ -31,7 +33,8 @@ class BuyAndHoldStrategy(AbstractStrategy):
             if not self.invested and self.bars == 0:
                 signal = SignalEvent(
                     self.ticker, "BOT",
-                    suggested_quantity=self.base_quantity
+                    suggested_quantity=self.base_quantity,
+                    ticker_id=event.ticker_id
                 )
                 self.events_queue.put(signal)
                 self.invested = True
@@ -46,7 +49,7 @@ def run(config, testing, tickers, filename):
     end_date = datetime.datetime(2014, 1, 1)
 
     # Use the Buy and Hold Strategy
-    events_queue = queue.Queue()
+    events_queue = make_event_bus()
     strategy = BuyAndHoldStrategy(tickers[0], events_queue)
 
     # Set up the backtest
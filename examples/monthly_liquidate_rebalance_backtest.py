@@ -5,7 +5,7 @@ from qstrader import settings
 from qstrader.strategy.base import AbstractStrategy
 from qstrader.position_sizer.rebalance import LiquidateRebalancePositionSizer
 from qstrader.event import SignalEvent, EventType
-from qstrader.compat import queue
+from qstrader.event_bus import make_event_bus
 from qstrader.trading_session import TradingSession
 
 
@@ -71,7 +71,7 @@ def run(config, testing, tickers, filename):
     end_date = datetime.datetime(2016, 10, 12)
 
     # Use the Monthly Liquidate And Rebalance strategy
-    events_queue = queue.Queue()
+    events_queue = make_event_bus()
     strategy = MonthlyLiquidateRebalanceStrategy(
         tickers, events_queue
     )
@@ -1,12 +1,10 @@
-from collections import deque
 import datetime
 
-import numpy as np
-
 from qstrader import settings
+from qstrader.indicators import SMA
 from qstrader.strategy.base import AbstractStrategy
 from qstrader.event import SignalEvent, EventType
-from qstrader.compat import queue
+from qstrader.event_bus import make_event_bus
 from qstrader.trading_session import TradingSession
 
 
@@ -32,31 +30,30 @@ class MovingAverageCrossStrategy(AbstractStrategy):
         self.base_quantity = base_quantity
         self.bars = 0
         self.invested = False
-        self.sw_bars = deque(maxlen=self.short_window)
-        self.lw_bars = deque(maxlen=self.long_window)
+        self.short_sma = SMA(self.short_window)
+        self.long_sma = SMA(self.long_window)
+        self.subscribed_tickers = [ticker]
+        self.subscribed_event_types = [EventType.BAR]
 
     def calculate_signals(self, event):
         if (
             event.type == EventType.BAR and
             event.ticker == self.ticker
         ):
-            # Add latest adjusted closing price to the
-            # short and long window bars
-            self.lw_bars.append(event.adj_close_price)
-            if self.bars > self.long_window - self.short_window:
-                self.sw_bars.append(event.adj_close_price)
+            # Update the short and long simple moving averages
+            # with the latest adjusted closing price
+            short_sma = self.short_sma.update(self.ticker, event.adj_close_price)
+            long_sma = self.long_sma.update(self.ticker, event.adj_close_price)
 
             # Enough bars are present for trading
             if self.bars > self.long_window:
-                # Calculate the simple moving averages
-                short_sma = np.mean(self.sw_bars)
-                long_sma = np.mean(self.lw_bars)
                 # Trading signals based on moving average cross
                 if short_sma > long_sma and not self.invested:
                     print("LONG %s: %s" % (self.ticker, event.time))
                     signal = SignalEvent(
                         self.ticker, "BOT",
-                        suggested_quantity=self.base_quantity
+                        suggested_quantity=self.base_quantity,
+                        ticker_id=event.ticker_id
                     )
                     self.events_queue.put(signal)
                     self.invested = True
@@ -64,7 +61,8 @@ class MovingAverageCrossStrategy(AbstractStrategy):
                     print("SHORT %s: %s" % (self.ticker, event.time))
                     signal = SignalEvent(
                         self.ticker, "SLD",
-                        suggested_quantity=self.base_quantity
+                        suggested_quantity=self.base_quantity,
+                        ticker_id=event.ticker_id
                     )
                     self.events_queue.put(signal)
                     self.invested = False
@@ -79,7 +77,7 @@ def run(config, testing, tickers, filename):
     end_date = datetime.datetime(2014, 1, 1)
 
     # Use the MAC Strategy
-    events_queue = queue.Queue()
+    events_queue = make_event_bus()
     strategy = MovingAverageCrossStrategy(
         tickers[0], events_queue,
         short_window=100,
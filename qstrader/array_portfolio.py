@@ -0,0 +1,422 @@
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
+import numpy as np
+
+from .arrays import grow
+from .position import Position
+from .symbols import SymbolTable
+
+
+POSITION_COLUMNS = [
+    "quantity", "init_price", "init_commission",
+    "realised_pnl", "unrealised_pnl",
+    "buys", "sells", "avg_bot", "avg_sld",
+    "total_bot", "total_sld", "total_commission",
+    "avg_price", "cost_basis", "net", "net_total",
+    "net_incl_comm", "market_value"
+]
+
+
+def _sign(value):
+    return (value > 0) - (value < 0)
+
+
+class ArrayPosition(object):
+    """
+    A view of the row of a position of an ArrayPortfolio, giving
+    the attributes of a Position (quantity, net, market_value...)
+    read from its columns on access, rather than a copy of them.
+    """
+    __slots__ = ("portfolio", "slot")
+
+    def __init__(self, portfolio, slot):
+        self.portfolio = portfolio
+        self.slot = slot
+
+    @property
+    def action(self):
+        return "BOT" if self.portfolio.is_long[self.slot] else "SLD"
+
+    @property
+    def ticker(self):
+        return self.portfolio.tickers[self.slot]
+
+    def __getattr__(self, name):
+        try:
+            column = self.portfolio.columns[name]
+        except KeyError:
+            raise AttributeError(name)
+        return int(column[self.slot])
+
+    def to_position(self):
+        """
+        Returns a Position object holding the current values
+        of the row.
+        """
+        return self.portfolio._get_position(self.slot)
+
+
+class ArrayPositions(Mapping):
+    """
+    Read-only mapping of the tickers of the open positions of
+    an ArrayPortfolio to ArrayPosition views of their rows, so
+    that position sizers can keep using portfolio.positions.
+    """
+    def __init__(self, portfolio):
+        self.portfolio = portfolio
+
+    def __getitem__(self, ticker):
+        slot = self.portfolio._get_open_slot(ticker)
+        if slot is None:
+            raise KeyError(ticker)
+        return ArrayPosition(self.portfolio, slot)
+
+    def __contains__(self, ticker):
+        return self.portfolio._get_open_slot(ticker) is not None
+
+    def __iter__(self):
+        tickers = self.portfolio.tickers
+        for slot in np.flatnonzero(self.portfolio.is_open):
+            yield tickers[slot]
+
+    def __len__(self):
+        return int(self.portfolio.is_open.sum())
+
+
+class ArrayPortfolio(object):
+    """
+    ArrayPortfolio is a drop-in alternative to Portfolio for
+    portfolios holding a large number of positions.
+
+    Rather than a dict of Position objects, it stores every
+    attribute of a Position as a numpy int64 column indexed by
+    ticker id, a ticker keeping the same id (row) for the whole
+    session. All of the open positions are then revalued in a
+    single vectorised step by _update_portfolio, from the array
+    of the latest prices kept by the price handler.
+
+    Transactions are applied to the row of the ticker with the
+    same integer arithmetic as Position, so that the PnL is the
+    same as that of Portfolio. The positions attribute maps the
+    open tickers to ArrayPosition views of their rows and closed
+    positions are kept as Position objects, as expected by the
+    position sizers and the statistics.
+    """
+    def __init__(self, price_handler, cash, capacity=64, symbols=None):
+        """
+        On creation, the ArrayPortfolio contains no positions
+        and all values are "reset" to the initial cash, with no
+        PnL - realised or unrealised. Columns are allocated for
+        capacity tickers and doubled in size whenever needed.
+
+        The rows of the tickers are their ids in symbols, which
+        can be the SymbolTable of the price handler so that rows
+        match the ticker ids of the events.
+        """
+        self.price_handler = price_handler
+        self.init_cash = cash
+        self.equity = cash
+        self.cur_cash = cash
+        self.closed_positions = []
+        self.realised_pnl = 0
+        self.unrealised_pnl = 0
+
+        if symbols is None:
+            symbols = SymbolTable()
+        self.symbols = symbols
+        self.ticker_ids = symbols.ids
+        self.tickers = symbols.symbols
+        self.is_open = np.zeros(capacity, dtype=bool)
+        self.is_long = np.zeros(capacity, dtype=bool)
+        # The ids of the tickers of the rows in the price handler
+        self.price_ids = np.zeros(capacity, dtype=np.int64)
+        self.columns = dict(
+            (name, np.zeros(capacity, dtype=np.int64))
+            for name in POSITION_COLUMNS
+        )
+        self.positions = ArrayPositions(self)
+
+    def _get_ticker_id(self, ticker):
+        """
+        Returns the row of a ticker, interning it in the symbols
+        (and growing the columns) on first use.
+        """
+        slot = self.symbols.intern(ticker)
+        if slot >= len(self.is_open):
+            capacity = max(len(self.is_open), 1)
+            while capacity <= slot:
+                capacity *= 2
+            self._grow(capacity)
+        return slot
+
+    def _get_open_slot(self, ticker):
+        """
+        Returns the row of the open position in ticker, or None
+        if there is no such position.
+        """
+        slot = self.ticker_ids.get(ticker)
+        if slot is None or slot >= len(self.is_open) or not self.is_open[slot]:
+            return None
+        return slot
+
+    def _grow(self, capacity):
+        self.is_open = grow(self.is_open, capacity)
+        self.is_long = grow(self.is_long, capacity)
+        self.price_ids = grow(self.price_ids, capacity)
+        for name in POSITION_COLUMNS:
+            self.columns[name] = grow(self.columns[name], capacity)
+
+    def _get_position(self, slot):
+        """
+        Returns a Position object holding the values of a row.
+        """
+        pt = Position.__new__(Position)
+        pt.action = "BOT" if self.is_long[slot] else "SLD"
+        pt.ticker = self.tickers[slot]
+        for name in POSITION_COLUMNS:
+            setattr(pt, name, int(self.columns[name][slot]))
+        return pt
+
+    def _get_bid_ask(self, ticker):
+        """
+        Returns the latest bid and ask of a ticker, both being
+        the last close when the price handler streams bars.
+        """
+        if self.price_handler.istick():
+            return self.price_handler.get_best_bid_ask(ticker)
+        close_price = self.price_handler.get_last_close(ticker)
+        return close_price, close_price
+
+    def _position_value(self, slot):
+        """
+        Returns the contribution of an open position to the
+        equity of the portfolio.
+        """
+        columns = self.columns
+        return int(
+            columns["market_value"][slot] - columns["cost_basis"][slot] +
+            columns["realised_pnl"][slot]
+        )
+
+    def _update_portfolio(self):
+        """
+        Revalues all of the open positions at once from the
+        latest bid and ask of their tickers.
+        """
+        slots = np.flatnonzero(self.is_open)
+        prices = self.price_handler.get_latest_prices(self.price_ids[slots])
+        midpoint = (prices[:, 0] + prices[:, 1]) // 2
+
+        columns = self.columns
+        market_value = (
+            columns["quantity"][slots] * midpoint *
+            np.sign(columns["net"][slots])
+        )
+        unrealised_pnl = market_value - columns["cost_basis"][slots]
+        columns["market_value"][slots] = market_value
+        columns["unrealised_pnl"][slots] = unrealised_pnl
+
+        self.unrealised_pnl = int(unrealised_pnl.sum())
+        self.equity = self.init_cash + self.realised_pnl + int(
+            (unrealised_pnl + columns["realised_pnl"][slots]).sum()
+        )
+
+    def _revalue_row(self, slot, ticker):
+        """
+        Revalues the row of a position at the latest bid and ask
+        of its ticker, as Position.update_market_value does.
+        """
+        columns = self.columns
+        bid, ask = self._get_bid_ask(ticker)
+        market_value = (
+            int(columns["quantity"][slot]) * ((bid + ask) // 2) *
+            _sign(int(columns["net"][slot]))
+        )
+        columns["market_value"][slot] = market_value
+        columns["unrealised_pnl"][slot] = (
+            market_value - columns["cost_basis"][slot]
+        )
+
+    def _update_position_value(self, ticker):
+        """
+        Revalues the open position in ticker, if any, adjusting
+        the equity and unrealised PnL of the portfolio by the
+        change in its value.
+        """
+        slot = self._get_open_slot(ticker)
+        if slot is None:
+            return
+        unrealised_pnl = int(self.columns["unrealised_pnl"][slot])
+        value = self._position_value(slot)
+        self._revalue_row(slot, ticker)
+        self.unrealised_pnl += (
+            int(self.columns["unrealised_pnl"][slot]) - unrealised_pnl
+        )
+        self.equity += self._position_value(slot) - value
+
+    def _open_row(self, slot, action, quantity, price, commission):
+        """
+        Sets the row of a new position, as the Position
+        constructor does before valuing it.
+        """
+        buys = sells = avg_bot = avg_sld = total_bot = total_sld = 0
+        if action == "BOT":
+            buys = quantity
+            avg_bot = price
+            total_bot = buys * avg_bot
+            avg_price = (price * quantity + commission) // quantity
+            cost_basis = quantity * avg_price
+        else:
+            sells = quantity
+            avg_sld = price
+            total_sld = sells * avg_sld
+            avg_price = (price * quantity - commission) // quantity
+            cost_basis = -quantity * avg_price
+        net_total = total_sld - total_bot
+        values = {
+            "quantity": quantity, "init_price": price,
+            "init_commission": commission,
+            "realised_pnl": 0, "unrealised_pnl": 0,
+            "buys": buys, "sells": sells,
+            "avg_bot": avg_bot, "avg_sld": avg_sld,
+            "total_bot": total_bot, "total_sld": total_sld,
+            "total_commission": commission,
+            "avg_price": avg_price, "cost_basis": cost_basis,
+            "net": buys - sells, "net_total": net_total,
+            "net_incl_comm": net_total - commission,
+            "market_value": 0
+        }
+        columns = self.columns
+        for name in POSITION_COLUMNS:
+            columns[name][slot] = values[name]
+        self.is_long[slot] = action == "BOT"
+
+    def _transact_row(self, slot, action, quantity, price, commission):
+        """
+        Applies a transaction to the row of a position, with the
+        arithmetic of Position.transact_shares. The unrealised
+        PnL is left to the revaluation which follows.
+        """
+        columns = self.columns
+        is_long = self.is_long[slot]
+        buys = int(columns["buys"][slot])
+        sells = int(columns["sells"][slot])
+        avg_price = int(columns["avg_price"][slot])
+        realised_pnl = int(columns["realised_pnl"][slot])
+        total_bot = int(columns["total_bot"][slot])
+        total_sld = int(columns["total_sld"][slot])
+        total_commission = int(columns["total_commission"][slot]) + commission
+
+        if action == "BOT":
+            avg_bot = (
+                int(columns["avg_bot"][slot]) * buys + price * quantity
+            ) // (buys + quantity)
+            if is_long:
+                avg_price = (
+                    avg_price * buys + price * quantity + commission
+                ) // (buys + quantity)
+            else:
+                realised_pnl += quantity * (avg_price - price) - commission
+            buys += quantity
+            total_bot = buys * avg_bot
+            columns["avg_bot"][slot] = avg_bot
+        else:
+            avg_sld = (
+                int(columns["avg_sld"][slot]) * sells + price * quantity
+            ) // (sells + quantity)
+            if not is_long:
+                avg_price = (
+                    avg_price * sells + price * quantity - commission
+                ) // (sells + quantity)
+            else:
+                realised_pnl += quantity * (price - avg_price) - commission
+            sells += quantity
+            total_sld = sells * avg_sld
+            columns["avg_sld"][slot] = avg_sld
+
+        net = buys - sells
+        net_total = total_sld - total_bot
+        columns["buys"][slot] = buys
+        columns["sells"][slot] = sells
+        columns["total_bot"][slot] = total_bot
+        columns["total_sld"][slot] = total_sld
+        columns["total_commission"][slot] = total_commission
+        columns["avg_price"][slot] = avg_price
+        columns["realised_pnl"][slot] = realised_pnl
+        columns["net"][slot] = net
+        columns["quantity"][slot] = net
+        columns["net_total"][slot] = net_total
+        columns["net_incl_comm"][slot] = net_total - total_commission
+        columns["cost_basis"][slot] = net * avg_price
+        return net
+
+    def _add_position(
+        self, action, ticker,
+        quantity, price, commission
+    ):
+        """
+        Opens a new position in the row of ticker and adds
+        its value to the portfolio values.
+        """
+        slot = self._get_ticker_id(ticker)
+        self.price_ids[slot] = self.price_handler.get_ticker_id(ticker)
+        self._open_row(slot, action, quantity, price, commission)
+        self._revalue_row(slot, ticker)
+        self.is_open[slot] = True
+        self.unrealised_pnl += int(self.columns["unrealised_pnl"][slot])
+        self.equity += self._position_value(slot)
+
+    def _modify_position(
+        self, action, ticker,
+        quantity, price, commission
+    ):
+        """
+        Applies a transaction to the open position of ticker,
+        adjusting the portfolio values by the change in its
+        value, and closes it if its quantity drops to zero.
+        """
+        slot = self.ticker_ids[ticker]
+        columns = self.columns
+        unrealised_pnl = int(columns["unrealised_pnl"][slot])
+        value = self._position_value(slot)
+
+        net = self._transact_row(slot, action, quantity, price, commission)
+        self._revalue_row(slot, ticker)
+
+        self.unrealised_pnl += (
+            int(columns["unrealised_pnl"][slot]) - unrealised_pnl
+        )
+        self.equity += self._position_value(slot) - value
+
+        if net == 0:
+            self.is_open[slot] = False
+            self.realised_pnl += int(columns["realised_pnl"][slot])
+            self.unrealised_pnl -= int(columns["unrealised_pnl"][slot])
+            self.closed_positions.append(self._get_position(slot))
+
+    def transact_position(
+        self, action, ticker,
+        quantity, price, commission
+    ):
+        """
+        Handles any new position or modification to a current
+        position, as Portfolio.transact_position does.
+        """
+        if action == "BOT":
+            self.cur_cash -= ((quantity * price) + commission)
+        elif action == "SLD":
+            self.cur_cash += ((quantity * price) - commission)
+
+        if self._get_open_slot(ticker) is None:
+            self._add_position(
+                action, ticker, quantity,
+                price, commission
+            )
+        else:
+            self._modify_position(
+                action, ticker, quantity,
+                price, commission
+            )
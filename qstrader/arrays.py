@@ -0,0 +1,24 @@
+import numpy as np
+
+
+def grow(column, capacity, fill_value=0):
+    """
+    Returns a copy of a numpy array grown along its first axis
+    to capacity rows, the new rows being set to fill_value.
+
+    The preallocated columns of the portfolio, statistics,
+    indicators and price handlers are grown with it, usually
+    doubling their number of rows, so that appending to them
+    takes an amortised O(1) time.
+
+    Parameters:
+    column - The array to grow.
+    capacity - The number of rows of the grown array, at least
+        that of column.
+    fill_value - The value of the new rows.
+    """
+    new_column = np.full(
+        (capacity,) + column.shape[1:], fill_value, dtype=column.dtype
+    )
+    new_column[:len(column)] = column
+    return new_column
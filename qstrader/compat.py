@@ -14,3 +14,8 @@ try:
     import cPickle as pickle
 except ImportError:
     import pickle
+
+try:
+    from sys import intern
+except ImportError:  # Python 2
+    intern = intern
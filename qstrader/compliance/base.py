@@ -25,3 +25,10 @@ class AbstractCompliance(object):
         trade that has just been executed.
         """
         raise NotImplementedError("Should implement record_trade()")
+
+    def close(self):
+        """
+        Called once the trading session is over, so that any
+        trades which are still buffered can be written out.
+        """
+        pass
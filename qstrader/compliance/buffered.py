@@ -0,0 +1,138 @@
+import csv
+import os
+import threading
+from timeit import default_timer
+
+from ..compat import queue
+from .example import ExampleCompliance
+
+
+class BufferedCompliance(ExampleCompliance):
+    """
+    A compliance module which writes the same CSV trade log as
+    ExampleCompliance, but keeps the file open and buffers the
+    rows of the trades, rather than opening and closing the file
+    for every FillEvent.
+
+    The buffered rows are written out once buffer_size trades
+    have been recorded, once flush_interval seconds have passed
+    since the last write, and when the session closes the
+    compliance module.
+
+    With background=True (e.g. for live sessions), the rows are
+    handed over to a writer thread, so that record_trade never
+    blocks on the disk.
+
+    The trade log is only opened, and the writer thread only
+    started, once the first trade is recorded, so that a session
+    which is never run does not hold on to them.
+    """
+
+    def __init__(
+        self, config, buffer_size=1000,
+        flush_interval=1.0, background=False
+    ):
+        """
+        Parameters:
+        config - The configuration, giving the OUTPUT_DIR.
+        buffer_size - The number of rows to buffer before
+            they are written out.
+        flush_interval - The maximum number of seconds that a
+            row stays in the buffer, as checked when a trade is
+            recorded (or continuously in the background).
+        background - Whether to write from a writer thread.
+        """
+        super(BufferedCompliance, self).__init__(config)
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.background = background
+        self.rows = []
+        self.last_flush = default_timer()
+        self.csvfile = None
+        self.writer = None
+        self.rows_queue = None
+        self.writer_thread = None
+        self.closed = False
+
+    def _open(self):
+        """
+        Opens the CSV trade log for appending, and starts the
+        writer thread if the rows are written in the background.
+        """
+        fname = os.path.expanduser(
+            os.path.join(self.config.OUTPUT_DIR, self.csv_filename)
+        )
+        self.csvfile = open(fname, 'a')
+        self.writer = csv.writer(self.csvfile)
+        if self.background:
+            self.rows_queue = queue.Queue()
+            self.writer_thread = threading.Thread(target=self._write_rows)
+            self.writer_thread.daemon = True
+            self.writer_thread.start()
+
+    def _is_flush_due(self):
+        return (
+            len(self.rows) >= self.buffer_size or
+            default_timer() - self.last_flush >= self.flush_interval
+        )
+
+    def flush(self):
+        """
+        Writes the buffered rows out to the CSV trade log.
+        """
+        if self.rows:
+            self.writer.writerows(self.rows)
+            self.rows = []
+        if self.csvfile is not None:
+            self.csvfile.flush()
+        self.last_flush = default_timer()
+
+    def _write_rows(self):
+        """
+        Buffers the rows received by the writer thread and writes
+        them out, until the None sentinel is received.
+        """
+        while True:
+            try:
+                row = self.rows_queue.get(True, self.flush_interval)
+            except queue.Empty:
+                self.flush()
+                continue
+            if row is None:
+                self.flush()
+                return
+            self.rows.append(row)
+            if self._is_flush_due():
+                self.flush()
+
+    def record_trade(self, fill):
+        """
+        Buffers all details about the FillEvent for the CSV
+        trade log.
+        """
+        row = self.trade_row(fill)
+        if self.csvfile is None:
+            self._open()
+        if self.background:
+            self.rows_queue.put(row)
+        else:
+            self.rows.append(row)
+            if self._is_flush_due():
+                self.flush()
+
+    def close(self):
+        """
+        Writes out any buffered rows and closes the CSV trade log.
+        Closing the module more than once has no effect.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self.csvfile is None:
+            return
+        if self.background:
+            self.rows_queue.put(None)
+            self.writer_thread.join()
+        else:
+            self.flush()
+        self.csvfile.close()
@@ -12,6 +12,13 @@ class ExampleCompliance(AbstractCompliance):
     CSV file in the output directory.
     """
 
+    fieldnames = [
+        "timestamp", "ticker",
+        "action", "quantity",
+        "exchange", "price",
+        "commission"
+    ]
+
     def __init__(self, config):
         """
         Wipe the existing trade log for the day, leaving only
@@ -33,17 +40,22 @@ class ExampleCompliance(AbstractCompliance):
             print("No tradelog files to clean.")
 
         # Write new file header
-        fieldnames = [
-            "timestamp", "ticker",
-            "action", "quantity",
-            "exchange", "price",
-            "commission"
-        ]
         fname = os.path.expanduser(os.path.join(self.config.OUTPUT_DIR, self.csv_filename))
         with open(fname, 'a') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.DictWriter(csvfile, fieldnames=self.fieldnames)
             writer.writeheader()
 
+    def trade_row(self, fill):
+        """
+        Returns the row of the CSV trade log of a FillEvent.
+        """
+        return [
+            fill.timestamp, fill.ticker,
+            fill.action, fill.quantity,
+            fill.exchange, PriceParser.display(fill.price, 4),
+            PriceParser.display(fill.commission, 4)
+        ]
+
     def record_trade(self, fill):
         """
         Append all details about the FillEvent to the CSV trade log.
@@ -51,9 +63,4 @@ class ExampleCompliance(AbstractCompliance):
         fname = os.path.expanduser(os.path.join(self.config.OUTPUT_DIR, self.csv_filename))
         with open(fname, 'a') as csvfile:
             writer = csv.writer(csvfile)
-            writer.writerow([
-                fill.timestamp, fill.ticker,
-                fill.action, fill.quantity,
-                fill.exchange, PriceParser.display(fill.price, 4),
-                PriceParser.display(fill.commission, 4)
-            ])
+            writer.writerow(self.trade_row(fill))
@@ -2,8 +2,28 @@ from __future__ import print_function
 
 from enum import Enum
 
+import pandas as pd
 
-EventType = Enum("EventType", "TICK BAR SIGNAL ORDER FILL SENTIMENT")
+from .price_parser import int_t
+
+
+EventType = Enum("EventType", "TICK BAR SIGNAL ORDER FILL SENTIMENT BAR_BATCH")
+
+READABLE_PERIODS = {
+    1: "1sec",
+    5: "5sec",
+    10: "10sec",
+    15: "15sec",
+    30: "30sec",
+    60: "1min",
+    300: "5min",
+    600: "10min",
+    900: "15min",
+    1800: "30min",
+    3600: "1hr",
+    86400: "1day",
+    604800: "1wk"
+}
 
 
 class Event(object):
@@ -11,30 +31,82 @@ class Event(object):
     Event is base class providing an interface for all subsequent
     (inherited) events, that will trigger further events in the
     trading infrastructure.
+
+    Events declare __slots__, and their type as a class attribute,
+    so that the millions of price events of a backtest do not each
+    allocate an instance __dict__.
     """
+    __slots__ = ()
+
     @property
     def typename(self):
         return self.type.name
 
 
-class TickEvent(Event):
+class PriceEvent(Event):
+    """
+    PriceEvent is the base class of the tick and bar events. Their
+    time can be given either as a timestamp (pandas Timestamp or
+    datetime) or as int64 nanoseconds since the epoch, as read from
+    the price arrays. Each representation is only computed from the
+    other when first accessed, through the time and nanos attributes.
+    """
+    __slots__ = ("_nanos", "_time")
+
+    @property
+    def time(self):
+        """
+        The timestamp of the event, as a pandas Timestamp when
+        it was given as nanoseconds.
+        """
+        if self._time is None:
+            self._time = pd.Timestamp(self._nanos)
+        return self._time
+
+    @time.setter
+    def time(self, time):
+        if isinstance(time, int_t):
+            self._nanos = time
+            self._time = None
+        else:
+            self._nanos = None
+            self._time = time
+
+    @property
+    def nanos(self):
+        """
+        The timestamp of the event as int64 nanoseconds
+        since the epoch.
+        """
+        if self._nanos is None:
+            self._nanos = pd.Timestamp(self._time).value
+        return self._nanos
+
+
+class TickEvent(PriceEvent):
     """
     Handles the event of receiving a new market update tick,
     which is defined as a ticker symbol and associated best
     bid and ask from the top of the order book.
     """
-    def __init__(self, ticker, time, bid, ask):
+    __slots__ = ("ticker", "ticker_id", "bid", "ask")
+
+    type = EventType.TICK
+
+    def __init__(self, ticker, time, bid, ask, ticker_id=None):
         """
         Initialises the TickEvent.
 
         Parameters:
         ticker - The ticker symbol, e.g. 'GOOG'.
-        time - The timestamp of the tick
+        time - The timestamp of the tick, or its int64 nanoseconds
         bid - The best bid price at the time of the tick.
         ask - The best ask price at the time of the tick.
+        ticker_id - The integer id of the ticker in the SymbolTable
+            of the price handler, if known.
         """
-        self.type = EventType.TICK
         self.ticker = ticker
+        self.ticker_id = ticker_id
         self.time = time
         self.bid = bid
         self.ask = ask
@@ -49,23 +121,32 @@ class TickEvent(Event):
         return str(self)
 
 
-class BarEvent(Event):
+class BarEvent(PriceEvent):
     """
     Handles the event of receiving a new market
     open-high-low-close-volume bar, as would be generated
     via common data providers such as Yahoo Finance.
     """
+    __slots__ = (
+        "ticker", "ticker_id", "period",
+        "open_price", "high_price", "low_price",
+        "close_price", "volume", "adj_close_price"
+    )
+
+    type = EventType.BAR
+
     def __init__(
         self, ticker, time, period,
         open_price, high_price, low_price,
-        close_price, volume, adj_close_price=None
+        close_price, volume, adj_close_price=None,
+        ticker_id=None
     ):
         """
         Initialises the BarEvent.
 
         Parameters:
         ticker - The ticker symbol, e.g. 'GOOG'.
-        time - The timestamp of the bar
+        time - The timestamp of the bar, or its int64 nanoseconds
         period - The time period covered by the bar in seconds
         open_price - The unadjusted opening price of the bar
         high_price - The unadjusted high price of the bar
@@ -74,13 +155,15 @@ class BarEvent(Event):
         volume - The volume of trading within the bar
         adj_close_price - The vendor adjusted closing price
             (e.g. back-adjustment) of the bar
+        ticker_id - The integer id of the ticker in the SymbolTable
+            of the price handler, if known.
 
         Note: It is not advised to use 'open', 'close' instead
         of 'open_price', 'close_price' as 'open' is a reserved
         word in Python.
         """
-        self.type = EventType.BAR
         self.ticker = ticker
+        self.ticker_id = ticker_id
         self.time = time
         self.period = period
         self.open_price = open_price
@@ -89,7 +172,14 @@ class BarEvent(Event):
         self.close_price = close_price
         self.volume = volume
         self.adj_close_price = adj_close_price
-        self.period_readable = self._readable_period()
+
+    @property
+    def period_readable(self):
+        """
+        The human-readable period of the bar, only worked out
+        when it is needed, e.g. when the bar is displayed.
+        """
+        return self._readable_period()
 
     def _readable_period(self):
         """
@@ -106,23 +196,8 @@ class BarEvent(Event):
         readable period is simply passed through from period,
         in seconds.
         """
-        lut = {
-            1: "1sec",
-            5: "5sec",
-            10: "10sec",
-            15: "15sec",
-            30: "30sec",
-            60: "1min",
-            300: "5min",
-            600: "10min",
-            900: "15min",
-            1800: "30min",
-            3600: "1hr",
-            86400: "1day",
-            604800: "1wk"
-        }
-        if self.period in lut:
-            return lut[self.period]
+        if self.period in READABLE_PERIODS:
+            return READABLE_PERIODS[self.period]
         else:
             return "%ssec" % str(self.period)
 
@@ -142,12 +217,98 @@ class BarEvent(Event):
         return str(self)
 
 
+class BarBatchEvent(Event):
+    """
+    Handles the event of receiving the cross-section of the
+    open-high-low-close-volume bars of every ticker that
+    printed at a given timestamp, as numpy arrays.
+    """
+    __slots__ = (
+        "time", "period", "tickers", "ticker_ids",
+        "open_prices", "high_prices", "low_prices",
+        "close_prices", "volumes", "adj_close_prices"
+    )
+
+    type = EventType.BAR_BATCH
+
+    def __init__(
+        self, time, period, tickers, ticker_ids,
+        open_prices, high_prices, low_prices,
+        close_prices, volumes, adj_close_prices
+    ):
+        """
+        Initialises the BarBatchEvent.
+
+        Parameters:
+        time - The timestamp of the bars
+        period - The time period covered by the bars in seconds
+        tickers - The list of ticker symbols of the SymbolTable of
+            the price handler, indexed by ticker id.
+        ticker_ids - Integer array of the ids of the tickers
+            of the bars.
+        open_prices - Integer array of the unadjusted opening prices
+        high_prices - Integer array of the unadjusted high prices
+        low_prices - Integer array of the unadjusted low prices
+        close_prices - Integer array of the unadjusted close prices
+        volumes - Integer array of the volumes of trading
+        adj_close_prices - Integer array of the vendor adjusted
+            closing prices
+        """
+        self.time = time
+        self.period = period
+        self.tickers = tickers
+        self.ticker_ids = ticker_ids
+        self.open_prices = open_prices
+        self.high_prices = high_prices
+        self.low_prices = low_prices
+        self.close_prices = close_prices
+        self.volumes = volumes
+        self.adj_close_prices = adj_close_prices
+
+    def __len__(self):
+        return len(self.ticker_ids)
+
+    def bar_events(self):
+        """
+        Yields a BarEvent for each of the bars of the batch.
+        """
+        tickers = self.tickers
+        columns = zip(
+            self.ticker_ids.tolist(), self.open_prices.tolist(),
+            self.high_prices.tolist(), self.low_prices.tolist(),
+            self.close_prices.tolist(), self.volumes.tolist(),
+            self.adj_close_prices.tolist()
+        )
+        for ticker_id, open_price, high_price, low_price, close_price, volume, adj_close_price in columns:
+            yield BarEvent(
+                tickers[ticker_id], self.time, self.period,
+                open_price, high_price, low_price,
+                close_price, volume, adj_close_price,
+                ticker_id=ticker_id
+            )
+
+    def __str__(self):
+        return "Type: %s, Time: %s, Period: %s, Bars: %d" % (
+            str(self.type), str(self.time),
+            str(self.period), len(self)
+        )
+
+    def __repr__(self):
+        return str(self)
+
+
 class SignalEvent(Event):
     """
     Handles the event of sending a Signal from a Strategy object.
     This is received by a Portfolio object and acted upon.
     """
-    def __init__(self, ticker, action, suggested_quantity=None):
+    __slots__ = ("ticker", "ticker_id", "action", "suggested_quantity")
+
+    type = EventType.SIGNAL
+
+    def __init__(
+        self, ticker, action, suggested_quantity=None, ticker_id=None
+    ):
         """
         Initialises the SignalEvent.
 
@@ -158,9 +319,11 @@ class SignalEvent(Event):
             representing a suggested absolute quantity of units
             of an asset to transact in, which is used by the
             PositionSizer and RiskManager.
+        ticker_id - The integer id of the ticker in the SymbolTable
+            of the price handler, if known.
         """
-        self.type = EventType.SIGNAL
         self.ticker = ticker
+        self.ticker_id = ticker_id
         self.action = action
         self.suggested_quantity = suggested_quantity
 
@@ -171,7 +334,11 @@ class OrderEvent(Event):
     The order contains a ticker (e.g. GOOG), action (BOT or SLD)
     and quantity.
     """
-    def __init__(self, ticker, action, quantity):
+    __slots__ = ("ticker", "ticker_id", "action", "quantity")
+
+    type = EventType.ORDER
+
+    def __init__(self, ticker, action, quantity, ticker_id=None):
         """
         Initialises the OrderEvent.
 
@@ -179,9 +346,11 @@ class OrderEvent(Event):
         ticker - The ticker symbol, e.g. 'GOOG'.
         action - 'BOT' (for long) or 'SLD' (for short).
         quantity - The quantity of shares to transact.
+        ticker_id - The integer id of the ticker in the SymbolTable
+            of the price handler, if known.
         """
-        self.type = EventType.ORDER
         self.ticker = ticker
+        self.ticker_id = ticker_id
         self.action = action
         self.quantity = quantity
 
@@ -207,12 +376,18 @@ class FillEvent(Event):
     different prices. This will be simulated by averaging
     the cost.
     """
+    __slots__ = (
+        "timestamp", "ticker", "ticker_id", "action", "quantity",
+        "exchange", "price", "commission"
+    )
+
+    type = EventType.FILL
 
     def __init__(
         self, timestamp, ticker,
         action, quantity,
         exchange, price,
-        commission
+        commission, ticker_id=None
     ):
         """
         Initialises the FillEvent object.
@@ -224,10 +399,12 @@ class FillEvent(Event):
         exchange - The exchange where the order was filled.
         price - The price at which the trade was filled
         commission - The brokerage commission for carrying out the trade.
+        ticker_id - The integer id of the ticker in the SymbolTable
+            of the price handler, if known.
         """
-        self.type = EventType.FILL
         self.timestamp = timestamp
         self.ticker = ticker
+        self.ticker_id = ticker_id
         self.action = action
         self.quantity = quantity
         self.exchange = exchange
@@ -241,7 +418,11 @@ class SentimentEvent(Event):
     with a ticker. Can be used for a generic "date-ticker-sentiment"
     service, often provided by many data vendors.
     """
-    def __init__(self, timestamp, ticker, sentiment):
+    __slots__ = ("timestamp", "ticker", "ticker_id", "sentiment")
+
+    type = EventType.SENTIMENT
+
+    def __init__(self, timestamp, ticker, sentiment, ticker_id=None):
         """
         Initialises the SentimentEvent.
 
@@ -250,8 +431,10 @@ class SentimentEvent(Event):
         ticker - The ticker symbol, e.g. 'GOOG'.
         sentiment - A string, float or integer value of "sentiment",
             e.g. "bullish", -1, 5.4, etc.
+        ticker_id - The integer id of the ticker in the SymbolTable
+            of the price handler, if known.
         """
-        self.type = EventType.SENTIMENT
         self.timestamp = timestamp
         self.ticker = ticker
+        self.ticker_id = ticker_id
         self.sentiment = sentiment
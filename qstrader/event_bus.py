@@ -0,0 +1,64 @@
+from collections import deque
+
+from .compat import queue
+
+
+class DequeEventBus(object):
+    """
+    DequeEventBus is an unsynchronised FIFO event queue for
+    backtests, which run the whole event loop on a single thread.
+
+    It exposes the same put/get/empty interface as queue.Queue,
+    used by the strategies, PortfolioHandler and execution
+    handlers, but without taking a lock and notifying a
+    condition variable on every call.
+
+    As no other thread can ever put an event onto it, get never
+    blocks: it raises queue.Empty as soon as the bus is empty,
+    whatever the value of block. It must not be used for live
+    sessions, where price events arrive from other threads.
+    """
+    def __init__(self):
+        self._events = deque()
+
+    def put(self, event, block=True, timeout=None):
+        """
+        Appends an event to the end of the bus.
+        """
+        self._events.append(event)
+
+    def get(self, block=True, timeout=None):
+        """
+        Removes and returns the oldest event on the bus, raising
+        queue.Empty if there is none.
+        """
+        try:
+            return self._events.popleft()
+        except IndexError:
+            raise queue.Empty
+
+    def put_nowait(self, event):
+        self.put(event)
+
+    def get_nowait(self):
+        return self.get(False)
+
+    def empty(self):
+        return not self._events
+
+    def qsize(self):
+        return len(self._events)
+
+
+def make_event_bus(session_type="backtest"):
+    """
+    Returns the events queue suited to a session type:
+    an unsynchronised DequeEventBus for a "backtest" and a
+    thread-safe queue.Queue for a "live" session.
+    """
+    if session_type == "backtest":
+        return DequeEventBus()
+    elif session_type == "live":
+        return queue.Queue()
+    else:
+        raise NotImplementedError("session_type must be 'backtest' or 'live'")
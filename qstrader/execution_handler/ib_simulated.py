@@ -75,7 +75,7 @@ class IBSimulatedExecutionHandler(AbstractExecutionHandler):
                 timestamp, ticker,
                 action, quantity,
                 exchange, fill_price,
-                commission
+                commission, ticker_id=event.ticker_id
             )
             self.events_queue.put(fill_event)
 
@@ -0,0 +1,327 @@
+from collections import deque
+
+import numpy as np
+
+from .arrays import grow
+
+
+class RollingIndicator(object):
+    """
+    RollingIndicator is the base class of the incremental
+    indicators, which are updated in O(1) per new value rather
+    than being recomputed over their whole window.
+
+    An indicator keeps its state for any number of tickers in
+    numpy arrays indexed by ticker id (row), a ticker keeping the
+    same row for the whole session. Updates are vectorised over
+    rows, so that update_many updates the indicator of every
+    ticker of a cross-section (e.g. a BarBatchEvent) at once.
+
+    The current value of a ticker is NaN until window values have
+    been received, as with pandas rolling windows.
+    """
+    def __init__(self, window, capacity=64):
+        """
+        Parameters:
+        window - The number of values of the rolling window.
+        capacity - The initial number of tickers for which the
+            state is allocated, doubled in size whenever needed.
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.ticker_ids = {}
+        self.tickers = []
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.values = np.full(capacity, np.nan)
+
+    def _grow(self, capacity):
+        """
+        Grows all of the state arrays (and ring buffers) of
+        the indicator, along their first axis, to capacity rows.
+        """
+        for name, column in list(self.__dict__.items()):
+            if isinstance(column, np.ndarray):
+                fill_value = np.nan if name == "values" else 0
+                setattr(self, name, grow(column, capacity, fill_value))
+
+    def _get_row(self, ticker):
+        """
+        Returns the row of a ticker, assigning it the next
+        free row (and growing the state) on first use.
+        """
+        row = self.ticker_ids.get(ticker)
+        if row is None:
+            row = len(self.tickers)
+            if row == len(self.counts):
+                self._grow(2 * row)
+            self.ticker_ids[ticker] = row
+            self.tickers.append(ticker)
+        return row
+
+    def update(self, ticker, *values):
+        """
+        Adds the latest value(s) of a ticker to the indicator
+        and returns its current value.
+        """
+        row = self._get_row(ticker)
+        self._update(
+            np.array([row]),
+            *[np.array([value], dtype=np.float64) for value in values]
+        )
+        return self.values[row]
+
+    def update_many(self, tickers, *values):
+        """
+        Adds the latest value(s) of several distinct tickers, as
+        arrays in the order of tickers, and returns the array of
+        their current values.
+        """
+        rows = np.array([self._get_row(ticker) for ticker in tickers])
+        self._update(
+            rows, *[np.asarray(value, dtype=np.float64) for value in values]
+        )
+        return self.values[rows]
+
+    def _update(self, rows, *values):
+        raise NotImplementedError("Should implement _update()")
+
+    def __getitem__(self, ticker):
+        return self.values[self.ticker_ids[ticker]]
+
+    def __contains__(self, ticker):
+        return ticker in self.ticker_ids
+
+    def is_ready(self, ticker):
+        """
+        Returns True once window values of ticker have been
+        received.
+        """
+        row = self.ticker_ids.get(ticker)
+        return row is not None and bool(self.counts[row] >= self.window)
+
+
+class WindowIndicator(RollingIndicator):
+    """
+    Base class of the indicators which keep the last window
+    values of each ticker in a ring buffer (one row per ticker),
+    to remove them from their running state.
+    """
+    def __init__(self, window, capacity=64):
+        super(WindowIndicator, self).__init__(window, capacity)
+        self.buffer = np.zeros((capacity, window))
+
+    def _push(self, rows, x):
+        """
+        Stores x in the ring buffers of rows and returns the
+        values that they replace (zero if not yet full), their
+        counts before the update and whether their buffers were
+        already full.
+        """
+        counts = self.counts[rows]
+        positions = counts % self.window
+        old = self.buffer[rows, positions]
+        self.buffer[rows, positions] = x
+        self.counts[rows] = counts + 1
+        return old, counts, counts >= self.window
+
+    def _wrapped(self, rows):
+        """
+        Returns the rows whose ring buffer has just wrapped
+        around, whose running state is then recomputed from the
+        buffer, so that rounding errors cannot accumulate (an
+        amortised O(1) cost per update).
+        """
+        return rows[self.counts[rows] % self.window == 0]
+
+
+class SMA(WindowIndicator):
+    """
+    Simple moving average over the last window values, from
+    a running sum.
+    """
+    def __init__(self, window, capacity=64):
+        super(SMA, self).__init__(window, capacity)
+        self.sums = np.zeros(capacity)
+
+    def _update(self, rows, x):
+        old, counts, is_full = self._push(rows, x)
+        self.sums[rows] += x - old
+        wrapped = self._wrapped(rows)
+        self.sums[wrapped] = self.buffer[wrapped].sum(axis=1)
+        self.values[rows] = np.where(
+            self.counts[rows] >= self.window,
+            self.sums[rows] / self.window, np.nan
+        )
+
+
+class EMA(RollingIndicator):
+    """
+    Exponential moving average with a smoothing factor of
+    2 / (window + 1), seeded with the first value, as pandas'
+    ewm(span=window, adjust=False, min_periods=window).
+    """
+    def __init__(self, window, capacity=64):
+        super(EMA, self).__init__(window, capacity)
+        self.alpha = 2.0 / (window + 1)
+        self.emas = np.zeros(capacity)
+
+    def _update(self, rows, x):
+        emas = self.emas[rows]
+        emas = np.where(
+            self.counts[rows] == 0, x, emas + self.alpha * (x - emas)
+        )
+        self.emas[rows] = emas
+        self.counts[rows] += 1
+        self.values[rows] = np.where(
+            self.counts[rows] >= self.window, emas, np.nan
+        )
+
+
+class RollingVariance(WindowIndicator):
+    """
+    Variance over the last window values, kept with Welford's
+    algorithm until the window is full and then with its sliding
+    window variant. ddof is the delta degrees of freedom, as for
+    pandas (1 by default).
+    """
+    def __init__(self, window, ddof=1, capacity=64):
+        super(RollingVariance, self).__init__(window, capacity)
+        self.ddof = ddof
+        self.means = np.zeros(capacity)
+        self.m2s = np.zeros(capacity)
+
+    def _update_moments(self, rows, x):
+        old, counts, is_full = self._push(rows, x)
+        means = self.means[rows]
+        m2s = self.m2s[rows]
+
+        # Adds x to the windows which are not full yet...
+        n = np.minimum(counts + 1, self.window)
+        new_means = means + np.where(is_full, x - old, x - means) / n
+        # ... and replaces the oldest value of those which are
+        m2s = m2s + np.where(
+            is_full,
+            (x - old) * (x - new_means + old - means),
+            (x - means) * (x - new_means)
+        )
+        self.means[rows] = new_means
+        self.m2s[rows] = m2s
+
+        wrapped = self._wrapped(rows)
+        if len(wrapped) > 0:
+            buffers = self.buffer[wrapped]
+            self.means[wrapped] = buffers.mean(axis=1)
+            self.m2s[wrapped] = (
+                (buffers - self.means[wrapped][:, None]) ** 2
+            ).sum(axis=1)
+
+    def _variances(self, rows):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(
+                self.counts[rows] >= self.window,
+                np.maximum(self.m2s[rows], 0.0) / (self.window - self.ddof),
+                np.nan
+            )
+
+    def _update(self, rows, x):
+        self._update_moments(rows, x)
+        self.values[rows] = self._variances(rows)
+
+
+class RollingStd(RollingVariance):
+    """
+    Standard deviation over the last window values.
+    """
+    def _update(self, rows, x):
+        self._update_moments(rows, x)
+        self.values[rows] = np.sqrt(self._variances(rows))
+
+
+class ZScore(RollingVariance):
+    """
+    Number of standard deviations between the latest value and
+    the mean of the last window values (including it).
+    """
+    def _update(self, rows, x):
+        self._update_moments(rows, x)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.values[rows] = (
+                (x - self.means[rows]) / np.sqrt(self._variances(rows))
+            )
+
+
+class RollingMax(RollingIndicator):
+    """
+    Maximum of the last window values, from a monotonic deque
+    of (index, value) per ticker, for an amortised O(1) cost
+    per update.
+    """
+    def __init__(self, window, capacity=64):
+        super(RollingMax, self).__init__(window, capacity)
+        self.deques = []
+
+    def _is_dominated(self, old, x):
+        return old <= x
+
+    def _update(self, rows, x):
+        window = self.window
+        for row, value in zip(rows.tolist(), x.tolist()):
+            if row == len(self.deques):
+                self.deques.append(deque())
+            values = self.deques[row]
+            count = int(self.counts[row])
+            while values and self._is_dominated(values[-1][1], value):
+                values.pop()
+            values.append((count, value))
+            if values[0][0] <= count - window:
+                values.popleft()
+            self.counts[row] = count + 1
+            if count + 1 >= window:
+                self.values[row] = values[0][1]
+
+
+class RollingMin(RollingMax):
+    """
+    Minimum of the last window values, from a monotonic deque
+    of (index, value) per ticker.
+    """
+    def _is_dominated(self, old, x):
+        return old >= x
+
+
+class ATR(RollingIndicator):
+    """
+    Average True Range, with Wilder's smoothing: the mean of the
+    first window true ranges, then atr += (tr - atr) / window.
+
+    It is updated with the high, low and close prices of a bar,
+    e.g. atr.update(ticker, high, low, close).
+    """
+    def __init__(self, window, capacity=64):
+        super(ATR, self).__init__(window, capacity)
+        self.prev_closes = np.zeros(capacity)
+        self.atrs = np.zeros(capacity)
+
+    def _update(self, rows, high, low, close):
+        counts = self.counts[rows]
+        prev_closes = self.prev_closes[rows]
+        true_ranges = np.where(
+            counts == 0, high - low,
+            np.maximum(
+                high - low,
+                np.maximum(
+                    np.abs(high - prev_closes), np.abs(low - prev_closes)
+                )
+            )
+        )
+        atrs = self.atrs[rows]
+        # Running mean of the true ranges until the window is full
+        n = np.minimum(counts + 1, self.window)
+        atrs = atrs + (true_ranges - atrs) / n
+        self.atrs[rows] = atrs
+        self.prev_closes[rows] = close
+        self.counts[rows] = counts + 1
+        self.values[rows] = np.where(
+            counts + 1 >= self.window, atrs, np.nan
+        )
@@ -7,7 +7,7 @@ class SuggestedOrder(object):
     that a suggested order is never transacted unless it has been
     scrutinised by the position sizing and risk management layers.
     """
-    def __init__(self, ticker, action, quantity=0):
+    def __init__(self, ticker, action, quantity=0, ticker_id=None):
         """
         Initialises the SuggestedOrder. The quantity defaults
         to zero as the PortfolioHandler creates these objects
@@ -22,7 +22,10 @@ class SuggestedOrder(object):
         action - 'BOT' (for long) or 'SLD' (for short)
             or 'EXIT' (for liquidation).
         quantity - The quantity of shares to transact.
+        ticker_id - The integer id of the ticker in the SymbolTable
+            of the price handler, if known.
         """
         self.ticker = ticker
+        self.ticker_id = ticker_id
         self.action = action
         self.quantity = quantity
@@ -19,6 +19,17 @@ class Portfolio(object):
         self.positions = {}
         self.closed_positions = []
         self.realised_pnl = 0
+        self.unrealised_pnl = 0
+
+    def _get_bid_ask(self, ticker):
+        """
+        Returns the latest bid and ask of a ticker, both being
+        the last close when the price handler streams bars.
+        """
+        if self.price_handler.istick():
+            return self.price_handler.get_best_bid_ask(ticker)
+        close_price = self.price_handler.get_last_close(ticker)
+        return close_price, close_price
 
     def _update_portfolio(self):
         """
@@ -31,16 +42,44 @@ class Portfolio(object):
 
         for ticker in self.positions:
             pt = self.positions[ticker]
-            if self.price_handler.istick():
-                bid, ask = self.price_handler.get_best_bid_ask(ticker)
-            else:
-                close_price = self.price_handler.get_last_close(ticker)
-                bid = close_price
-                ask = close_price
+            bid, ask = self._get_bid_ask(ticker)
             pt.update_market_value(bid, ask)
             self.unrealised_pnl += pt.unrealised_pnl
-            self.equity += (
-                pt.market_value - pt.cost_basis + pt.realised_pnl
+            self.equity += self._position_value(pt)
+
+    def _position_value(self, pt):
+        """
+        Returns the contribution of an open position to the
+        equity of the portfolio.
+        """
+        return pt.market_value - pt.cost_basis + pt.realised_pnl
+
+    def _revalue_position(self, pt, unrealised_pnl, value):
+        """
+        Revalues a position at the latest bid and ask of its
+        ticker and adds the change in its unrealised PnL and in
+        its value, from the given previous ones, to the running
+        totals of the portfolio.
+        """
+        bid, ask = self._get_bid_ask(pt.ticker)
+        pt.update_market_value(bid, ask)
+        self.unrealised_pnl += pt.unrealised_pnl - unrealised_pnl
+        self.equity += self._position_value(pt) - value
+
+    def _update_position_value(self, ticker):
+        """
+        Revalues the open position in ticker, if any, adjusting
+        the equity and unrealised PnL of the portfolio by the
+        change in its value rather than revaluing every position.
+
+        As the prices of the other tickers have not moved since
+        their positions were last valued, the result is the same
+        as that of _update_portfolio.
+        """
+        if ticker in self.positions:
+            pt = self.positions[ticker]
+            self._revalue_position(
+                pt, pt.unrealised_pnl, self._position_value(pt)
             )
 
     def _add_position(
@@ -53,22 +92,18 @@ class Portfolio(object):
         price handler in order to calculate a reasonable
         "market value".
 
-        Once the Position is added, the Portfolio values
-        are updated.
+        Once the Position is added, its value is added
+        to the Portfolio values.
         """
         if ticker not in self.positions:
-            if self.price_handler.istick():
-                bid, ask = self.price_handler.get_best_bid_ask(ticker)
-            else:
-                close_price = self.price_handler.get_last_close(ticker)
-                bid = close_price
-                ask = close_price
+            bid, ask = self._get_bid_ask(ticker)
             position = Position(
                 action, ticker, quantity,
                 price, commission, bid, ask
             )
             self.positions[ticker] = position
-            self._update_portfolio()
+            self.unrealised_pnl += position.unrealised_pnl
+            self.equity += self._position_value(position)
         else:
             print(
                 "Ticker %s is already in the positions list. "
@@ -86,26 +121,23 @@ class Portfolio(object):
         "market value".
 
         Once the Position is modified, the Portfolio values
-        are updated.
+        are adjusted by the change in its value.
         """
         if ticker in self.positions:
-            self.positions[ticker].transact_shares(
-                action, quantity, price, commission
-            )
-            if self.price_handler.istick():
-                bid, ask = self.price_handler.get_best_bid_ask(ticker)
-            else:
-                close_price = self.price_handler.get_last_close(ticker)
-                bid = close_price
-                ask = close_price
-            self.positions[ticker].update_market_value(bid, ask)
-
-            if self.positions[ticker].quantity == 0:
+            pt = self.positions[ticker]
+            unrealised_pnl = pt.unrealised_pnl
+            value = self._position_value(pt)
+            pt.transact_shares(action, quantity, price, commission)
+            self._revalue_position(pt, unrealised_pnl, value)
+
+            if pt.quantity == 0:
+                # The value of a closed position is its realised
+                # PnL, so moving it to the closed positions
+                # leaves the equity unchanged
                 closed = self.positions.pop(ticker)
                 self.realised_pnl += closed.realised_pnl
+                self.unrealised_pnl -= closed.unrealised_pnl
                 self.closed_positions.append(closed)
-
-            self._update_portfolio()
         else:
             print(
                 "Ticker %s not in the current position list. "
@@ -1,3 +1,4 @@
 # flake8: noqa
 
 from .generic import GenericPriceHandler
+from .replay import ReplayPriceHandler
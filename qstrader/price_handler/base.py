@@ -2,6 +2,15 @@ from __future__ import print_function
 
 from abc import ABCMeta
 
+import numpy as np
+import pandas as pd
+
+from ..arrays import grow
+from ..event import BarBatchEvent
+from ..price_parser import PriceParser
+from ..symbols import SymbolTable
+from .history import BAR_FIELDS, TICK_FIELDS, PriceHistory
+
 
 class AbstractPriceHandler(object):
     """
@@ -19,6 +28,159 @@ class AbstractPriceHandler(object):
 
     __metaclass__ = ABCMeta
 
+    # The PriceHistory of the last bars or ticks of each ticker,
+    # only kept once keep_history has been called
+    history = None
+
+    _symbols = None
+
+    # A callable given the time of each price event before the event
+    # is stored, e.g. so that a TradingSession which coalesces its
+    # updates values the portfolio with the prices of the previous
+    # timestamp only
+    before_store = None
+
+    # Whether the price events are pushed onto the events queue
+    # from another thread (e.g. that of a live feed) without being
+    # stored, the session storing each of them with
+    # store_pushed_event once it is dequeued, so that the prices
+    # are only ever changed from the session thread
+    pushes_events = False
+
+    # The latest bid and ask of each ticker, in PriceParser units,
+    # in an int64 array with a row per ticker id, and whether the
+    # row has been stored yet, see get_latest_prices
+    _latest_prices = None
+    _latest_stored = None
+
+    @property
+    def symbols(self):
+        """
+        The SymbolTable of the price handler, giving the integer
+        ids of the tickers, in the order of their subscription,
+        which are carried by the price events.
+        """
+        if self._symbols is None:
+            self._symbols = SymbolTable()
+        return self._symbols
+
+    def store_pushed_event(self, event):
+        """
+        Stores a price event which was pushed onto the events
+        queue, once the session has taken it off the queue.
+        """
+        self._store_event(event)
+
+    def get_ticker_id(self, ticker):
+        """
+        Returns the integer id of a ticker symbol, assigning
+        it the next free id on first use.
+        """
+        return self.symbols.intern(ticker)
+
+    def keep_history(self, capacity):
+        """
+        Keeps the last capacity bars (or ticks) of each ticker
+        in numpy ring buffers, which can then be retrieved with
+        get_history and get_latest_matrix.
+        """
+        fields = TICK_FIELDS if self.istick() else BAR_FIELDS
+        self.history = PriceHistory(capacity, fields, symbols=self.symbols)
+
+    def get_history(self, ticker, field, n=None):
+        """
+        Returns a read-only view of the last n values (all of the
+        kept values by default) of a field of a ticker, oldest
+        first, e.g. get_history("SPY", "adj_close", 20).
+
+        Prices are in PriceParser units and timestamps are
+        datetime64[ns] values.
+        """
+        if self.history is None:
+            raise ValueError(
+                "No price history is kept by the %s, "
+                "see keep_history" % self.__class__.__name__
+            )
+        return self.history.get_history(ticker, field, n)
+
+    def get_latest_matrix(self, tickers, field, n=1):
+        """
+        Returns a float64 matrix of the last n values of a field
+        of each of the tickers, one row per ticker, NaN where
+        fewer than n values are available.
+        """
+        if self.history is None:
+            raise ValueError(
+                "No price history is kept by the %s, "
+                "see keep_history" % self.__class__.__name__
+            )
+        return self.history.get_latest_matrix(tickers, field, n)
+
+    def _grow_latest_prices(self, ticker_id):
+        """
+        Allocates rows for every ticker id up to ticker_id, at
+        least doubling the number of rows.
+        """
+        capacity = max(len(self.symbols), ticker_id + 1)
+        if self._latest_prices is None:
+            self._latest_prices = np.zeros((capacity, 2), dtype=np.int64)
+            self._latest_stored = np.zeros(capacity, dtype=bool)
+        else:
+            capacity = max(capacity, 2 * len(self._latest_prices))
+            self._latest_prices = grow(self._latest_prices, capacity)
+            self._latest_stored = grow(self._latest_stored, capacity)
+
+    def _store_latest_prices(self, ticker_ids, bids, asks):
+        """
+        Stores the latest bid and ask of one ticker id, or of an
+        array of ticker ids, the close standing for both of them
+        with bars.
+        """
+        if isinstance(ticker_ids, np.ndarray):
+            max_id = ticker_ids.max() if len(ticker_ids) else -1
+        else:
+            max_id = ticker_ids
+        if self._latest_prices is None or max_id >= len(self._latest_prices):
+            self._grow_latest_prices(int(max_id))
+        self._latest_prices[ticker_ids, 0] = bids
+        self._latest_prices[ticker_ids, 1] = asks
+        self._latest_stored[ticker_ids] = True
+
+    def get_latest_prices(self, ticker_ids):
+        """
+        Returns an int64 array of the latest bid and ask of each
+        of the ticker ids, one row per id, the close standing for
+        both of them with bars.
+
+        The prices are read from an array kept up to date as the
+        price events are stored, only falling back on the prices
+        of the subscription for the tickers without any event yet.
+        """
+        ticker_ids = np.asarray(ticker_ids, dtype=np.int64)
+        prices = np.empty((len(ticker_ids), 2), dtype=np.int64)
+        stored = np.zeros(len(ticker_ids), dtype=bool)
+        if self._latest_prices is not None:
+            known = ticker_ids < len(self._latest_prices)
+            stored[known] = self._latest_stored[ticker_ids[known]]
+            prices[stored] = self._latest_prices[ticker_ids[stored]]
+        for i in np.flatnonzero(~stored).tolist():
+            prices[i] = self._get_bid_ask(
+                self.symbols.get_symbol(int(ticker_ids[i]))
+            )
+        return prices
+
+    def _read_price_csv(self, ticker_path):
+        """
+        Reads a ticker price CSV into a pandas DataFrame with the
+        read_price_csv method of the handler, going through the
+        persistent price cache when one has been configured.
+        """
+        if self.price_cache is None:
+            return self.read_price_csv(ticker_path)
+        return self.price_cache.read_csv(
+            ticker_path, self.__class__.__name__, self.read_price_csv
+        )
+
     def unsubscribe_ticker(self, ticker):
         """
         Unsubscribes the price handler from a current ticker symbol.
@@ -58,10 +220,24 @@ class AbstractTickPriceHandler(AbstractPriceHandler):
         """
         Store price event for bid/ask
         """
+        if self.before_store is not None:
+            self.before_store(event.time)
         ticker = event.ticker
+        ticker_id = event.ticker_id
+        if ticker_id is None:
+            ticker_id = self.get_ticker_id(ticker)
         self.tickers[ticker]["bid"] = event.bid
         self.tickers[ticker]["ask"] = event.ask
         self.tickers[ticker]["timestamp"] = event.time
+        self._store_latest_prices(ticker_id, event.bid, event.ask)
+        if self.history is not None:
+            self.history.append(
+                ticker_id, timestamp=event.nanos,
+                bid=event.bid, ask=event.ask
+            )
+
+    def _get_bid_ask(self, ticker):
+        return self.get_best_bid_ask(ticker)
 
     def get_best_bid_ask(self, ticker):
         """
@@ -90,10 +266,90 @@ class AbstractBarPriceHandler(AbstractPriceHandler):
         """
         Store price event for closing price and adjusted closing price
         """
+        if self.before_store is not None:
+            self.before_store(event.time)
         ticker = event.ticker
+        ticker_id = event.ticker_id
+        if ticker_id is None:
+            ticker_id = self.get_ticker_id(ticker)
         self.tickers[ticker]["close"] = event.close_price
         self.tickers[ticker]["adj_close"] = event.adj_close_price
         self.tickers[ticker]["timestamp"] = event.time
+        close_price = event.close_price
+        self._store_latest_prices(ticker_id, close_price, close_price)
+        if self.history is not None:
+            self.history.append(
+                ticker_id, timestamp=event.nanos,
+                open=event.open_price, high=event.high_price,
+                low=event.low_price, close=event.close_price,
+                adj_close=event.adj_close_price, volume=event.volume
+            )
+
+    def _get_bid_ask(self, ticker):
+        close_price = self.get_last_close(ticker)
+        return close_price, close_price
+
+    def _store_batch_event(self, event):
+        """
+        Store the closing prices and adjusted closing prices
+        of every bar of a BarBatchEvent
+        """
+        if self.before_store is not None:
+            self.before_store(event.time)
+        tickers = event.tickers
+        close_prices = event.close_prices.tolist()
+        adj_close_prices = event.adj_close_prices.tolist()
+        for i, ticker_id in enumerate(event.ticker_ids.tolist()):
+            ticker_prices = self.tickers[tickers[ticker_id]]
+            ticker_prices["close"] = close_prices[i]
+            ticker_prices["adj_close"] = adj_close_prices[i]
+            ticker_prices["timestamp"] = event.time
+        self._store_latest_prices(
+            event.ticker_ids, event.close_prices, event.close_prices
+        )
+        if self.history is not None:
+            self.history.append_many(
+                event.ticker_ids,
+                timestamp=np.datetime64(event.time, "ns"),
+                open=event.open_prices, high=event.high_prices,
+                low=event.low_prices, close=event.close_prices,
+                adj_close=event.adj_close_prices, volume=event.volumes
+            )
+
+    def _bar_batch_stream(self, df, period, adj_close_column="Adj Close"):
+        """
+        Parses a time ordered DataFrame of the bars of all of the
+        tickers once into integer numpy column arrays and yields a
+        BarBatchEvent for each distinct timestamp, holding slices
+        of the arrays for the rows of that timestamp.
+
+        Ticker ids are those of the symbols of the price handler.
+        """
+        tickers = self.symbols.symbols
+        ticker_ids = pd.Categorical(
+            df["Ticker"], categories=list(tickers)
+        ).codes.astype(np.int64)
+        timestamps = df.index
+        nanos = timestamps.values.astype("datetime64[ns]").view(np.int64)
+        open_prices = PriceParser.parse_array(df["Open"].values)
+        high_prices = PriceParser.parse_array(df["High"].values)
+        low_prices = PriceParser.parse_array(df["Low"].values)
+        close_prices = PriceParser.parse_array(df["Close"].values)
+        adj_close_prices = PriceParser.parse_array(df[adj_close_column].values)
+        volumes = df["Volume"].values.astype(np.int64)
+        bounds = np.flatnonzero(np.diff(nanos)) + 1
+        starts = [0] + bounds.tolist()
+        ends = bounds.tolist() + [len(df)]
+        for start, end in zip(starts, ends):
+            if start == end:
+                continue
+            yield BarBatchEvent(
+                timestamps[start], period, tickers,
+                ticker_ids[start:end], open_prices[start:end],
+                high_prices[start:end], low_prices[start:end],
+                close_prices[start:end], volumes[start:end],
+                adj_close_prices[start:end]
+            )
 
     def get_last_close(self, ticker):
         """
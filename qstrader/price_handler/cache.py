@@ -0,0 +1,155 @@
+from __future__ import print_function
+
+from zipfile import BadZipfile
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+try:
+    replace_file = os.replace
+except AttributeError:  # Python 2
+    replace_file = os.rename
+
+
+class PriceCsvCache(object):
+    """
+    PriceCsvCache keeps a persistent binary copy of parsed price
+    CSV files, so that repeated sessions over the same data do not
+    have to re-run pd.read_csv and its date parsing.
+
+    Each CSV file is stored as an uncompressed .npz archive holding
+    one .npy array per column plus the datetime index. Entries are
+    keyed by the absolute CSV path and the name of the reader that
+    parsed it, while the size and modification time of the CSV are
+    stored with the arrays. A cached copy is discarded, and the CSV
+    parsed again, as soon as either of them changes.
+    """
+    def __init__(self, cache_dir):
+        """
+        Takes the directory used to store the cached files,
+        creating it if necessary.
+        """
+        self.cache_dir = os.path.expanduser(cache_dir)
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def cache_path(self, csv_path, reader_key):
+        """
+        Returns the path of the cached copy of csv_path
+        as parsed by the reader named reader_key.
+        """
+        csv_path = os.path.abspath(os.path.expanduser(csv_path))
+        digest = hashlib.sha1(
+            ("%s|%s" % (csv_path, reader_key)).encode("utf-8")
+        ).hexdigest()[:16]
+        name = os.path.splitext(os.path.basename(csv_path))[0]
+        return os.path.join(self.cache_dir, "%s-%s.npz" % (name, digest))
+
+    def read_csv(self, csv_path, reader_key, read_func):
+        """
+        Returns the DataFrame of csv_path, read from the cache when
+        a valid copy exists. Otherwise read_func(csv_path) is called
+        and its result is stored for the next session.
+        """
+        stat = os.stat(csv_path)
+        cache_path = self.cache_path(csv_path, reader_key)
+        df = self._load(cache_path, stat)
+        if df is None:
+            df = read_func(csv_path)
+            self._store(cache_path, stat, df)
+        return df
+
+    def _load(self, cache_path, stat):
+        """
+        Loads a cached DataFrame, returning None if it is missing,
+        unreadable or stale with respect to the CSV file stat.
+        """
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with np.load(cache_path) as npz:
+                meta = json.loads(str(npz["meta"][()]))
+                if (
+                    meta["source_size"] != stat.st_size or
+                    meta["source_mtime"] != stat.st_mtime
+                ):
+                    return None
+                index = pd.DatetimeIndex(
+                    npz["index"], name=meta["index_name"]
+                )
+                data = dict(
+                    (name, npz["column_%d" % i])
+                    for i, name in enumerate(meta["columns"])
+                )
+        except (IOError, OSError, ValueError, KeyError, BadZipfile):
+            return None
+        return pd.DataFrame(data, index=index, columns=meta["columns"])
+
+    def _store(self, cache_path, stat, df):
+        """
+        Writes the column arrays of df to cache_path. The file is
+        written under a temporary name first and then moved into
+        place, so that concurrent sessions never see a partial file.
+
+        Only DataFrames with a datetime index are cached.
+        """
+        index = np.asarray(df.index.values)
+        if index.dtype.kind != "M":
+            return
+        arrays = {"index": index}
+        for i, name in enumerate(df.columns):
+            values = np.asarray(df[name].values)
+            if values.dtype.kind == "O":
+                values = values.astype(str)
+            arrays["column_%d" % i] = values
+        arrays["meta"] = np.array(json.dumps({
+            "source_size": stat.st_size,
+            "source_mtime": stat.st_mtime,
+            "columns": [str(name) for name in df.columns],
+            "index_name": df.index.name
+        }))
+        fd, tmp_path = tempfile.mkstemp(
+            suffix=".npz", dir=self.cache_dir
+        )
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                np.savez(tmp_file, **arrays)
+            replace_file(tmp_path, cache_path)
+        except (IOError, OSError):
+            print("Could not write price cache file %s." % cache_path)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class MemoryPriceCache(object):
+    """
+    MemoryPriceCache keeps the parsed price DataFrames in memory,
+    so that the successive sessions run by one process (e.g. the
+    workers of a parameter sweep) only read each CSV file once.
+
+    It can be layered over a PriceCsvCache, which is then used
+    for the first read of every file. A copy of the DataFrame is
+    returned each time, as price handlers add columns to it.
+    """
+    def __init__(self, price_cache=None):
+        self.price_cache = price_cache
+        self.frames = {}
+
+    def read_csv(self, csv_path, reader_key, read_func):
+        """
+        Returns the DataFrame of csv_path, reading it with
+        read_func (or the underlying cache) on the first call.
+        """
+        key = (os.path.abspath(os.path.expanduser(csv_path)), reader_key)
+        if key not in self.frames:
+            if self.price_cache is None:
+                self.frames[key] = read_func(csv_path)
+            else:
+                self.frames[key] = self.price_cache.read_csv(
+                    csv_path, reader_key, read_func
+                )
+        return self.frames[key].copy()
@@ -11,6 +11,7 @@ class AbstractGenericHandler(AbstractPriceHandler):
         self.tickers = {}
         for ticker in self.tickers_lst:
             self.tickers[ticker] = {}
+            self.symbols.intern(ticker)
 
     def stream_next(self):
         """
@@ -23,6 +24,8 @@ class AbstractGenericHandler(AbstractPriceHandler):
             return
         except (EmptyTickEvent, EmptyBarEvent):
             return
+        if price_event.ticker_id is None:
+            price_event.ticker_id = self.symbols.intern(price_event.ticker)
         self._store_event(price_event)
         self.events_queue.put(price_event)
 
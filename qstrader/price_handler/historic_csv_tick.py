@@ -2,9 +2,12 @@ from __future__ import print_function
 
 import os
 
+import numpy as np
 import pandas as pd
 
 from .base import AbstractTickPriceHandler
+from .cache import PriceCsvCache
+from .merge import heap_merge, sort_by_time_and_ticker
 from ..event import TickEvent
 from ..price_parser import PriceParser
 
@@ -15,21 +18,54 @@ class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
     tick data for each requested financial instrument and
     stream those to the provided events queue as TickEvents.
     """
-    def __init__(self, csv_dir, events_queue, init_tickers=None):
+    def __init__(
+        self, csv_dir, events_queue,
+        init_tickers=None, cache_dir=None,
+        merge="sort", chunksize=100000, price_cache=None,
+        history_size=None
+    ):
         """
         Takes the CSV directory, the events queue and a possible
         list of initial ticker symbols, then creates an (optional)
         list of ticker subscriptions and associated prices.
+
+        If cache_dir is given, parsed CSV files are kept there
+        in a binary form and re-used by subsequent sessions.
+        An existing cache object (e.g. a MemoryPriceCache shared
+        by several sessions) can be given as price_cache instead.
+
+        merge selects how the ticker data is combined into a
+        single tick stream: "sort" loads, concatenates and sorts
+        all of the ticks up front, while "heap" reads each CSV
+        file in chunks of chunksize rows and merges one cursor
+        per ticker through a heap. The latter keeps memory
+        proportional to the number of tickers times chunksize.
+        The price cache is not used by the "heap" merge.
+
+        If history_size is given, the last history_size ticks of
+        each ticker are kept for get_history and get_latest_matrix.
         """
+        if merge not in ("sort", "heap"):
+            raise ValueError("merge must be 'sort' or 'heap', not '%s'" % merge)
         self.csv_dir = csv_dir
         self.events_queue = events_queue
+        self.merge = merge
+        self.chunksize = chunksize
+        self.price_cache = price_cache
+        if price_cache is None and cache_dir is not None:
+            self.price_cache = PriceCsvCache(cache_dir)
         self.continue_backtest = True
         self.tickers = {}
         self.tickers_data = {}
+        if history_size is not None:
+            self.keep_history(history_size)
         if init_tickers is not None:
             for ticker in init_tickers:
                 self.subscribe_ticker(ticker)
-        self.tick_stream = self._merge_sort_ticker_data()
+        if self.merge == "sort":
+            self.tick_stream = self._merge_sort_ticker_data()
+        else:
+            self.tick_stream = self._heap_merge_ticker_data()
 
     def _open_ticker_price_csv(self, ticker):
         """
@@ -38,10 +74,28 @@ class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
         them into a pandas DataFrame, stored in a dictionary.
         """
         ticker_path = os.path.join(self.csv_dir, "%s.csv" % ticker)
-        self.tickers_data[ticker] = pd.io.parsers.read_csv(
+        if self.merge == "heap":
+            # Only the first tick is needed up front, the rest
+            # of the file is streamed by _ticker_tick_stream
+            self.tickers_data[ticker] = self.read_price_csv(
+                ticker_path, nrows=1
+            )
+        else:
+            self.tickers_data[ticker] = self._read_price_csv(ticker_path)
+
+    @staticmethod
+    def read_price_csv(ticker_path, **kwargs):
+        """
+        Parses a tick CSV file of ticker, time, bid and ask
+        into a pandas DataFrame indexed by time. Additional
+        keyword arguments (e.g. nrows, chunksize) are passed
+        on to pandas.read_csv.
+        """
+        return pd.io.parsers.read_csv(
             ticker_path, header=0, parse_dates=True,
             dayfirst=True, index_col=1,
-            names=("Ticker", "Time", "Bid", "Ask")
+            names=("Ticker", "Time", "Bid", "Ask"),
+            **kwargs
         )
 
     def _merge_sort_ticker_data(self):
@@ -49,13 +103,47 @@ class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
         Concatenates all of the separate equities DataFrames
         into a single DataFrame that is time ordered, allowing tick
         data events to be added to the queue in a chronological fashion.
+        Ticks with the same time are ordered by ticker, as with the
+        "heap" merge.
 
         Note that this is an idealised situation, utilised solely for
         backtesting. In live trading ticks may arrive "out of order".
         """
-        return pd.concat(
-            self.tickers_data.values()
-        ).sort_index().iterrows()
+        df = sort_by_time_and_ticker(pd.concat(self.tickers_data.values()))
+        return (
+            self._create_event(index, row["Ticker"], row)
+            for index, row in df.iterrows()
+        )
+
+    def _heap_merge_ticker_data(self):
+        """
+        Merges the tick CSV files of all subscribed tickers into
+        a single time ordered stream of TickEvents, through a heap
+        holding one chunked cursor per ticker.
+        """
+        return heap_merge(
+            self._ticker_tick_stream(ticker)
+            for ticker in sorted(self.tickers_data)
+        )
+
+    def _ticker_tick_stream(self, ticker):
+        """
+        Reads the tick CSV file of a ticker in chunks and yields
+        (timestamp, ticker, TickEvent) tuples in time order.
+        """
+        ticker_path = os.path.join(self.csv_dir, "%s.csv" % ticker)
+        chunks = self.read_price_csv(ticker_path, chunksize=self.chunksize)
+        ticker_id = self.symbols.intern(ticker)
+        for chunk in chunks:
+            nanos = chunk.index.values.astype("datetime64[ns]").view(np.int64).tolist()
+            symbols = chunk["Ticker"].tolist()
+            bids = PriceParser.parse_array(chunk["Bid"].values).tolist()
+            asks = PriceParser.parse_array(chunk["Ask"].values).tolist()
+            for i in range(len(chunk)):
+                yield nanos[i], symbols[i], TickEvent(
+                    symbols[i], nanos[i], bids[i], asks[i],
+                    ticker_id=ticker_id
+                )
 
     def subscribe_ticker(self, ticker):
         """
@@ -72,6 +160,7 @@ class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
                     "timestamp": dft.index[0]
                 }
                 self.tickers[ticker] = ticker_prices
+                self.symbols.intern(ticker)
             except OSError:
                 print(
                     "Could not subscribe ticker %s "
@@ -90,7 +179,9 @@ class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
         """
         bid = PriceParser.parse(row["Bid"])
         ask = PriceParser.parse(row["Ask"])
-        tev = TickEvent(ticker, index, bid, ask)
+        tev = TickEvent(
+            ticker, index, bid, ask, ticker_id=self.symbols.intern(ticker)
+        )
         return tev
 
     def stream_next(self):
@@ -98,11 +189,9 @@ class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
         Place the next TickEvent onto the event queue.
         """
         try:
-            index, row = next(self.tick_stream)
+            tev = next(self.tick_stream)
         except StopIteration:
             self.continue_backtest = False
             return
-        ticker = row["Ticker"]
-        tev = self._create_event(index, ticker, row)
         self._store_event(tev)
         self.events_queue.put(tev)
@@ -0,0 +1,193 @@
+import numpy as np
+
+from ..arrays import grow
+from ..symbols import SymbolTable
+
+
+BAR_FIELDS = [
+    ("timestamp", "datetime64[ns]"),
+    ("open", np.int64), ("high", np.int64), ("low", np.int64),
+    ("close", np.int64), ("adj_close", np.int64), ("volume", np.int64),
+]
+
+TICK_FIELDS = [
+    ("timestamp", "datetime64[ns]"),
+    ("bid", np.int64), ("ask", np.int64),
+]
+
+
+class PriceHistory(object):
+    """
+    PriceHistory keeps the last capacity values of each field
+    (close, adj_close... in PriceParser units) of every ticker
+    in fixed-size numpy ring buffers, one row per ticker, the
+    row of a ticker being its id in a SymbolTable.
+
+    Each row is twice capacity long and every value is written
+    both at its position and capacity further along, so that the
+    last n values of a ticker are always a contiguous slice of
+    its row, returned by get_history as a read-only view
+    without copying.
+    """
+    def __init__(
+        self, capacity, fields=BAR_FIELDS, nb_tickers=16, symbols=None
+    ):
+        """
+        Parameters:
+        capacity - The number of values kept per ticker and field.
+        fields - The list of (name, dtype) of the fields.
+        nb_tickers - The initial number of ticker rows, doubled
+            whenever needed.
+        symbols - The SymbolTable giving the rows of the tickers,
+            usually that of the price handler, so that the ticker
+            ids of its events can be used directly.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.fields = [name for name, dtype in fields]
+        if symbols is None:
+            symbols = SymbolTable()
+        self.symbols = symbols
+        self.counts = np.zeros(nb_tickers, dtype=np.int64)
+        self.buffers = dict(
+            (name, np.zeros((nb_tickers, 2 * capacity), dtype=dtype))
+            for name, dtype in fields
+        )
+
+    def _grow(self, nb_tickers):
+        self.counts = grow(self.counts, nb_tickers)
+        for name in self.fields:
+            self.buffers[name] = grow(self.buffers[name], nb_tickers)
+
+    def _reserve(self, nb_tickers):
+        """
+        Grows the rows, doubling their number, until there are
+        at least nb_tickers of them.
+        """
+        size = max(len(self.counts), 1)
+        if nb_tickers > len(self.counts):
+            while size < nb_tickers:
+                size *= 2
+            self._grow(size)
+
+    def _get_row(self, ticker):
+        """
+        Returns the row of a ticker given by its id, or by its
+        symbol, interning it on first use.
+        """
+        if isinstance(ticker, (int, np.integer)):
+            return int(ticker)
+        return self.symbols.intern(ticker)
+
+    def _get_known_row(self, ticker):
+        """
+        Returns the row of a ticker, or None if no value of the
+        ticker has been appended yet.
+        """
+        row = self.symbols.get_id(ticker)
+        if row is None or row >= len(self.counts) or self.counts[row] == 0:
+            return None
+        return row
+
+    def append(self, ticker, **values):
+        """
+        Appends the latest values of the fields of a ticker (given
+        by symbol or by its id in the symbols), given as keyword
+        arguments.
+        """
+        row = self._get_row(ticker)
+        if row >= len(self.counts):
+            self._reserve(row + 1)
+        count = self.counts[row]
+        pos = count % self.capacity
+        for name, value in values.items():
+            buffer = self.buffers[name][row]
+            buffer[pos] = value
+            buffer[pos + self.capacity] = value
+        self.counts[row] = count + 1
+
+    def append_many(self, tickers, **values):
+        """
+        Appends the latest values of several distinct tickers at
+        once, each field being given as an array (or a scalar
+        common to every ticker) in the order of tickers, which can
+        be a list of symbols or an integer array of their ids.
+        """
+        if isinstance(tickers, np.ndarray) and tickers.dtype.kind == "i":
+            rows = tickers
+        else:
+            rows = self.symbols.intern_many(tickers)
+        if len(rows) > 0:
+            self._reserve(int(rows.max()) + 1)
+        positions = self.counts[rows] % self.capacity
+        for name, value in values.items():
+            buffer = self.buffers[name]
+            buffer[rows, positions] = value
+            buffer[rows, positions + self.capacity] = value
+        self.counts[rows] += 1
+
+    def __len__(self):
+        return int(np.count_nonzero(self.counts))
+
+    def __contains__(self, ticker):
+        return self._get_known_row(ticker) is not None
+
+    def get_count(self, ticker):
+        """
+        Returns the number of values of ticker which are kept,
+        at most capacity.
+        """
+        row = self._get_known_row(ticker)
+        if row is None:
+            return 0
+        return int(min(self.counts[row], self.capacity))
+
+    def get_history(self, ticker, field, n=None):
+        """
+        Returns a read-only view of the last n values (all of
+        those which are kept by default) of a field of ticker,
+        oldest first. Fewer values are returned if fewer have
+        been kept so far.
+        """
+        row = self._get_known_row(ticker)
+        if row is None:
+            raise KeyError(ticker)
+        count = int(self.counts[row])
+        kept = min(count, self.capacity)
+        n = kept if n is None else min(n, kept)
+        end = count % self.capacity + self.capacity
+        if count <= self.capacity:
+            # The first values have only been written once
+            end = count
+        history = self.buffers[field][row, end - n:end]
+        history.flags.writeable = False
+        return history
+
+    def get_latest_matrix(self, tickers, field, n=1):
+        """
+        Returns a float64 matrix of the last n values of a field
+        of each of the tickers, one row per ticker (oldest value
+        first), gathered in a single vectorised step. Values which
+        are not available, for tickers with fewer than n values
+        (or none at all), are NaN.
+        """
+        if n > self.capacity:
+            raise ValueError(
+                "n must be at most the capacity of %d" % self.capacity
+            )
+        rows = np.array([
+            self.symbols.get_id(ticker, -1) for ticker in tickers
+        ], dtype=np.int64)
+        known = (rows >= 0) & (rows < len(self.counts))
+        rows = np.where(known, rows, 0)
+        counts = np.where(known, self.counts[rows], 0)
+        ends = np.where(
+            counts <= self.capacity, counts,
+            counts % self.capacity + self.capacity
+        )
+        offsets = np.arange(n) - n
+        columns = np.maximum(ends[:, None] + offsets, 0)
+        matrix = self.buffers[field][rows[:, None], columns].astype(np.float64)
+        matrix[offsets + np.minimum(counts, self.capacity)[:, None] < 0] = np.nan
+        return matrix
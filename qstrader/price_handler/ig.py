@@ -8,8 +8,20 @@ from .base import AbstractTickPriceHandler
 
 
 class IGTickPriceHandler(AbstractTickPriceHandler):
+    """
+    IGTickPriceHandler subscribes to the IG Lightstreamer price
+    stream and pushes a TickEvent onto the events queue for every
+    price update, as soon as it is received. A live TradingSession
+    blocks on the queue and is woken up by these events, so the
+    handler does not need to be polled.
+
+    The ticks are only stored once the session takes them off the
+    queue, on the session thread, so that the prices read by the
+    portfolio are never those of a tick yet to be processed.
+    """
+    pushes_events = True
+
     def __init__(self, events_queue, ig_stream_service, tickers):
-        self.price_event = None
         self.events_queue = events_queue
         self.continue_backtest = True
         self.ig_stream_service = ig_stream_service
@@ -17,6 +29,7 @@ class IGTickPriceHandler(AbstractTickPriceHandler):
         self.tickers = {}
         for ticker in self.tickers_lst:
             self.tickers[ticker] = {}
+            self.symbols.intern(ticker)
 
         # Making a new Subscription in MERGE mode
         subcription_prices = Subscription(
@@ -33,23 +46,24 @@ class IGTickPriceHandler(AbstractTickPriceHandler):
         self.ig_stream_service.ls_client.subscribe(subcription_prices)
 
     def on_prices_update(self, data):
-        tev = self._create_event(data)
-        if self.price_event is not None:
-            print("losing %s" % self.price_event)
-        self.price_event = tev
+        """
+        Called from the Lightstreamer thread on each price update.
+        The events queue must therefore be thread-safe.
+        """
+        self.events_queue.put(self._create_event(data))
 
     def _create_event(self, data):
         ticker = data["name"]
         index = pd.to_datetime(data["values"]["UPDATE_TIME"])
         bid = PriceParser.parse(data["values"]["BID"])
         ask = PriceParser.parse(data["values"]["OFFER"])
-        return TickEvent(ticker, index, bid, ask)
+        return TickEvent(
+            ticker, index, bid, ask, ticker_id=self.symbols.get_id(ticker)
+        )
 
     def stream_next(self):
         """
-        Place the next PriceEvent (BarEvent or TickEvent) onto the event queue.
+        Price events are pushed onto the event queue by
+        on_prices_update, so there is nothing to poll.
         """
-        if self.price_event is not None:
-            self._store_event(self.price_event)
-            self.events_queue.put(self.price_event)
-            self.price_event = None
+        pass
@@ -1,9 +1,12 @@
 import os
 
+import numpy as np
 import pandas as pd
 
 from ..price_parser import PriceParser
 from .base import AbstractBarPriceHandler
+from .cache import PriceCsvCache
+from .merge import heap_merge, sort_by_time_and_ticker
 from ..event import BarEvent
 
 
@@ -18,24 +21,62 @@ class IQFeedIntradayCsvBarPriceHandler(AbstractBarPriceHandler):
     def __init__(
         self, csv_dir, events_queue,
         init_tickers=None,
-        start_date=None, end_date=None
+        start_date=None, end_date=None,
+        cache_dir=None, merge="sort", chunksize=100000,
+        price_cache=None, batch=False, history_size=None
     ):
         """
         Takes the CSV directory, the events queue and a possible
         list of initial ticker symbols then creates an (optional)
         list of ticker subscriptions and associated prices.
+
+        If cache_dir is given, parsed CSV files are kept there
+        in a binary form and re-used by subsequent sessions.
+        An existing cache object (e.g. a MemoryPriceCache shared
+        by several sessions) can be given as price_cache instead.
+
+        merge selects how the ticker data is combined into a
+        single bar stream: "sort" loads, concatenates and sorts
+        all of the bars up front, while "heap" reads each CSV
+        file in chunks of chunksize rows and merges one cursor
+        per ticker through a heap. The latter keeps memory
+        proportional to the number of tickers times chunksize.
+        The price cache is not used by the "heap" merge.
+
+        If batch is True (with the "sort" merge only), a single
+        BarBatchEvent holding the bars of every ticker is placed
+        onto the events queue for each minute, instead of one
+        BarEvent per ticker.
+
+        If history_size is given, the last history_size bars of
+        each ticker are kept for get_history and get_latest_matrix.
         """
+        if merge not in ("sort", "heap"):
+            raise ValueError("merge must be 'sort' or 'heap', not '%s'" % merge)
+        if batch and merge != "sort":
+            raise ValueError("batch requires the 'sort' merge")
         self.csv_dir = csv_dir
         self.events_queue = events_queue
+        self.merge = merge
+        self.batch = batch
+        self.chunksize = chunksize
+        self.price_cache = price_cache
+        if price_cache is None and cache_dir is not None:
+            self.price_cache = PriceCsvCache(cache_dir)
         self.continue_backtest = True
         self.tickers = {}
         self.tickers_data = {}
+        if history_size is not None:
+            self.keep_history(history_size)
         if init_tickers is not None:
             for ticker in init_tickers:
                 self.subscribe_ticker(ticker)
         self.start_date = start_date
         self.end_date = end_date
-        self.bar_stream = self._merge_sort_ticker_data()
+        if self.merge == "sort":
+            self.bar_stream = self._merge_sort_ticker_data()
+        else:
+            self.bar_stream = self._heap_merge_ticker_data()
 
     def _open_ticker_price_csv(self, ticker):
         """
@@ -44,42 +85,104 @@ class IQFeedIntradayCsvBarPriceHandler(AbstractBarPriceHandler):
         them into a pandas DataFrame, stored in a dictionary.
         """
         ticker_path = os.path.join(self.csv_dir, "%s.csv" % ticker)
+        if self.merge == "heap":
+            # Only the first bar is needed up front, the rest
+            # of the file is streamed by _ticker_bar_stream
+            self.tickers_data[ticker] = self.read_price_csv(
+                ticker_path, nrows=1
+            )
+        else:
+            self.tickers_data[ticker] = self._read_price_csv(ticker_path)
+        self.tickers_data[ticker]["Ticker"] = ticker
 
-        self.tickers_data[ticker] = pd.read_csv(
+    @staticmethod
+    def read_price_csv(ticker_path, **kwargs):
+        """
+        Parses a DTN IQFeed intraday OHLCVI CSV file into a
+        pandas DataFrame indexed by timestamp. Additional
+        keyword arguments (e.g. nrows, chunksize) are passed
+        on to pandas.read_csv.
+        """
+        return pd.read_csv(
             ticker_path,
             names=[
                 "Date", "Open", "Low", "High",
                 "Close", "Volume", "OpenInterest"
             ],
-            index_col="Date", parse_dates=True
+            index_col="Date", parse_dates=True,
+            **kwargs
         )
-        self.tickers_data[ticker]["Ticker"] = ticker
 
     def _merge_sort_ticker_data(self):
         """
         Concatenates all of the separate equities DataFrames
         into a single DataFrame that is time ordered, allowing tick
         data events to be added to the queue in a chronological fashion.
+        Bars with the same time are ordered by ticker, as with the
+        "heap" merge.
 
         Note that this is an idealised situation, utilised solely for
         backtesting. In live trading ticks may arrive "out of order".
         """
-        df = pd.concat(self.tickers_data.values()).sort_index()
+        df = sort_by_time_and_ticker(pd.concat(self.tickers_data.values()))
         start = None
         end = None
         if self.start_date is not None:
             start = df.index.searchsorted(self.start_date)
         if self.end_date is not None:
             end = df.index.searchsorted(self.end_date)
-        # Determine how to slice
-        if start is None and end is None:
-            return df.iterrows()
-        elif start is not None and end is None:
-            return df.ix[start:].iterrows()
-        elif start is None and end is not None:
-            return df.ix[:end].iterrows()
-        else:
-            return df.ix[start:end].iterrows()
+        period = 60  # Seconds in a minute
+        if self.batch:
+            return self._bar_batch_stream(
+                df.iloc[start:end], period, adj_close_column="Close"
+            )
+        return (
+            self._create_event(index, period, row["Ticker"], row)
+            for index, row in df.iloc[start:end].iterrows()
+        )
+
+    def _heap_merge_ticker_data(self):
+        """
+        Merges the intraday CSV files of all subscribed tickers
+        into a single time ordered stream of BarEvents, through
+        a heap holding one chunked cursor per ticker.
+        """
+        return heap_merge(
+            self._ticker_bar_stream(ticker)
+            for ticker in sorted(self.tickers_data)
+        )
+
+    def _ticker_bar_stream(self, ticker):
+        """
+        Reads the intraday CSV file of a ticker in chunks and
+        yields (timestamp, ticker, BarEvent) tuples in time
+        order, between the start and end dates.
+        """
+        ticker_path = os.path.join(self.csv_dir, "%s.csv" % ticker)
+        chunks = self.read_price_csv(ticker_path, chunksize=self.chunksize)
+        period = 60  # Seconds in a minute
+        ticker_id = self.symbols.intern(ticker)
+        for chunk in chunks:
+            if self.start_date is not None:
+                chunk = chunk[chunk.index >= self.start_date]
+            past_end = False
+            if self.end_date is not None:
+                past_end = len(chunk) > 0 and chunk.index[-1] >= self.end_date
+                chunk = chunk[chunk.index < self.end_date]
+            nanos = chunk.index.values.astype("datetime64[ns]").view(np.int64).tolist()
+            open_prices = PriceParser.parse_array(chunk["Open"].values).tolist()
+            high_prices = PriceParser.parse_array(chunk["High"].values).tolist()
+            low_prices = PriceParser.parse_array(chunk["Low"].values).tolist()
+            close_prices = PriceParser.parse_array(chunk["Close"].values).tolist()
+            volumes = chunk["Volume"].values.astype(np.int64).tolist()
+            for i in range(len(chunk)):
+                yield nanos[i], ticker, BarEvent(
+                    ticker, nanos[i], period, open_prices[i],
+                    high_prices[i], low_prices[i], close_prices[i],
+                    volumes[i], close_prices[i], ticker_id=ticker_id
+                )
+            if past_end:
+                return
 
     def subscribe_ticker(self, ticker):
         """
@@ -99,6 +202,7 @@ class IQFeedIntradayCsvBarPriceHandler(AbstractBarPriceHandler):
                     "timestamp": dft.index[0]
                 }
                 self.tickers[ticker] = ticker_prices
+                self.symbols.intern(ticker)
             except OSError:
                 print(
                     "Could not subscribe ticker %s "
@@ -124,25 +228,23 @@ class IQFeedIntradayCsvBarPriceHandler(AbstractBarPriceHandler):
         bev = BarEvent(
             ticker, index, period, open_price,
             high_price, low_price, close_price,
-            volume, adj_close_price
+            volume, adj_close_price, ticker_id=self.symbols.intern(ticker)
         )
         return bev
 
     def stream_next(self):
         """
-        Place the next BarEvent onto the event queue.
+        Place the next BarEvent (or BarBatchEvent) onto the event queue.
         """
         try:
-            index, row = next(self.bar_stream)
+            bev = next(self.bar_stream)
         except StopIteration:
             self.continue_backtest = False
             return
-        # Obtain all elements of the bar from the dataframe
-        ticker = row["Ticker"]
-        period = 60  # Seconds in a minute
-        # Create the tick event for the queue
-        bev = self._create_event(index, period, ticker, row)
         # Store event
-        self._store_event(bev)
+        if self.batch:
+            self._store_batch_event(bev)
+        else:
+            self._store_event(bev)
         # Send event to queue
         self.events_queue.put(bev)
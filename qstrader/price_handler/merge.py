@@ -0,0 +1,50 @@
+import heapq
+
+import numpy as np
+
+
+def heap_merge(streams):
+    """
+    Merges a collection of per-ticker price streams into a single
+    stream ordered by (timestamp, ticker), as the concatenate and
+    sort approach would, but without materialising every row.
+
+    Each stream must yield (timestamp, ticker, item) tuples in
+    timestamp order, where timestamp is an integer (nanoseconds).
+    Only the head of each stream is held in the heap, so memory
+    is proportional to the number of streams and the first item
+    is available as soon as every stream has produced one.
+
+    Yields the items of the merged stream.
+    """
+    heap = []
+    for i, stream in enumerate(streams):
+        stream = iter(stream)
+        try:
+            timestamp, ticker, item = next(stream)
+        except StopIteration:
+            continue
+        heap.append((timestamp, ticker, i, item, stream))
+    heapq.heapify(heap)
+    while heap:
+        timestamp, ticker, i, item, stream = heap[0]
+        yield item
+        try:
+            timestamp, ticker, item = next(stream)
+        except StopIteration:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (timestamp, ticker, i, item, stream))
+
+
+def sort_by_time_and_ticker(df, ticker_column="Ticker"):
+    """
+    Returns the rows of a DataFrame indexed by time, such as the
+    concatenated data of several tickers, stably sorted by
+    (timestamp, ticker), which is the order of heap_merge.
+    """
+    order = np.lexsort((
+        df[ticker_column].values.astype(str),
+        df.index.values.astype("datetime64[ns]")
+    ))
+    return df.iloc[order]
@@ -0,0 +1,113 @@
+from __future__ import print_function
+
+import pandas as pd
+
+from .base import AbstractTickPriceHandler
+from .merge import heap_merge
+from .tick_store import TickStore
+from ..event import TickEvent
+
+
+class MmapTickPriceHandler(AbstractTickPriceHandler):
+    """
+    MmapTickPriceHandler streams ticks for each requested financial
+    instrument straight from a memory-mapped tick store, as written
+    by the qstrader/scripts/convert_tick_csv.py script, and places
+    them onto the provided events queue as TickEvents.
+
+    Unlike HistoricCSVTickPriceHandler no CSV or date parsing takes
+    place, and the start and end dates are located through the
+    per-day index of the store, so skipped ticks are never read.
+    """
+    def __init__(
+        self, store_dir, events_queue,
+        init_tickers=None,
+        start_date=None, end_date=None,
+        chunksize=100000
+    ):
+        """
+        Takes the tick store directory, the events queue and a
+        possible list of initial ticker symbols, then creates an
+        (optional) list of ticker subscriptions and associated prices.
+
+        Ticks are converted to events chunksize records at a time.
+        """
+        self.store_dir = store_dir
+        self.events_queue = events_queue
+        self.start_date = start_date
+        self.end_date = end_date
+        self.chunksize = chunksize
+        self.continue_backtest = True
+        self.tickers = {}
+        self.tickers_data = {}
+        if init_tickers is not None:
+            for ticker in init_tickers:
+                self.subscribe_ticker(ticker)
+        self.tick_stream = heap_merge(
+            self._ticker_tick_stream(ticker)
+            for ticker in sorted(self.tickers_data)
+        )
+
+    def subscribe_ticker(self, ticker):
+        """
+        Subscribes the price handler to a new ticker symbol.
+        """
+        if ticker not in self.tickers:
+            try:
+                ticks = TickStore(self.store_dir, ticker).slice(
+                    self.start_date, self.end_date
+                )
+            except (IOError, OSError):
+                print(
+                    "Could not subscribe ticker %s "
+                    "as no tick store found for pricing." % ticker
+                )
+                return
+            if len(ticks) == 0:
+                print(
+                    "Could not subscribe ticker %s "
+                    "as no ticks are stored in the date range." % ticker
+                )
+                return
+            self.tickers_data[ticker] = ticks
+            self.tickers[ticker] = {
+                "bid": int(ticks[0]["bid"]),
+                "ask": int(ticks[0]["ask"]),
+                "timestamp": pd.Timestamp(int(ticks[0]["time"]))
+            }
+            self.symbols.intern(ticker)
+        else:
+            print(
+                "Could not subscribe ticker %s "
+                "as is already subscribed." % ticker
+            )
+
+    def _ticker_tick_stream(self, ticker):
+        """
+        Yields (timestamp, ticker, TickEvent) tuples for a ticker,
+        reading the memory-mapped ticks chunksize records at a time.
+        """
+        ticks = self.tickers_data[ticker]
+        ticker_id = self.symbols.intern(ticker)
+        for start in range(0, len(ticks), self.chunksize):
+            chunk = ticks[start:start + self.chunksize]
+            times = chunk["time"].tolist()
+            bids = chunk["bid"].tolist()
+            asks = chunk["ask"].tolist()
+            for i in range(len(times)):
+                yield times[i], ticker, TickEvent(
+                    ticker, times[i], bids[i], asks[i],
+                    ticker_id=ticker_id
+                )
+
+    def stream_next(self):
+        """
+        Place the next TickEvent onto the event queue.
+        """
+        try:
+            tev = next(self.tick_stream)
+        except StopIteration:
+            self.continue_backtest = False
+            return
+        self._store_event(tev)
+        self.events_queue.put(tev)
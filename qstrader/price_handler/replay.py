@@ -0,0 +1,174 @@
+from __future__ import print_function
+
+import numpy as np
+import pandas as pd
+
+from .base import (
+    AbstractPriceHandler, AbstractBarPriceHandler, AbstractTickPriceHandler
+)
+from .tape import EventTape, MISSING
+from ..event import BarBatchEvent, BarEvent, EventType, TickEvent
+
+
+class AbstractReplayHandler(AbstractPriceHandler):
+    """
+    Streams the price events of an event tape, as recorded by a
+    TradingSession, back onto the events queue in the recorded
+    order, without any CSV parsing or merging of the tickers.
+
+    The price handler takes the symbols of the tape, so that its
+    ticker ids, and the BarBatchEvents which are replayed, are the
+    same as those of the recorded events.
+    """
+    def __init__(
+        self, tape, events_queue,
+        start_date=None, end_date=None,
+        history_size=None
+    ):
+        """
+        Takes an EventTape and the events queue, streaming the
+        events with a time at or after start_date and before
+        end_date (all of them by default), as the CSV price
+        handlers do.
+
+        history_size - The number of bars (or ticks) kept per
+            ticker for get_history, if any.
+        """
+        self.tape = tape
+        self.events_queue = events_queue
+        self.continue_backtest = True
+        self._symbols = tape.symbols
+        self.tickers = {}
+        self.tickers_data = {}
+        if history_size is not None:
+            self.keep_history(history_size)
+        times = tape.prices["time"]
+        start = None
+        end = None
+        if start_date is not None:
+            start = np.searchsorted(times, pd.Timestamp(start_date).value)
+        if end_date is not None:
+            end = np.searchsorted(times, pd.Timestamp(end_date).value)
+        self.records = tape.prices[start:end]
+        self._subscribe_tickers()
+        self.price_stream = self._price_stream()
+
+    def _subscribe_tickers(self):
+        """
+        Subscribes the price handler to every ticker streamed,
+        with the prices of its first record.
+        """
+        ticker_ids, firsts = np.unique(
+            self.records["ticker_id"], return_index=True
+        )
+        for ticker_id, first in zip(ticker_ids.tolist(), firsts.tolist()):
+            self.tickers[self.symbols.get_symbol(ticker_id)] = \
+                self._first_prices(self.records[first])
+
+    def stream_next(self):
+        """
+        Place the next recorded price event onto the event queue.
+        """
+        try:
+            event = next(self.price_stream)
+        except StopIteration:
+            self.continue_backtest = False
+            return
+        if event.type == EventType.BAR_BATCH:
+            self._store_batch_event(event)
+        else:
+            self._store_event(event)
+        self.events_queue.put(event)
+
+
+class ReplayBarPriceHandler(AbstractReplayHandler, AbstractBarPriceHandler):
+    def _first_prices(self, record):
+        adj_close = int(record["adj_close"])
+        return {
+            "close": int(record["close"]),
+            "adj_close": None if adj_close == MISSING else adj_close,
+            "timestamp": pd.Timestamp(int(record["time"]))
+        }
+
+    def _price_stream(self):
+        """
+        Yields a BarEvent for each recorded bar, and a BarBatchEvent
+        for each block of bars recorded from a batch.
+        """
+        records = self.records
+        symbols = self.symbols.symbols
+        batches = records["batch"]
+        is_start = np.ones(len(records), dtype=bool)
+        is_start[1:] = (batches[1:] < 0) | (batches[1:] != batches[:-1])
+        starts = np.flatnonzero(is_start).tolist()
+        ends = starts[1:] + [len(records)]
+        fields = [
+            "time", "ticker_id", "period", "open", "high",
+            "low", "close", "volume", "adj_close"
+        ]
+        arrays = dict(
+            (name, np.ascontiguousarray(records[name])) for name in fields
+        )
+        columns = [arrays[name].tolist() for name in fields]
+        times, ticker_ids, periods, open_prices, high_prices, \
+            low_prices, close_prices, volumes, adj_close_prices = columns
+        batches = batches.tolist()
+        for start, end in zip(starts, ends):
+            if batches[start] < 0:
+                adj_close_price = adj_close_prices[start]
+                if adj_close_price == MISSING:
+                    adj_close_price = None
+                yield BarEvent(
+                    symbols[ticker_ids[start]], times[start],
+                    periods[start], open_prices[start],
+                    high_prices[start], low_prices[start],
+                    close_prices[start], volumes[start],
+                    adj_close_price, ticker_id=ticker_ids[start]
+                )
+            else:
+                yield BarBatchEvent(
+                    pd.Timestamp(times[start]), periods[start], symbols,
+                    arrays["ticker_id"][start:end],
+                    arrays["open"][start:end], arrays["high"][start:end],
+                    arrays["low"][start:end], arrays["close"][start:end],
+                    arrays["volume"][start:end],
+                    arrays["adj_close"][start:end]
+                )
+
+
+class ReplayTickPriceHandler(AbstractReplayHandler, AbstractTickPriceHandler):
+    def _first_prices(self, record):
+        return {
+            "bid": int(record["bid"]),
+            "ask": int(record["ask"]),
+            "timestamp": pd.Timestamp(int(record["time"]))
+        }
+
+    def _price_stream(self):
+        """
+        Yields a TickEvent for each recorded tick.
+        """
+        symbols = self.symbols.symbols
+        columns = [
+            self.records[name].tolist()
+            for name in ["time", "ticker_id", "bid", "ask"]
+        ]
+        for time, ticker_id, bid, ask in zip(*columns):
+            yield TickEvent(
+                symbols[ticker_id], time, bid, ask, ticker_id=ticker_id
+            )
+
+
+def ReplayPriceHandler(tape_dir, events_queue, **kwargs):
+    """
+    Returns a ReplayBarPriceHandler or a ReplayTickPriceHandler,
+    depending on the kind of price events of the tape recorded
+    in tape_dir. Keyword arguments are passed on to the handler.
+    """
+    tape = EventTape(tape_dir)
+    if tape.kind == "bar":
+        return ReplayBarPriceHandler(tape, events_queue, **kwargs)
+    elif tape.kind == "tick":
+        return ReplayTickPriceHandler(tape, events_queue, **kwargs)
+    else:
+        raise ValueError("The tape in %s holds no price events" % tape_dir)
@@ -0,0 +1,336 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from ..event import (
+    BarEvent, EventType, FillEvent, OrderEvent, SignalEvent, TickEvent
+)
+from ..symbols import SymbolTable
+
+
+BAR_RECORD_DTYPE = np.dtype([
+    ("time", "<i8"), ("ticker_id", "<i8"), ("batch", "<i8"),
+    ("period", "<i8"), ("open", "<i8"), ("high", "<i8"), ("low", "<i8"),
+    ("close", "<i8"), ("volume", "<i8"), ("adj_close", "<i8")
+])
+TICK_RECORD_DTYPE = np.dtype([
+    ("time", "<i8"), ("ticker_id", "<i8"), ("bid", "<i8"), ("ask", "<i8")
+])
+TRADE_RECORD_DTYPE = np.dtype([
+    ("seq", "<i8"), ("type", "<i8"), ("timestamp", "<i8"),
+    ("ticker_id", "<i8"), ("action", "<i8"), ("quantity", "<i8"),
+    ("exchange", "<i8"), ("price", "<i8"), ("commission", "<i8")
+])
+RECORD_DTYPES = {"bar": BAR_RECORD_DTYPE, "tick": TICK_RECORD_DTYPE}
+ACTIONS = ["BOT", "SLD", "EXIT"]
+# Stands for a missing value (e.g. None) in an int64 field
+MISSING = np.iinfo(np.int64).min
+
+
+def tape_paths(tape_dir):
+    """
+    Returns the paths of the header, of the price records file
+    and of the trade records file of an event tape.
+    """
+    tape_dir = os.path.expanduser(tape_dir)
+    return (
+        os.path.join(tape_dir, "header.json"),
+        os.path.join(tape_dir, "prices.bin"),
+        os.path.join(tape_dir, "trades.bin")
+    )
+
+
+def _to_record(value):
+    return MISSING if value is None else value
+
+
+def _from_record(value):
+    return None if value == MISSING else value
+
+
+class EventTapeWriter(object):
+    """
+    EventTapeWriter records the price events consumed by a trading
+    session, in order, and optionally its signal, order and fill
+    events, into an event tape directory which can be streamed back
+    by a ReplayPriceHandler.
+
+    The tape consists of three files:
+    * prices.bin - packed int64 records, one per bar (the bars of
+      a BarBatchEvent sharing a batch number, -1 otherwise) or one
+      per tick, holding the nanosecond time, the ticker id and the
+      prices in PriceParser units.
+    * trades.bin - packed int64 records of the signals, orders and
+      fills, each with the number of price events recorded before it.
+    * header.json - the kind of price events, the ticker symbols
+      indexed by id and the exchanges of the fills, written on close.
+
+    The files are only opened once the first event is recorded (or
+    on close), so that a writer which is never used does not hold
+    on to them. Records are buffered and appended buffer_size at a
+    time.
+    """
+    def __init__(
+        self, tape_dir, symbols=None,
+        record_trades=False, buffer_size=10000
+    ):
+        """
+        Parameters:
+        tape_dir - The directory of the tape, created if needed.
+        symbols - An optional list of ticker symbols, e.g. those of
+            the price handler, so that the ticker ids of the tape
+            are those of the recorded events.
+        record_trades - Whether to record the signal, order and
+            fill events as well.
+        buffer_size - The number of records buffered before they
+            are written.
+        """
+        self.tape_dir = os.path.expanduser(tape_dir)
+        self.symbols = SymbolTable(symbols)
+        self.record_trades = record_trades
+        self.buffer_size = buffer_size
+        self.kind = None
+        self.exchanges = []
+        self.nb_prices = 0
+        self.nb_trades = 0
+        self.nb_batches = 0
+        self.prices = []
+        self.trades = []
+        # The ids on the tape of the tickers of the last batch
+        self._batch_tickers = None
+        self._batch_ticker_ids = None
+        self.prices_file = None
+        self.trades_file = None
+        self.closed = False
+
+    def _open(self):
+        """
+        Creates the tape directory if needed and opens (truncating)
+        the price and trade records files.
+        """
+        if not os.path.isdir(self.tape_dir):
+            os.makedirs(self.tape_dir)
+        _, prices_path, trades_path = tape_paths(self.tape_dir)
+        self.prices_file = open(prices_path, "wb")
+        self.trades_file = open(trades_path, "wb")
+
+    def _set_kind(self, kind):
+        if self.kind is None:
+            self.kind = kind
+        elif self.kind != kind:
+            raise ValueError(
+                "Cannot record %s events on a tape of %s events" % (
+                    kind, self.kind
+                )
+            )
+
+    def _flush_prices(self):
+        if self.prices:
+            np.array(
+                self.prices, dtype=RECORD_DTYPES[self.kind]
+            ).tofile(self.prices_file)
+            self.prices = []
+
+    def _flush_trades(self):
+        if self.trades:
+            np.array(
+                self.trades, dtype=TRADE_RECORD_DTYPE
+            ).tofile(self.trades_file)
+            self.trades = []
+
+    def _record_batch(self, event):
+        """
+        Writes the bars of a BarBatchEvent as a single block
+        of records sharing the next batch number.
+        """
+        self._set_kind("bar")
+        self._flush_prices()
+        if (
+            event.tickers is not self._batch_tickers or
+            len(event.tickers) != len(self._batch_ticker_ids)
+        ):
+            self._batch_tickers = event.tickers
+            self._batch_ticker_ids = self.symbols.intern_many(event.tickers)
+        ticker_ids = self._batch_ticker_ids[event.ticker_ids]
+        records = np.empty(len(event), dtype=BAR_RECORD_DTYPE)
+        records["time"] = pd.Timestamp(event.time).value
+        records["ticker_id"] = ticker_ids
+        records["batch"] = self.nb_batches
+        records["period"] = event.period
+        records["open"] = event.open_prices
+        records["high"] = event.high_prices
+        records["low"] = event.low_prices
+        records["close"] = event.close_prices
+        records["volume"] = event.volumes
+        records["adj_close"] = event.adj_close_prices
+        records.tofile(self.prices_file)
+        self.nb_batches += 1
+        self.nb_prices += 1
+
+    def _record_trade(self, event):
+        ticker_id = self.symbols.intern(event.ticker)
+        if event.type == EventType.FILL:
+            if event.exchange not in self.exchanges:
+                self.exchanges.append(event.exchange)
+            self.trades.append((
+                self.nb_prices, event.type.value,
+                pd.Timestamp(event.timestamp).value, ticker_id,
+                ACTIONS.index(event.action), event.quantity,
+                self.exchanges.index(event.exchange),
+                event.price, event.commission
+            ))
+        else:
+            if event.type == EventType.SIGNAL:
+                quantity = event.suggested_quantity
+            else:
+                quantity = event.quantity
+            self.trades.append((
+                self.nb_prices, event.type.value, MISSING, ticker_id,
+                ACTIONS.index(event.action), _to_record(quantity),
+                MISSING, MISSING, MISSING
+            ))
+        self.nb_trades += 1
+        if len(self.trades) >= self.buffer_size:
+            self._flush_trades()
+
+    def record(self, event):
+        """
+        Records a price event, or a signal, order or fill event if
+        trades are recorded. Other events are ignored.
+        """
+        if self.prices_file is None:
+            self._open()
+        if event.type == EventType.BAR:
+            self._set_kind("bar")
+            self.prices.append((
+                event.nanos, self.symbols.intern(event.ticker), -1,
+                event.period, event.open_price, event.high_price,
+                event.low_price, event.close_price, event.volume,
+                _to_record(event.adj_close_price)
+            ))
+        elif event.type == EventType.TICK:
+            self._set_kind("tick")
+            self.prices.append((
+                event.nanos, self.symbols.intern(event.ticker),
+                event.bid, event.ask
+            ))
+        elif event.type == EventType.BAR_BATCH:
+            self._record_batch(event)
+            return
+        else:
+            if self.record_trades and event.type in (
+                EventType.SIGNAL, EventType.ORDER, EventType.FILL
+            ):
+                self._record_trade(event)
+            return
+        self.nb_prices += 1
+        if len(self.prices) >= self.buffer_size:
+            self._flush_prices()
+
+    def close(self):
+        """
+        Writes the remaining records and the header of the tape.
+        Closing the writer more than once has no effect.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self.prices_file is None:
+            self._open()
+        self._flush_prices()
+        self._flush_trades()
+        self.prices_file.close()
+        self.trades_file.close()
+        header = {
+            "kind": self.kind,
+            "symbols": list(self.symbols),
+            "exchanges": self.exchanges,
+            "nb_prices": self.nb_prices,
+            "nb_trades": self.nb_trades
+        }
+        header_path = tape_paths(self.tape_dir)[0]
+        with open(header_path, "w") as header_file:
+            json.dump(header, header_file, indent=2, sort_keys=True)
+
+
+class EventTape(object):
+    """
+    EventTape gives read access to a tape written by an
+    EventTapeWriter. The price and trade records are
+    memory-mapped rather than read into memory.
+    """
+    def __init__(self, tape_dir):
+        """
+        Opens the tape files of tape_dir.
+        """
+        header_path, prices_path, trades_path = tape_paths(tape_dir)
+        with open(header_path) as header_file:
+            header = json.load(header_file)
+        self.kind = header["kind"]
+        self.symbols = SymbolTable(header["symbols"])
+        self.exchanges = header["exchanges"]
+        self.nb_prices = header["nb_prices"]
+        self.nb_trades = header["nb_trades"]
+        self.prices = self._load(prices_path, RECORD_DTYPES.get(self.kind))
+        self.trades = self._load(trades_path, TRADE_RECORD_DTYPE)
+
+    @staticmethod
+    def _load(path, dtype):
+        if dtype is None or os.path.getsize(path) == 0:
+            return np.empty(0, dtype=dtype or TICK_RECORD_DTYPE)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    def price_events(self):
+        """
+        Yields the recorded tick and bar events, one BarEvent per
+        bar, including the bars of the recorded batches.
+        """
+        symbols = self.symbols.symbols
+        columns = [
+            self.prices[name].tolist() for name in self.prices.dtype.names
+        ]
+        if self.kind == "tick":
+            for time, ticker_id, bid, ask in zip(*columns):
+                yield TickEvent(
+                    symbols[ticker_id], time, bid, ask, ticker_id=ticker_id
+                )
+        else:
+            for time, ticker_id, batch, period, open_price, high_price, \
+                    low_price, close_price, volume, adj_close_price in zip(*columns):
+                yield BarEvent(
+                    symbols[ticker_id], time, period, open_price,
+                    high_price, low_price, close_price, volume,
+                    _from_record(adj_close_price), ticker_id=ticker_id
+                )
+
+    def trade_events(self):
+        """
+        Yields (seq, event) tuples for the recorded signal, order
+        and fill events, seq being the number of price events which
+        were recorded before the event.
+        """
+        symbols = self.symbols.symbols
+        for record in self.trades.tolist():
+            seq, event_type, timestamp, ticker_id, action, quantity, \
+                exchange, price, commission = record
+            event_type = EventType(event_type)
+            ticker = symbols[ticker_id]
+            action = ACTIONS[action]
+            quantity = _from_record(quantity)
+            if event_type == EventType.SIGNAL:
+                event = SignalEvent(
+                    ticker, action, quantity, ticker_id=ticker_id
+                )
+            elif event_type == EventType.ORDER:
+                event = OrderEvent(
+                    ticker, action, quantity, ticker_id=ticker_id
+                )
+            else:
+                event = FillEvent(
+                    pd.Timestamp(timestamp), ticker, action, quantity,
+                    self.exchanges[exchange], price, commission,
+                    ticker_id=ticker_id
+                )
+            yield seq, event
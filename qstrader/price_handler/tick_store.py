@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from ..price_parser import PriceParser
+
+
+TICK_DTYPE = np.dtype([("time", "<i8"), ("bid", "<i8"), ("ask", "<i8")])
+NANOS_PER_DAY = 86400 * 10 ** 9
+
+
+def tick_store_paths(store_dir, ticker):
+    """
+    Returns the paths of the tick records file and of the
+    per-day offset index file of a ticker in a tick store.
+    """
+    store_dir = os.path.expanduser(store_dir)
+    return (
+        os.path.join(store_dir, "%s.ticks" % ticker),
+        os.path.join(store_dir, "%s.index.npy" % ticker)
+    )
+
+
+def write_tick_store(chunks, store_dir, ticker):
+    """
+    Writes a stream of tick DataFrames for a single ticker into
+    the binary tick store format read by TickStore.
+
+    Each chunk must be indexed by time, in increasing order across
+    the whole stream, and have "Bid" and "Ask" columns. The chunks
+    are appended one at a time, so the full history never has to
+    fit in memory.
+
+    The store consists of two files:
+    * <ticker>.ticks - packed records of int64 nanosecond time and
+      int64 bid and ask prices in PriceParser units.
+    * <ticker>.index.npy - the nanosecond timestamp of midnight of
+      every day present, and the record offset at which that day
+      starts, followed by a final entry holding the record count.
+
+    Returns the number of ticks written.
+    """
+    store_dir = os.path.expanduser(store_dir)
+    if not os.path.isdir(store_dir):
+        os.makedirs(store_dir)
+    ticks_path, index_path = tick_store_paths(store_dir, ticker)
+    days = []
+    offsets = []
+    nb_ticks = 0
+    last_time = None
+    with open(ticks_path, "wb") as ticks_file:
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            records = np.empty(len(chunk), dtype=TICK_DTYPE)
+            records["time"] = chunk.index.values.astype(
+                "datetime64[ns]"
+            ).view(np.int64)
+            for column, field in [("Bid", "bid"), ("Ask", "ask")]:
+                records[field] = PriceParser.parse_array(
+                    chunk[column].values
+                )
+            times = records["time"]
+            if (
+                np.any(np.diff(times) < 0) or
+                (last_time is not None and times[0] < last_time)
+            ):
+                raise ValueError(
+                    "Ticks for %s are not in time order" % ticker
+                )
+            chunk_days = times // NANOS_PER_DAY * NANOS_PER_DAY
+            day_starts = np.flatnonzero(np.diff(chunk_days)) + 1
+            if last_time is None or chunk_days[0] != days[-1]:
+                day_starts = np.concatenate([[0], day_starts])
+            days.extend(chunk_days[day_starts].tolist())
+            offsets.extend((day_starts + nb_ticks).tolist())
+            records.tofile(ticks_file)
+            nb_ticks += len(records)
+            last_time = times[-1]
+    index = np.array(
+        [days + [0], offsets + [nb_ticks]], dtype=np.int64
+    )
+    np.save(index_path, index)
+    return nb_ticks
+
+
+class TickStore(object):
+    """
+    TickStore gives read access to the ticks of one ticker written
+    by write_tick_store. The tick records are memory-mapped, so only
+    the pages that are actually streamed are read from disk, and
+    the per-day index allows seeking to a date without touching the
+    ticks of the skipped days.
+    """
+    def __init__(self, store_dir, ticker):
+        """
+        Opens the tick store files of ticker in store_dir.
+        """
+        self.ticker = ticker
+        ticks_path, index_path = tick_store_paths(store_dir, ticker)
+        index = np.load(index_path)
+        self.days = index[0, :-1]
+        self.offsets = index[1]
+        if self.offsets[-1] > 0:
+            self.ticks = np.memmap(ticks_path, dtype=TICK_DTYPE, mode="r")
+        else:
+            self.ticks = np.empty(0, dtype=TICK_DTYPE)
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def locate(self, timestamp):
+        """
+        Returns the offset of the first tick at or after timestamp.
+        Only the ticks of the day containing timestamp are searched.
+        """
+        nanos = pd.Timestamp(timestamp).value
+        day = nanos // NANOS_PER_DAY * NANOS_PER_DAY
+        i = np.searchsorted(self.days, day)
+        if i == len(self.days):
+            return len(self.ticks)
+        start = self.offsets[i]
+        if self.days[i] > day:
+            return start
+        end = self.offsets[i + 1]
+        return start + np.searchsorted(self.ticks["time"][start:end], nanos)
+
+    def slice(self, start_date=None, end_date=None):
+        """
+        Returns a memory-mapped view of the ticks with a time
+        at or after start_date and before end_date.
+        """
+        start = 0
+        end = len(self.ticks)
+        if start_date is not None:
+            start = self.locate(start_date)
+        if end_date is not None:
+            end = self.locate(end_date)
+        return self.ticks[start:end]
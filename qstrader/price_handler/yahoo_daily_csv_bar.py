@@ -1,9 +1,12 @@
 import os
 
+import numpy as np
 import pandas as pd
 
 from ..price_parser import PriceParser
 from .base import AbstractBarPriceHandler
+from .cache import PriceCsvCache
+from .merge import heap_merge
 from ..event import BarEvent
 
 
@@ -18,24 +21,59 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
         self, csv_dir, events_queue,
         init_tickers=None,
         start_date=None, end_date=None,
-        calc_adj_returns=False
+        calc_adj_returns=False, cache_dir=None,
+        merge="sort", price_cache=None, batch=False,
+        history_size=None
     ):
         """
         Takes the CSV directory, the events queue and a possible
         list of initial ticker symbols then creates an (optional)
         list of ticker subscriptions and associated prices.
+
+        If cache_dir is given, parsed CSV files are kept there
+        in a binary form and re-used by subsequent sessions.
+        An existing cache object (e.g. a MemoryPriceCache shared
+        by several sessions) can be given as price_cache instead.
+
+        merge selects how the ticker data is combined into a
+        single bar stream: "sort" concatenates and sorts all of
+        the bars up front, while "heap" merges one cursor per
+        ticker through a heap, without building the combined
+        DataFrame.
+
+        If batch is True (with the "sort" merge only), a single
+        BarBatchEvent holding the bars of every ticker is placed
+        onto the events queue for each date, instead of one
+        BarEvent per ticker.
+
+        If history_size is given, the last history_size bars of
+        each ticker are kept for get_history and get_latest_matrix.
         """
+        if merge not in ("sort", "heap"):
+            raise ValueError("merge must be 'sort' or 'heap', not '%s'" % merge)
+        if batch and merge != "sort":
+            raise ValueError("batch requires the 'sort' merge")
         self.csv_dir = csv_dir
         self.events_queue = events_queue
+        self.merge = merge
+        self.batch = batch
+        self.price_cache = price_cache
+        if price_cache is None and cache_dir is not None:
+            self.price_cache = PriceCsvCache(cache_dir)
         self.continue_backtest = True
         self.tickers = {}
         self.tickers_data = {}
+        if history_size is not None:
+            self.keep_history(history_size)
         if init_tickers is not None:
             for ticker in init_tickers:
                 self.subscribe_ticker(ticker)
         self.start_date = start_date
         self.end_date = end_date
-        self.bar_stream = self._merge_sort_ticker_data()
+        if self.merge == "sort":
+            self.bar_stream = self._merge_sort_ticker_data()
+        else:
+            self.bar_stream = self._heap_merge_ticker_data()
         self.calc_adj_returns = calc_adj_returns
         if self.calc_adj_returns:
             self.adj_close_returns = []
@@ -47,14 +85,22 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
         them into a pandas DataFrame, stored in a dictionary.
         """
         ticker_path = os.path.join(self.csv_dir, "%s.csv" % ticker)
-        self.tickers_data[ticker] = pd.io.parsers.read_csv(
+        self.tickers_data[ticker] = self._read_price_csv(ticker_path)
+        self.tickers_data[ticker]["Ticker"] = ticker
+
+    @staticmethod
+    def read_price_csv(ticker_path):
+        """
+        Parses a Yahoo Finance daily OHLCV CSV file
+        into a pandas DataFrame indexed by date.
+        """
+        return pd.io.parsers.read_csv(
             ticker_path, header=0, parse_dates=True,
             index_col=0, names=(
                 "Date", "Open", "High", "Low",
                 "Close", "Volume", "Adj Close"
             )
         )
-        self.tickers_data[ticker]["Ticker"] = ticker
 
     def _merge_sort_ticker_data(self):
         """
@@ -77,14 +123,72 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
         # will differ
         df['colFromIndex'] = df.index
         df = df.sort_values(by=["colFromIndex", "Ticker"])
-        if start is None and end is None:
-            return df.iterrows()
-        elif start is not None and end is None:
-            return df.ix[start:].iterrows()
-        elif start is None and end is not None:
-            return df.ix[:end].iterrows()
-        else:
-            return df.ix[start:end].iterrows()
+        if self.batch:
+            period = 86400  # Seconds in a day
+            return self._bar_batch_stream(df.iloc[start:end], period)
+        return self._bar_array_stream(df.iloc[start:end])
+
+    def _heap_merge_ticker_data(self):
+        """
+        Merges the separate equities DataFrames into a single
+        time ordered stream of bars through a heap holding one
+        cursor per ticker, in the same (date, ticker) order as
+        _merge_sort_ticker_data.
+
+        Yahoo Finance files are stored in reverse chronological
+        order and so are read in full, but no combined DataFrame
+        is built and sorted.
+        """
+        return heap_merge(
+            self._ticker_bar_stream(ticker)
+            for ticker in sorted(self.tickers_data)
+        )
+
+    def _ticker_bar_stream(self, ticker):
+        """
+        Yields (timestamp, ticker, BarEvent) tuples for a single
+        ticker, in date order, between the start and end dates.
+        """
+        df = self.tickers_data[ticker].sort_index()
+        start = None
+        end = None
+        if self.start_date is not None:
+            start = df.index.searchsorted(self.start_date)
+        if self.end_date is not None:
+            end = df.index.searchsorted(self.end_date)
+        for bev in self._bar_array_stream(df.iloc[start:end]):
+            yield bev.nanos, ticker, bev
+
+    def _bar_array_stream(self, df):
+        """
+        Parses the merged DataFrame once into integer numpy
+        column arrays (OHLCV, adjusted close, ticker code and
+        int64 timestamp) and then yields a BarEvent for each index,
+        carrying the id of its ticker in the symbols.
+
+        This avoids building a pandas Series per row via
+        iterrows() as well as the per-bar PriceParser dispatch.
+        """
+        codes, ticker_symbols = pd.factorize(df["Ticker"])
+        ticker_symbols = list(ticker_symbols)
+        symbol_ids = self.symbols.intern_many(ticker_symbols).tolist()
+        nanos = df.index.values.astype("datetime64[ns]").view(np.int64).tolist()
+        open_prices = PriceParser.parse_array(df["Open"].values)
+        high_prices = PriceParser.parse_array(df["High"].values)
+        low_prices = PriceParser.parse_array(df["Low"].values)
+        close_prices = PriceParser.parse_array(df["Close"].values)
+        adj_close_prices = PriceParser.parse_array(df["Adj Close"].values)
+        volumes = df["Volume"].values.astype(np.int64)
+        period = 86400  # Seconds in a day
+        for i in range(len(df)):
+            code = codes[i]
+            yield BarEvent(
+                ticker_symbols[code], nanos[i], period,
+                int(open_prices[i]), int(high_prices[i]),
+                int(low_prices[i]), int(close_prices[i]),
+                int(volumes[i]), int(adj_close_prices[i]),
+                ticker_id=symbol_ids[code]
+            )
 
     def subscribe_ticker(self, ticker):
         """
@@ -105,6 +209,7 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
                     "timestamp": dft.index[0]
                 }
                 self.tickers[ticker] = ticker_prices
+                self.symbols.intern(ticker)
             except OSError:
                 print(
                     "Could not subscribe ticker %s "
@@ -116,24 +221,6 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
                 "as is already subscribed." % ticker
             )
 
-    def _create_event(self, index, period, ticker, row):
-        """
-        Obtain all elements of the bar from a row of dataframe
-        and return a BarEvent
-        """
-        open_price = PriceParser.parse(row["Open"])
-        high_price = PriceParser.parse(row["High"])
-        low_price = PriceParser.parse(row["Low"])
-        close_price = PriceParser.parse(row["Close"])
-        adj_close_price = PriceParser.parse(row["Adj Close"])
-        volume = int(row["Volume"])
-        bev = BarEvent(
-            ticker, index, period, open_price,
-            high_price, low_price, close_price,
-            volume, adj_close_price
-        )
-        return bev
-
     def _store_event(self, event):
         """
         Store price event for closing price and adjusted closing price
@@ -154,25 +241,32 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
                 "adj_close_ret"
             ] = cur_adj_close / prev_adj_close - 1.0
             self.adj_close_returns.append(self.tickers[ticker]["adj_close_ret"])
-        self.tickers[ticker]["close"] = event.close_price
-        self.tickers[ticker]["adj_close"] = event.adj_close_price
-        self.tickers[ticker]["timestamp"] = event.time
+        super(YahooDailyCsvBarPriceHandler, self)._store_event(event)
+
+    def _store_batch_event(self, event):
+        """
+        Store the prices of every bar of a BarBatchEvent, one
+        bar at a time when adjusted returns are calculated
+        """
+        if self.calc_adj_returns:
+            for bev in event.bar_events():
+                self._store_event(bev)
+        else:
+            super(YahooDailyCsvBarPriceHandler, self)._store_batch_event(event)
 
     def stream_next(self):
         """
-        Place the next BarEvent onto the event queue.
+        Place the next BarEvent (or BarBatchEvent) onto the event queue.
         """
         try:
-            index, row = next(self.bar_stream)
+            bev = next(self.bar_stream)
         except StopIteration:
             self.continue_backtest = False
             return
-        # Obtain all elements of the bar from the dataframe
-        ticker = row["Ticker"]
-        period = 86400  # Seconds in a day
-        # Create the tick event for the queue
-        bev = self._create_event(index, period, ticker, row)
         # Store event
-        self._store_event(bev)
+        if self.batch:
+            self._store_batch_event(bev)
+        else:
+            self._store_event(bev)
         # Send event to queue
         self.events_queue.put(bev)
@@ -1,5 +1,4 @@
 from __future__ import division
-from multipledispatch import dispatch
 from .compat import PY2
 import numpy as np
 
@@ -21,6 +20,9 @@ class PriceParser(object):
     For consistency's sake, PriceParser should be used for ALL prices that enter
     the qstrader system. Numbers should also always be parsed correctly to view.
 
+    The scalar methods select their conversion with isinstance checks
+    rather than multiple dispatch, as they are called several times per
+    event, and parse_array/display_array convert whole numpy columns.
     """
 
     # 10,000,000
@@ -29,38 +31,68 @@ class PriceParser(object):
     """Parse Methods. Multiplies a float out into an int if needed."""
 
     @staticmethod
-    @dispatch(int_t)
-    def parse(x):  # flake8: noqa
-        return x
+    def parse(x):
+        if isinstance(x, int_t):
+            return x
+        if isinstance(x, float):
+            return int(x * PriceParser.PRICE_MULTIPLIER)
+        if isinstance(x, str):
+            return int(float(x) * PriceParser.PRICE_MULTIPLIER)
+        raise NotImplementedError(
+            "Could not find signature for parse: <%s>" % type(x).__name__
+        )
 
     @staticmethod
-    @dispatch(str)
-    def parse(x):  # flake8: noqa
-        return int(float(x) * PriceParser.PRICE_MULTIPLIER)
-
-    @staticmethod
-    @dispatch(float)
-    def parse(x):  # flake8: noqa
-        return int(x * PriceParser.PRICE_MULTIPLIER)
+    def parse_array(x):
+        """
+        Parses an array (or Series, or list) of prices into an
+        int64 array. Floats are truncated in the same manner as
+        parse, and integers are assumed to be parsed already.
+        """
+        x = np.asarray(x)
+        if x.dtype.kind in "iu":
+            return x.astype(np.int64)
+        return (
+            x.astype(np.float64) * PriceParser.PRICE_MULTIPLIER
+        ).astype(np.int64)
 
     """Display Methods. Multiplies a float out into an int if needed."""
 
     @staticmethod
-    @dispatch(int_t)
-    def display(x):  # flake8: noqa
-        return round(x / PriceParser.PRICE_MULTIPLIER, 2)
+    def display(x, dp=2):
+        if isinstance(x, int_t):
+            return round(x / PriceParser.PRICE_MULTIPLIER, dp)
+        if isinstance(x, float):
+            return round(x, dp)
+        raise NotImplementedError(
+            "Could not find signature for display: <%s>" % type(x).__name__
+        )
 
     @staticmethod
-    @dispatch(float)
-    def display(x):  # flake8: noqa
-        return round(x, 2)
+    def display_array(x, dp=2):
+        """
+        Displays an array of prices as a float64 array, rounded
+        to dp decimal places.
 
-    @staticmethod
-    @dispatch(int_t, int)
-    def display(x, dp):  # flake8: noqa
-        return round(x / PriceParser.PRICE_MULTIPLIER, dp)
-
-    @staticmethod
-    @dispatch(float, int)
-    def display(x, dp):  # flake8: noqa
-        return round(x, dp)
+        Parsed (integer) prices give exactly the same values as
+        display, being rounded with integer arithmetic. Exact ties
+        and very large prices, for which the rounding of the float
+        division may differ, fall back on display. Float prices
+        are rounded with np.round, which may differ from display
+        at ties.
+        """
+        x = np.asarray(x)
+        if x.dtype.kind not in "iu":
+            return np.round(x.astype(np.float64), dp)
+        x = x.astype(np.int64)
+        if dp > 7:
+            return np.array(
+                [PriceParser.display(int(v), dp) for v in x], dtype=np.float64
+            )
+        step = PriceParser.PRICE_MULTIPLIER // 10 ** dp
+        units, remainder = np.divmod(x, step)
+        displayed = (units + (remainder > step // 2)) / float(10 ** dp)
+        is_exact = (step % 2 == 1) | (remainder != step // 2)
+        for i in np.flatnonzero(~is_exact | (np.abs(x) >= 10 ** 15)):
+            displayed[i] = PriceParser.display(int(x[i]), dp)
+        return displayed
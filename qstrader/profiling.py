@@ -1,5 +1,9 @@
+from collections import defaultdict
+from timeit import default_timer
 import time
 
+import pandas as pd
+
 
 def speed(ticks, t0):
     return ticks / (time.time() - t0)
@@ -9,3 +13,106 @@ def s_speed(time_event, ticks, t0):
     sp = speed(ticks, t0)
     s_typ = time_event.typename + "S"
     return "%d %s processed @ %f %s/s" % (ticks, s_typ, sp, s_typ)
+
+
+class SessionProfiler(object):
+    """
+    SessionProfiler records the cumulative wall time and the number
+    of calls of the components of a TradingSession (price handler,
+    strategy, portfolio handler, statistics, execution handler...),
+    broken down by the type of the event being processed.
+
+    Component methods are wrapped with a timer by instrument() for
+    the duration of the session only, and restored afterwards, so
+    that sessions without a profiler carry no overhead at all.
+
+    A call made by a timed method to another timed method of the
+    same object (e.g. the default calculate_signals_batch of a
+    strategy calling its calculate_signals) is not timed again, so
+    that the time of a component is only counted once.
+    """
+    def __init__(self):
+        self.event_type = "-"
+        self.calls = defaultdict(int)
+        self.times = defaultdict(float)
+        self.session_time = 0.0
+        self._instrumented = []
+        # The ids of the objects with a timed method running
+        self._running = set()
+
+    def instrument(self, obj, method_name, component, event_arg=False):
+        """
+        Replaces obj.method_name with a wrapper that records its
+        wall time under the given component name. If event_arg is
+        True, the first argument is the event being processed and
+        calls made while it runs are attributed to its type.
+        """
+        method = getattr(obj, method_name)
+        obj_id = id(obj)
+
+        def timed_method(*args, **kwargs):
+            if obj_id in self._running:
+                return method(*args, **kwargs)
+            if event_arg and args and args[0] is not None:
+                prev_event_type = self.event_type
+                self.event_type = args[0].typename
+            self._running.add(obj_id)
+            t0 = default_timer()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                key = (component, self.event_type)
+                self.times[key] += default_timer() - t0
+                self.calls[key] += 1
+                self._running.discard(obj_id)
+                if event_arg and args and args[0] is not None:
+                    self.event_type = prev_event_type
+
+        # Any attribute set on the instance itself is put back
+        instance_attrs = getattr(obj, "__dict__", {})
+        self._instrumented.append(
+            (obj, method_name, method_name in instance_attrs,
+             instance_attrs.get(method_name))
+        )
+        setattr(obj, method_name, timed_method)
+
+    def restore(self):
+        """
+        Removes all of the timing wrappers set by instrument(),
+        restoring the attributes that they replaced.
+        """
+        for obj, method_name, had_attr, attr in reversed(self._instrumented):
+            if had_attr:
+                setattr(obj, method_name, attr)
+            else:
+                delattr(obj, method_name)
+        self._instrumented = []
+
+    def report(self):
+        """
+        Returns a DataFrame indexed by component and event type
+        with the number of calls, the cumulative and mean wall
+        time (in seconds) and the percentage of the session time.
+        """
+        keys = sorted(self.calls)
+        df = pd.DataFrame(
+            {
+                "calls": [self.calls[key] for key in keys],
+                "total_time": [self.times[key] for key in keys],
+            },
+            index=pd.MultiIndex.from_tuples(
+                keys, names=["component", "event_type"]
+            ),
+            columns=["calls", "total_time"]
+        )
+        df["mean_time"] = df["total_time"] / df["calls"]
+        if self.session_time > 0:
+            df["pct_session"] = 100.0 * df["total_time"] / self.session_time
+        else:
+            df["pct_session"] = 0.0
+        return df
+
+    def __str__(self):
+        return "Session time: %0.3fs\n%s" % (
+            self.session_time, self.report().to_string()
+        )
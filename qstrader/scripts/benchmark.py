@@ -0,0 +1,348 @@
+from __future__ import print_function
+
+import click
+
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .. import settings
+from ..event_bus import make_event_bus
+from ..event import EventType
+from ..strategy.base import AbstractStrategy
+from ..trading_session import TradingSession
+from ..price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from ..price_handler.iq_feed_intraday_csv_bar import IQFeedIntradayCsvBarPriceHandler
+from ..price_handler.historic_csv_tick import HistoricCSVTickPriceHandler
+from ..price_handler.generic import GenericPriceHandler
+from ..price_handler.iterator.pandas import PandasBarEventIterator, PandasTickEventIterator
+
+
+class CountingStrategy(AbstractStrategy):
+    """
+    A trivial strategy which never trades and only counts the
+    price events it receives, so that the benchmark measures
+    the engine rather than the strategy.
+    """
+    def __init__(self):
+        self.nb_events = 0
+
+    def calculate_signals(self, event):
+        if event.type in (EventType.TICK, EventType.BAR):
+            self.nb_events += 1
+
+
+def synthetic_tickers(nb_tickers):
+    return ["SYN%03d" % i for i in range(nb_tickers)]
+
+
+def random_walk(nb_prices, init_price=100.0):
+    """
+    Returns a geometric random walk of nb_prices positive prices.
+    """
+    returns = np.random.normal(0.0, 0.01, nb_prices)
+    return init_price * np.exp(np.cumsum(returns))
+
+
+def synthetic_bars(index):
+    """
+    Returns a DataFrame of random OHLCV bars for the given index.
+    """
+    close = random_walk(len(index))
+    spread = close * np.abs(np.random.normal(0.0, 0.005, len(index)))
+    df = pd.DataFrame({
+        "Open": close + np.random.uniform(-0.5, 0.5, len(index)) * spread,
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": np.random.randint(1000, 1000000, len(index)),
+        "Adj Close": close,
+    }, index=index, columns=[
+        "Open", "High", "Low", "Close", "Volume", "Adj Close"
+    ])
+    return df.round(6)
+
+
+def synthetic_ticks(index):
+    """
+    Returns a DataFrame of random bid/ask ticks for the given index.
+    """
+    mid = random_walk(len(index))
+    df = pd.DataFrame({
+        "Bid": mid - 0.01, "Ask": mid + 0.01
+    }, index=index, columns=["Bid", "Ask"])
+    return df.round(5)
+
+
+def bar_index(nb_bars, freq):
+    if freq == "daily":
+        return pd.bdate_range("2000-01-03", periods=nb_bars, name="Date")
+    else:
+        return pd.date_range(
+            "2016-01-04 09:31:00", periods=nb_bars, freq="min", name="Date"
+        )
+
+
+def tick_index(nb_ticks):
+    return pd.date_range(
+        "2016-02-01 00:00:00", periods=nb_ticks, freq="250ms", name="Time"
+    )
+
+
+def write_yahoo_universe(csv_dir, tickers, nb_bars):
+    """
+    Writes one Yahoo Finance daily OHLCV CSV file per ticker.
+    """
+    for ticker in tickers:
+        df = synthetic_bars(bar_index(nb_bars, "daily"))
+        df.to_csv(
+            os.path.join(csv_dir, "%s.csv" % ticker),
+            date_format="%Y-%m-%d"
+        )
+
+
+def write_iqfeed_universe(csv_dir, tickers, nb_bars):
+    """
+    Writes one DTN IQFeed minutely OHLCVI CSV file per ticker.
+    """
+    for ticker in tickers:
+        df = synthetic_bars(bar_index(nb_bars, "minute"))
+        df["OpenInterest"] = 0
+        df[["Open", "Low", "High", "Close", "Volume", "OpenInterest"]].to_csv(
+            os.path.join(csv_dir, "%s.csv" % ticker),
+            header=False, date_format="%Y-%m-%d %H:%M:%S"
+        )
+
+
+def write_tick_universe(csv_dir, tickers, nb_ticks):
+    """
+    Writes one tick CSV file (ticker, time, bid, ask) per ticker.
+    """
+    for ticker in tickers:
+        df = synthetic_ticks(tick_index(nb_ticks))
+        df.insert(0, "Ticker", ticker)
+        df = df.reset_index()[["Ticker", "Time", "Bid", "Ask"]]
+        df["Time"] = df["Time"].dt.strftime("%d.%m.%Y %H:%M:%S.%f").str[:-3]
+        df.to_csv(
+            os.path.join(csv_dir, "%s.csv" % ticker),
+            index=False, float_format="%0.5f"
+        )
+
+
+def generate_universe(data_dir, nb_tickers, nb_bars, nb_ticks, seed):
+    """
+    Generates the synthetic Yahoo, IQFeed and tick universes of
+    nb_tickers tickers into sub-directories of data_dir.
+    """
+    np.random.seed(seed)
+    tickers = synthetic_tickers(nb_tickers)
+    writers = [
+        ("yahoo", write_yahoo_universe, nb_bars),
+        ("iqfeed", write_iqfeed_universe, nb_bars),
+        ("tick", write_tick_universe, nb_ticks),
+    ]
+    for sub_dir, writer, size in writers:
+        csv_dir = os.path.join(data_dir, sub_dir)
+        if not os.path.exists(csv_dir):
+            os.makedirs(csv_dir)
+        writer(csv_dir, tickers, size)
+    return tickers
+
+
+def create_price_handler(handler, data_dir, events_queue, tickers, nb_bars, nb_ticks, merge):
+    """
+    Creates the price handler to be benchmarked. As the pandas
+    iterators stream a single instrument, the generic handlers
+    are given one ticker with as many rows as the whole CSV
+    universe, so that all handlers process the same number of
+    events.
+    """
+    if handler == "yahoo":
+        return YahooDailyCsvBarPriceHandler(
+            os.path.join(data_dir, "yahoo"), events_queue, tickers,
+            merge=merge
+        )
+    elif handler == "iqfeed":
+        return IQFeedIntradayCsvBarPriceHandler(
+            os.path.join(data_dir, "iqfeed"), events_queue, tickers,
+            merge=merge
+        )
+    elif handler == "tick":
+        return HistoricCSVTickPriceHandler(
+            os.path.join(data_dir, "tick"), events_queue, tickers,
+            merge=merge
+        )
+    elif handler == "pandas_bar":
+        df = synthetic_bars(bar_index(len(tickers) * nb_bars, "daily"))
+        return GenericPriceHandler(
+            events_queue, PandasBarEventIterator(df, 86400, tickers[0])
+        )
+    elif handler == "pandas_tick":
+        df = synthetic_ticks(tick_index(len(tickers) * nb_ticks))
+        return GenericPriceHandler(
+            events_queue, PandasTickEventIterator(df, tickers[0])
+        )
+    else:
+        raise NotImplementedError("Unsupported price handler '%s'" % handler)
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of the current process
+    in MB, or None where the resource module is unavailable.
+    """
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return maxrss / 1024.0 / 1024.0  # bytes
+    return maxrss / 1024.0  # kilobytes
+
+
+def bench_handler(handler, data_dir, tickers, nb_bars, nb_ticks, merge, config):
+    """
+    Runs a backtest of the CountingStrategy over the synthetic
+    universe with the given price handler and returns a dict
+    of its startup time, run time, events/sec and peak RSS.
+    """
+    events_queue = make_event_bus()
+    t0 = time.time()
+    price_handler = create_price_handler(
+        handler, data_dir, events_queue, tickers, nb_bars, nb_ticks, merge
+    )
+    startup_time = time.time() - t0
+    strategy = CountingStrategy()
+    session = TradingSession(
+        config, strategy, tickers, 100000.0, None, None, events_queue,
+        price_handler=price_handler, title=["Benchmark %s" % handler]
+    )
+    t0 = time.time()
+    session._run_session()
+    run_time = time.time() - t0
+    return {
+        "events": strategy.nb_events,
+        "startup_time": startup_time,
+        "run_time": run_time,
+        "events_per_sec": strategy.nb_events / run_time if run_time > 0 else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _bench_handler_process(conn, args):
+    try:
+        conn.send(bench_handler(*args))
+    except Exception as e:
+        conn.send({"error": repr(e)})
+    finally:
+        conn.close()
+
+
+def bench_handler_isolated(*args):
+    """
+    Runs bench_handler in a child process, so that the peak RSS
+    of each price handler is measured independently.
+    """
+    parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_bench_handler_process, args=(child_conn, args)
+    )
+    process.start()
+    result = parent_conn.recv()
+    process.join()
+    return result
+
+
+HANDLERS = ["yahoo", "iqfeed", "tick", "pandas_bar", "pandas_tick"]
+
+
+def run(output, handlers, nb_tickers, nb_bars, nb_ticks, merge, seed, data_dir, isolate, label, config):
+    """
+    Generates synthetic universes of nb_tickers tickers with
+    nb_bars bars (Yahoo and IQFeed) or nb_ticks ticks each and
+    benchmarks a TradingSession over them with every one of
+    the given price handlers.
+
+    The results are saved to output as JSON, so that the
+    throughput of different revisions can be compared on the
+    same machine, and returned as a dict.
+    """
+    if config is None:
+        config = settings.DEFAULT
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        if data_dir == '':
+            data_dir = os.path.join(tmp_dir, "data")
+        data_dir = os.path.expanduser(data_dir)
+        print("Generating synthetic universe in '%s'" % data_dir)
+        tickers = generate_universe(data_dir, nb_tickers, nb_bars, nb_ticks, seed)
+
+        # The session output (trade logs...) is kept out of the way
+        bench_config = config.copy()
+        bench_config.OUTPUT_DIR = tmp_dir
+
+        bench = bench_handler_isolated if isolate else bench_handler
+        results = {}
+        for handler in handlers:
+            print("Benchmarking '%s' price handler" % handler)
+            results[handler] = bench(
+                handler, data_dir, tickers, nb_bars, nb_ticks, merge,
+                bench_config
+            )
+            print(results[handler])
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    report = {
+        "label": label,
+        "date": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "parameters": {
+            "nb_tickers": nb_tickers, "nb_bars": nb_bars,
+            "nb_ticks": nb_ticks, "merge": merge, "seed": seed,
+        },
+        "results": results,
+    }
+    if output != '':
+        with open(os.path.expanduser(output), "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print("Save benchmark to '%s'" % output)
+    return report
+
+
+@click.command()
+@click.option('--output', default='benchmark.json', help='JSON output file')
+@click.option('--handler', 'handlers', multiple=True, type=click.Choice(HANDLERS), help='Price handler to benchmark (all by default)')
+@click.option('--tickers', 'nb_tickers', default=10, help='Number of tickers')
+@click.option('--bars', 'nb_bars', default=2500, help='Number of bars per ticker')
+@click.option('--ticks', 'nb_ticks', default=10000, help='Number of ticks per ticker')
+@click.option('--merge', default='sort', type=click.Choice(['sort', 'heap']), help='Merge mode of the CSV price handlers')
+@click.option('--seed', default=42, help='Seed of the synthetic universe')
+@click.option('--data_dir', default='', help='Directory of the synthetic CSV files (temporary by default)')
+@click.option('--isolate/--no-isolate', default=True, help='Run each handler in its own process')
+@click.option('--label', default='', help='Label of the benchmarked revision')
+def main(output, handlers, nb_tickers, nb_bars, nb_ticks, merge, seed, data_dir, isolate, label, config=None):
+    return run(
+        output, list(handlers) or HANDLERS, nb_tickers, nb_bars, nb_ticks,
+        merge, seed, data_dir, isolate, label, config=config
+    )
+
+
+if __name__ == "__main__":
+    main()
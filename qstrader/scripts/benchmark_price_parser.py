@@ -0,0 +1,113 @@
+from __future__ import division, print_function
+
+import click
+
+import json
+import os
+import timeit
+import numpy as np
+from multipledispatch import dispatch
+
+from .. import settings
+from ..price_parser import PriceParser, int_t
+
+
+# The former multiple dispatch implementation of PriceParser.parse
+# and PriceParser.display, which the benchmark compares against
+
+
+@dispatch(int_t)
+def dispatch_parse(x):  # noqa: F811
+    return x
+
+
+@dispatch(float)
+def dispatch_parse(x):  # noqa: F811
+    return int(x * PriceParser.PRICE_MULTIPLIER)
+
+
+@dispatch(int_t)
+def dispatch_display(x):  # noqa: F811
+    return round(x / PriceParser.PRICE_MULTIPLIER, 2)
+
+
+def best_time(func, repeat=3):
+    """
+    Returns the best wall clock time of repeat calls of func.
+    """
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def run(output, nb_prices, seed, config):
+    """
+    Times the conversion of nb_prices random prices with the
+    multiple dispatch implementation of PriceParser, the scalar
+    PriceParser methods and the array methods.
+
+    The timings (in seconds) and speedups over the multiple
+    dispatch implementation are saved to output as JSON and
+    returned as a dict.
+    """
+    if config is None:
+        config = settings.DEFAULT
+
+    np.random.seed(seed)
+    prices = np.round(np.random.uniform(1.0, 1000.0, nb_prices), 2)
+    float_prices = prices.tolist()
+    int_prices = PriceParser.parse_array(prices)
+    py_int_prices = int_prices.tolist()
+
+    results = {
+        "parse_dispatch": best_time(
+            lambda: [dispatch_parse(x) for x in float_prices]
+        ),
+        "parse_scalar": best_time(
+            lambda: [PriceParser.parse(x) for x in float_prices]
+        ),
+        "parse_array": best_time(
+            lambda: PriceParser.parse_array(prices)
+        ),
+        "display_dispatch": best_time(
+            lambda: [dispatch_display(x) for x in py_int_prices]
+        ),
+        "display_scalar": best_time(
+            lambda: [PriceParser.display(x) for x in py_int_prices]
+        ),
+        "display_array": best_time(
+            lambda: PriceParser.display_array(int_prices)
+        ),
+    }
+    speedups = {}
+    for name in ["parse", "display"]:
+        for variant in ["scalar", "array"]:
+            speedups["%s_%s" % (name, variant)] = (
+                results["%s_dispatch" % name] /
+                results["%s_%s" % (name, variant)]
+            )
+    for name, seconds in sorted(results.items()):
+        print("%s: %0.4fs" % (name, seconds))
+    for name, speedup in sorted(speedups.items()):
+        print("%s speedup: %0.1fx" % (name, speedup))
+
+    report = {
+        "parameters": {"nb_prices": nb_prices, "seed": seed},
+        "results": results,
+        "speedups": speedups,
+    }
+    if output != '':
+        with open(os.path.expanduser(output), "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print("Save benchmark to '%s'" % output)
+    return report
+
+
+@click.command()
+@click.option('--output', default='', help='JSON output file')
+@click.option('--prices', 'nb_prices', default=1000000, help='Number of prices to convert')
+@click.option('--seed', default=42, help='Seed of the prices')
+def main(output, nb_prices, seed, config=None):
+    return run(output, nb_prices, seed, config=config)
+
+
+if __name__ == "__main__":
+    main()
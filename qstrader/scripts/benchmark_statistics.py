@@ -0,0 +1,80 @@
+from __future__ import print_function
+
+import click
+
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from .. import settings
+from ..statistics import performance as perf
+
+
+def synthetic_equity(nb_points, seed):
+    """
+    Returns a random minutely equity curve of nb_points
+    points and its returns.
+    """
+    np.random.seed(seed)
+    index = pd.date_range("2005-01-03 09:30", periods=nb_points, freq="min")
+    returns = pd.Series(np.random.normal(0.0, 0.0005, nb_points), index=index)
+    returns.iloc[0] = 0.0
+    equity = 100000.0 * np.exp(np.log(1 + returns).cumsum())
+    return equity, returns
+
+
+def timed(func, *args):
+    """
+    Returns the wall clock time of a call of func.
+    """
+    start = time.time()
+    func(*args)
+    return time.time() - start
+
+
+def run(output, nb_points, seed, config):
+    """
+    Times the drawdown and return aggregation functions of
+    the tearsheet on a random equity curve of nb_points points
+    (a million by default, about ten years of minutely bars).
+
+    The timings are saved to output as JSON and returned as a dict.
+    """
+    if config is None:
+        config = settings.DEFAULT
+
+    equity, returns = synthetic_equity(nb_points, seed)
+    cum_returns = np.exp(np.log(1 + returns).cumsum())
+    results = {
+        "create_drawdowns": timed(perf.create_drawdowns, cum_returns),
+    }
+    for convert_to in ["weekly", "monthly", "yearly"]:
+        results["aggregate_returns_%s" % convert_to] = timed(
+            perf.aggregate_returns, returns, convert_to
+        )
+    for name, seconds in sorted(results.items()):
+        print("%s: %0.3fs" % (name, seconds))
+
+    report = {
+        "parameters": {"nb_points": nb_points, "seed": seed},
+        "results": results,
+    }
+    if output != '':
+        with open(os.path.expanduser(output), "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print("Save benchmark to '%s'" % output)
+    return report
+
+
+@click.command()
+@click.option('--output', default='', help='JSON output file')
+@click.option('--points', 'nb_points', default=1000000, help='Number of points of the equity curve')
+@click.option('--seed', default=42, help='Seed of the equity curve')
+def main(output, nb_points, seed, config=None):
+    return run(output, nb_points, seed, config=config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+from __future__ import print_function
+
+import click
+
+import itertools
+import os
+from .. import settings
+from ..price_handler.historic_csv_tick import HistoricCSVTickPriceHandler
+from ..price_handler.tick_store import write_tick_store
+
+
+def ticker_csv_files(csv_dir, ticker):
+    """
+    Returns the list of tick CSV files of a ticker, which is either
+    the single "GOOG.csv" file when present or otherwise the daily
+    "GOOG_20140101.csv" files in date order.
+    """
+    csv_file = os.path.join(csv_dir, "%s.csv" % ticker)
+    if os.path.exists(csv_file):
+        return [csv_file]
+    return sorted(
+        os.path.join(csv_dir, fname) for fname in os.listdir(csv_dir)
+        if fname.startswith("%s_" % ticker) and fname.endswith(".csv")
+    )
+
+
+def run(csv_dir, store_dir, tickers, chunksize, config):
+    """
+    Converts the tick CSV files of each ticker into the
+    memory-mapped tick store read by MmapTickPriceHandler.
+
+    Returns a dictionary of the number of ticks written per ticker.
+    """
+    if config is None:
+        config = settings.DEFAULT
+
+    if csv_dir == '':
+        csv_dir = config.CSV_DATA_DIR
+    csv_dir = os.path.expanduser(csv_dir)
+
+    if store_dir == '':
+        store_dir = os.path.join(csv_dir, "tick_store")
+
+    nb_ticks = {}
+    for ticker in tickers:
+        csv_files = ticker_csv_files(csv_dir, ticker)
+        if len(csv_files) == 0:
+            print("No tick CSV file found for '%s'" % ticker)
+            continue
+        chunks = itertools.chain.from_iterable(
+            HistoricCSVTickPriceHandler.read_price_csv(
+                csv_file, chunksize=chunksize
+            )
+            for csv_file in csv_files
+        )
+        nb_ticks[ticker] = write_tick_store(chunks, store_dir, ticker)
+        print(
+            "Wrote %d '%s' ticks from %d file(s) to '%s'" % (
+                nb_ticks[ticker], ticker, len(csv_files), store_dir
+            )
+        )
+    return nb_ticks
+
+
+@click.command()
+@click.option('--csv_dir', default='', help='Tick CSV data directory (CSV_DATA_DIR)')
+@click.option('--store_dir', default='', help='Tick store directory (CSV_DATA_DIR/tick_store)')
+@click.option('--tickers', default='GOOG', help='Comma separated ticker symbols (GOOG,MSFT...)')
+@click.option('--chunksize', default=100000, help='Number of CSV rows converted at a time')
+def main(csv_dir, store_dir, tickers, chunksize, config=None):
+    return run(csv_dir, store_dir, tickers.split(","), chunksize, config=config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+from __future__ import print_function
+
+import click
+
+import os
+from .. import settings
+from ..price_handler.cache import PriceCsvCache
+from ..price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from ..price_handler.iq_feed_intraday_csv_bar import IQFeedIntradayCsvBarPriceHandler
+from ..price_handler.historic_csv_tick import HistoricCSVTickPriceHandler
+
+
+PRICE_HANDLERS = {
+    "yahoo": YahooDailyCsvBarPriceHandler,
+    "iqfeed": IQFeedIntradayCsvBarPriceHandler,
+    "tick": HistoricCSVTickPriceHandler,
+}
+
+
+def run(csv_dir, cache_dir, handler, config):
+    """
+    Parses every CSV file in csv_dir with the reader of the
+    given price handler and stores the result in the price
+    cache, so that subsequent sessions skip the CSV parsing.
+
+    Returns the number of files that were cached.
+    """
+    if config is None:
+        config = settings.DEFAULT
+
+    if csv_dir == '':
+        csv_dir = config.CSV_DATA_DIR
+    csv_dir = os.path.expanduser(csv_dir)
+
+    if cache_dir == '':
+        cache_dir = config.get("CACHE_DIR")
+    if not cache_dir:
+        raise ValueError(
+            "No price cache directory, pass --cache_dir or "
+            "set CACHE_DIR in the configuration"
+        )
+
+    handler_cls = PRICE_HANDLERS[handler]
+    cache = PriceCsvCache(cache_dir)
+    nb_files = 0
+    for fname in sorted(os.listdir(csv_dir)):
+        if not fname.lower().endswith(".csv"):
+            continue
+        csv_path = os.path.join(csv_dir, fname)
+        try:
+            cache.read_csv(
+                csv_path, handler_cls.__name__,
+                handler_cls.read_price_csv
+            )
+        except (ValueError, TypeError) as e:
+            print("Could not cache '%s': %s" % (csv_path, e))
+        else:
+            print("Cached '%s'" % csv_path)
+            nb_files += 1
+    return nb_files
+
+
+@click.command()
+@click.option('--csv_dir', default='', help='CSV data directory (CSV_DATA_DIR)')
+@click.option('--cache_dir', default='', help='Price cache directory (CACHE_DIR)')
+@click.option('--handler', default='yahoo', type=click.Choice(sorted(PRICE_HANDLERS)), help='Price handler whose CSV format is used')
+def main(csv_dir, cache_dir, handler, config=None):
+    return run(csv_dir, cache_dir, handler, config=config)
+
+
+if __name__ == "__main__":
+    main()
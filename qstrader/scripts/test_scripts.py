@@ -1,10 +1,18 @@
 """
 Test scripts
 """
+import json
+import os
+import shutil
+import tempfile
 import unittest
 
 from qstrader import settings
+import qstrader.scripts.benchmark
+import qstrader.scripts.benchmark_price_parser
+import qstrader.scripts.benchmark_statistics
 import qstrader.scripts.generate_simulated_prices
+import qstrader.scripts.prewarm_price_cache
 
 
 class TestScripts(unittest.TestCase):
@@ -35,3 +43,95 @@ class TestScripts(unittest.TestCase):
             3,  # nb_days (number of days of data to create)
             config=self.config
         )
+
+    def test_prewarm_price_cache(self):
+        """
+        Test prewarm_price_cache
+        """
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            csv_dir = os.path.join(tmp_dir, "csv")
+            os.makedirs(csv_dir)
+            for ticker in ["SPY", "AGG"]:
+                shutil.copy(
+                    os.path.join(self.config.CSV_DATA_DIR, "%s.csv" % ticker),
+                    csv_dir
+                )
+            nb_files = qstrader.scripts.prewarm_price_cache.run(
+                csv_dir,  # csv_dir
+                os.path.join(tmp_dir, "cache"),  # cache_dir
+                "yahoo",  # handler
+                config=self.config
+            )
+            self.assertEqual(nb_files, 2)
+            self.assertEqual(len(os.listdir(os.path.join(tmp_dir, "cache"))), 2)
+            # The price cache is opt-in, with no default directory
+            self.assertRaises(
+                ValueError, qstrader.scripts.prewarm_price_cache.run,
+                csv_dir, '', "yahoo", config=self.config
+            )
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_benchmark_price_parser(self):
+        """
+        Test benchmark_price_parser
+        """
+        report = qstrader.scripts.benchmark_price_parser.run(
+            '',  # output
+            1000,  # nb_prices
+            42,  # seed
+            config=self.config
+        )
+        self.assertEqual(
+            sorted(report["speedups"]),
+            ["display_array", "display_scalar", "parse_array", "parse_scalar"]
+        )
+
+    def test_benchmark_statistics(self):
+        """
+        Test benchmark_statistics
+        """
+        report = qstrader.scripts.benchmark_statistics.run(
+            '',  # output
+            5000,  # nb_points
+            42,  # seed
+            config=self.config
+        )
+        self.assertEqual(
+            sorted(report["results"]),
+            [
+                "aggregate_returns_monthly", "aggregate_returns_weekly",
+                "aggregate_returns_yearly", "create_drawdowns"
+            ]
+        )
+
+    def test_benchmark(self):
+        """
+        Test benchmark
+        """
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            output = os.path.join(tmp_dir, "benchmark.json")
+            report = qstrader.scripts.benchmark.run(
+                output,  # output
+                qstrader.scripts.benchmark.HANDLERS,  # handlers
+                2,  # nb_tickers
+                20,  # nb_bars
+                30,  # nb_ticks
+                "sort",  # merge
+                42,  # seed
+                os.path.join(tmp_dir, "data"),  # data_dir
+                False,  # isolate
+                "test",  # label
+                config=self.config
+            )
+            with open(output) as f:
+                self.assertEqual(json.load(f), report)
+            results = report["results"]
+            for handler in ["yahoo", "iqfeed", "pandas_bar"]:
+                self.assertEqual(results[handler]["events"], 40)
+            for handler in ["tick", "pandas_tick"]:
+                self.assertEqual(results[handler]["events"], 60)
+        finally:
+            shutil.rmtree(tmp_dir)
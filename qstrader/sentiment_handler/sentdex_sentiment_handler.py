@@ -1,5 +1,7 @@
+import datetime
 import os
 
+import numpy as np
 import pandas as pd
 
 from .base import AbstractSentimentHandler
@@ -16,6 +18,10 @@ class SentdexSentimentHandler(AbstractSentimentHandler):
     Hence in order to avoid implicit lookahead bias a specific
     method is provided "stream_sentiment_events_on_date" that only
     allows sentiment signals to be retrieved for a particular date.
+
+    The rows of the CSV file are grouped by date when it is loaded,
+    and the sentiment of a date is streamed once, on the first call
+    of stream_next for that date.
     """
     def __init__(
         self, csv_dir, filename,
@@ -29,6 +35,8 @@ class SentdexSentimentHandler(AbstractSentimentHandler):
         self.start_date = start_date
         self.end_date = end_date
         self.sent_df = self._open_sentiment_csv()
+        self._index_sentiment()
+        self.last_date = None
 
     def _open_sentiment_csv(self):
         """
@@ -42,26 +50,53 @@ class SentdexSentimentHandler(AbstractSentimentHandler):
             header=0, index_col=0,
             names=("Date", "Ticker", "Sentiment")
         )
+        sent_df = sent_df.sort_index(kind="mergesort")
         if self.start_date is not None:
-            sent_df = sent_df[self.start_date.strftime("%Y-%m-%d"):]
+            sent_df = sent_df.loc[self.start_date.strftime("%Y-%m-%d"):]
         if self.end_date is not None:
-            sent_df = sent_df[:self.end_date.strftime("%Y-%m-%d")]
+            sent_df = sent_df.loc[:self.end_date.strftime("%Y-%m-%d")]
         if self.tickers is not None:
             sent_df = sent_df[sent_df["Ticker"].isin(self.tickers)]
         return sent_df
 
+    def _index_sentiment(self):
+        """
+        Groups the (date sorted) rows of the sentiment DataFrame
+        by date, mapping each date to the range of its rows in
+        the ticker and sentiment lists.
+        """
+        days = self.sent_df.index.values.astype("datetime64[D]")
+        is_start = np.ones(len(days), dtype=bool)
+        is_start[1:] = days[1:] != days[:-1]
+        starts = np.flatnonzero(is_start)
+        ends = np.append(starts[1:], len(days))
+        self.sent_tickers = self.sent_df["Ticker"].tolist()
+        self.sentiments = self.sent_df["Sentiment"].tolist()
+        self.date_index = dict(
+            (day, (start, end))
+            for day, start, end in zip(
+                days[starts].astype(object), starts.tolist(), ends.tolist()
+            )
+        )
+
     def stream_next(self, stream_date=None):
         """
         Stream the next set of ticker sentiment values into
-        SentimentEvent objects.
+        SentimentEvent objects, once per date.
         """
         if stream_date is not None:
-            stream_date_str = stream_date.strftime("%Y-%m-%d")
-            date_df = self.sent_df.ix[stream_date_str:stream_date_str]
-            for row in date_df.iterrows():
+            if isinstance(stream_date, datetime.datetime):
+                date = stream_date.date()
+            else:
+                date = stream_date
+            if date == self.last_date:
+                return
+            self.last_date = date
+            start, end = self.date_index.get(date, (0, 0))
+            for i in range(start, end):
                 sev = SentimentEvent(
-                    stream_date, row[1]["Ticker"],
-                    row[1]["Sentiment"]
+                    stream_date, self.sent_tickers[i],
+                    self.sentiments[i]
                 )
                 self.events_queue.put(sev)
         else:
@@ -0,0 +1,235 @@
+from .base import AbstractStatistics
+from ..compat import pickle
+from ..price_parser import PriceParser
+
+import datetime
+import os
+import numpy as np
+
+
+class OnlineStatistics(AbstractStatistics):
+    """
+    OnlineStatistics keeps streaming statistics of the equity
+    curve in constant memory, so that it can be used for live
+    sessions of any length and every metric can be read in O(1)
+    at any time while the session is running.
+
+    Statistics included are Sharpe Ratio (over the whole session
+    and over a rolling window), Drawdown, Max Drawdown and
+    Drawdown Duration, computed from the returns of the equity
+    between two distinct timestamps, as TearsheetStatistics does.
+
+    The mean and variance of the returns are kept with Welford's
+    algorithm and those of the rolling window with its sliding
+    window variant, over a ring buffer of the last window returns
+    from which they are recomputed whenever it wraps around, so
+    that rounding errors cannot accumulate. No equity curve is
+    stored.
+
+    As with TearsheetStatistics, the last equity given for a
+    timestamp is the one kept: an update with the same timestamp
+    as the previous one rolls the statistics back to their state
+    before that timestamp and replaces its equity point.
+    """
+
+    # The scalar state which is rolled back by a repeated timestamp
+    _rollback_fields = (
+        "equity", "hwm", "drawdown", "max_drawdown",
+        "drawdown_duration", "max_drawdown_duration",
+        "count", "mean", "m2", "window_pos", "window_count",
+        "window_mean", "window_m2"
+    )
+
+    def __init__(
+        self, config, portfolio_handler,
+        periods=252, window=None
+    ):
+        """
+        Takes in a portfolio handler.
+
+        Parameters:
+        periods - The number of periods per year, used to
+            annualise the Sharpe ratios.
+        window - The number of returns of the rolling Sharpe
+            ratio, periods by default.
+        """
+        self.config = config
+        self.portfolio_handler = portfolio_handler
+        self.periods = periods
+        self.window = periods if window is None else window
+
+        self.timestamp = None
+        self.equity = None
+        self.hwm = None
+        self.drawdown = 0.0
+        self.max_drawdown = 0.0
+        self.drawdown_duration = 0
+        self.max_drawdown_duration = 0
+
+        # Welford accumulators of all of the returns
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+        # Ring buffer and accumulators of the last window returns
+        self.returns_window = np.zeros(self.window)
+        self.window_pos = 0
+        self.window_count = 0
+        self.window_mean = 0.0
+        self.window_m2 = 0.0
+
+        # The state before the last timestamp, and the ring
+        # buffer return which its point replaced
+        self._previous_state = None
+        self._previous_window_return = 0.0
+
+    def _save_state(self):
+        self._previous_state = tuple(
+            getattr(self, name) for name in self._rollback_fields
+        )
+        self._previous_window_return = self.returns_window[self.window_pos]
+
+    def _restore_state(self):
+        for name, value in zip(self._rollback_fields, self._previous_state):
+            setattr(self, name, value)
+        self.returns_window[self.window_pos] = self._previous_window_return
+
+    def update(self, timestamp, portfolio_handler):
+        """
+        Update all statistics with the equity of the portfolio
+        at timestamp. A repeated timestamp replaces the equity
+        point of the previous update, rather than adding one.
+        """
+        if self._previous_state is not None and timestamp == self.timestamp:
+            self._restore_state()
+        else:
+            self.timestamp = timestamp
+            self._save_state()
+        equity = PriceParser.display(portfolio_handler.portfolio.equity)
+        if self.equity is None:
+            ret = 0.0
+            self.hwm = equity
+        else:
+            ret = equity / self.equity - 1.0
+        self.equity = equity
+        self._update_returns(ret)
+        self._update_rolling_returns(ret)
+        self._update_drawdown(equity)
+
+    def _update_returns(self, ret):
+        self.count += 1
+        delta = ret - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (ret - self.mean)
+
+    def _update_rolling_returns(self, ret):
+        """
+        Adds ret to the ring buffer, replacing the oldest
+        return once the window is full. The mean and M2 of the
+        window are recomputed from the buffer each time that it
+        wraps around (an amortised O(1) cost per update).
+        """
+        if self.window_count < self.window:
+            self.window_count += 1
+            delta = ret - self.window_mean
+            self.window_mean += delta / self.window_count
+            self.window_m2 += delta * (ret - self.window_mean)
+        else:
+            old_ret = self.returns_window[self.window_pos]
+            old_mean = self.window_mean
+            self.window_mean += (ret - old_ret) / self.window
+            self.window_m2 += (ret - old_ret) * (
+                ret - self.window_mean + old_ret - old_mean
+            )
+        self.returns_window[self.window_pos] = ret
+        self.window_pos = (self.window_pos + 1) % self.window
+        if self.window_pos == 0:
+            self.window_mean = self.returns_window.mean()
+            self.window_m2 = (
+                (self.returns_window - self.window_mean) ** 2
+            ).sum()
+
+    def _update_drawdown(self, equity):
+        if equity >= self.hwm:
+            self.hwm = equity
+            self.drawdown = 0.0
+            self.drawdown_duration = 0
+        else:
+            self.drawdown = (self.hwm - equity) / self.hwm
+            self.drawdown_duration += 1
+            self.max_drawdown = max(self.max_drawdown, self.drawdown)
+            self.max_drawdown_duration = max(
+                self.max_drawdown_duration, self.drawdown_duration
+            )
+
+    def _annualised_sharpe(self, mean, m2, count):
+        if count < 2 or m2 <= 0.0:
+            return np.nan
+        return np.sqrt(self.periods) * mean / np.sqrt(m2 / (count - 1))
+
+    @property
+    def sharpe(self):
+        """
+        The annualised Sharpe ratio of all of the returns.
+        """
+        return self._annualised_sharpe(self.mean, self.m2, self.count)
+
+    @property
+    def rolling_sharpe(self):
+        """
+        The annualised Sharpe ratio of the last window returns,
+        NaN until window returns have been seen.
+        """
+        if self.window_count < self.window:
+            return np.nan
+        return self._annualised_sharpe(
+            self.window_mean, self.window_m2, self.window_count
+        )
+
+    @property
+    def volatility(self):
+        """
+        The annualised standard deviation of the returns.
+        """
+        if self.count < 2:
+            return np.nan
+        return np.sqrt(self.periods * self.m2 / (self.count - 1))
+
+    def get_results(self):
+        """
+        Return a dict with the current value of every statistic.
+        """
+        statistics = {}
+        statistics["sharpe"] = self.sharpe
+        statistics["rolling_sharpe"] = self.rolling_sharpe
+        statistics["volatility"] = self.volatility
+        statistics["mean_return"] = self.mean
+        statistics["equity"] = self.equity
+        statistics["hwm"] = self.hwm
+        statistics["drawdown"] = self.drawdown
+        statistics["max_drawdown"] = self.max_drawdown
+        statistics["max_drawdown_pct"] = self.max_drawdown
+        statistics["drawdown_duration"] = self.drawdown_duration
+        statistics["max_drawdown_duration"] = self.max_drawdown_duration
+        return statistics
+
+    def plot_results(self):
+        """
+        No equity curve is kept, so the current statistics
+        are printed instead.
+        """
+        for key, value in sorted(self.get_results().items()):
+            print("%s: %s" % (key, value))
+
+    def get_filename(self, filename=""):
+        if filename == "":
+            now = datetime.datetime.utcnow()
+            filename = "statistics_" + now.strftime("%Y-%m-%d_%H%M%S") + ".pkl"
+            filename = os.path.expanduser(os.path.join(self.config.OUTPUT_DIR, filename))
+        return filename
+
+    def save(self, filename=""):
+        filename = self.get_filename(filename)
+        print("Save results to '%s'" % filename)
+        with open(filename, 'wb') as fd:
+            pickle.dump(self, fd)
@@ -1,4 +1,5 @@
 from .base import AbstractStatistics
+from ..arrays import grow
 from ..price_parser import PriceParser
 
 from matplotlib.ticker import FuncFormatter
@@ -31,10 +32,13 @@ class TearsheetStatistics(AbstractStatistics):
     def __init__(
         self, config, portfolio_handler,
         title=None, benchmark=None, periods=252,
-        rolling_sharpe=False
+        rolling_sharpe=False, capacity=4096
     ):
         """
         Takes in a portfolio handler.
+
+        capacity is the initial number of timestamps for which
+        the equity curves are allocated.
         """
         self.config = config
         self.portfolio_handler = portfolio_handler
@@ -43,29 +47,80 @@ class TearsheetStatistics(AbstractStatistics):
         self.benchmark = benchmark
         self.periods = periods
         self.rolling_sharpe = rolling_sharpe
-        self.equity = {}
-        self.equity_benchmark = {}
         self.log_scale = False
 
+        # The equity and benchmark curves are kept in PriceParser
+        # units in preallocated arrays, doubled in size whenever
+        # needed, and only converted for display in get_results
+        self.nb_updates = 0
+        self.timestamps = np.empty(capacity, dtype="datetime64[ns]")
+        self.equity_values = np.zeros(capacity, dtype=np.int64)
+        self.benchmark_values = np.zeros(capacity, dtype=np.int64)
+
+    def _grow(self, capacity):
+        self.timestamps = grow(self.timestamps, capacity)
+        self.equity_values = grow(self.equity_values, capacity)
+        self.benchmark_values = grow(self.benchmark_values, capacity)
+
     def update(self, timestamp, portfolio_handler):
         """
         Update equity curve and benchmark equity curve that must be tracked
         over time.
+
+        A repeated timestamp overwrites the values of the previous
+        update, so that the curves hold one point per timestamp.
         """
-        self.equity[timestamp] = PriceParser.display(
-            self.portfolio_handler.portfolio.equity
-        )
+        timestamp = np.datetime64(timestamp, "ns")
+        i = self.nb_updates
+        if i > 0 and self.timestamps[i - 1] == timestamp:
+            i -= 1
+        else:
+            if i == len(self.timestamps):
+                self._grow(2 * i)
+            self.timestamps[i] = timestamp
+            self.nb_updates += 1
+        self.equity_values[i] = self.portfolio_handler.portfolio.equity
         if self.benchmark is not None:
-            self.equity_benchmark[timestamp] = PriceParser.display(
-                self.price_handler.get_last_close(self.benchmark)
+            self.benchmark_values[i] = self.price_handler.get_last_close(
+                self.benchmark
             )
 
+    def _get_curve(self, values):
+        """
+        Returns the values of a curve in display units as a
+        Series sorted by timestamp, keeping the last value of
+        any timestamp which was updated more than once.
+        """
+        n = self.nb_updates
+        timestamps = self.timestamps[:n]
+        order = np.argsort(timestamps, kind="mergesort")
+        timestamps = timestamps[order]
+        is_last = np.append(timestamps[1:] != timestamps[:-1], True)
+        return pd.Series(
+            PriceParser.display_array(values[:n][order][is_last]),
+            index=pd.DatetimeIndex(timestamps[is_last])
+        )
+
+    @property
+    def equity(self):
+        """
+        The equity curve, in display units.
+        """
+        return self._get_curve(self.equity_values)
+
+    @property
+    def equity_benchmark(self):
+        """
+        The prices of the benchmark, in display units.
+        """
+        return self._get_curve(self.benchmark_values)
+
     def get_results(self):
         """
         Return a dict with all important results & stats.
         """
         # Equity
-        equity_s = pd.Series(self.equity).sort_index()
+        equity_s = self.equity
 
         # Returns
         returns_s = equity_s.pct_change().fillna(0.0)
@@ -104,7 +159,7 @@ class TearsheetStatistics(AbstractStatistics):
 
         # Benchmark statistics if benchmark ticker specified
         if self.benchmark is not None:
-            equity_b = pd.Series(self.equity_benchmark).sort_index()
+            equity_b = self.equity_benchmark
             returns_b = equity_b.pct_change().fillna(0.0)
             rolling_b = returns_b.rolling(window=self.periods)
             rolling_sharpe_b = np.sqrt(self.periods) * (
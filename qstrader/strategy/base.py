@@ -1,5 +1,7 @@
 from abc import ABCMeta, abstractmethod
 
+from ..event import EventType
+
 
 class AbstractStrategy(object):
     """
@@ -16,6 +18,12 @@ class AbstractStrategy(object):
 
     __metaclass__ = ABCMeta
 
+    # The tickers and the event types that the strategy needs
+    # to receive, None standing for all of them. Strategies
+    # routes events only to the strategies that subscribe to them.
+    subscribed_tickers = None
+    subscribed_event_types = None
+
     @abstractmethod
     def calculate_signals(self, event):
         """
@@ -23,14 +31,133 @@ class AbstractStrategy(object):
         """
         raise NotImplementedError("Should implement calculate_signals()")
 
+    def calculate_signals_batch(self, event):
+        """
+        Provides the mechanisms to calculate the list of signals
+        from a BarBatchEvent, the bars of every ticker that printed
+        at a timestamp. Cross-sectional strategies override it to
+        process the arrays of the batch at once, otherwise each
+        bar is passed on to calculate_signals in turn.
+        """
+        for bev in event.bar_events():
+            self.calculate_signals(bev)
+
 
 class Strategies(AbstractStrategy):
     """
-    Strategies is a collection of strategy
+    Strategies is a collection of strategy.
+
+    Each event is only passed on to the strategies which
+    subscribe to its ticker and its type, in the order in which
+    they were given, through an index of the strategies by ticker
+    built on creation (the subscriptions of the strategies are
+    read then). The strategies to call for each (event type,
+    ticker) pair are then cached, so that dispatching an event
+    does not depend upon the number of strategies that ignore it.
+
+    A BarBatchEvent is passed on as a whole to the strategies
+    which subscribe to bars and override calculate_signals_batch,
+    in order. The bars of the batch are then passed on one at a
+    time, in the order of the batch, to the other strategies
+    subscribing to bars and to their tickers, so that they
+    receive them in the same order as separate BarEvents.
     """
     def __init__(self, *strategies):
         self._lst_strategies = strategies
+        self._routes = {}
+        self._batch_route = None
+
+        # Positions of the strategies subscribing to every
+        # ticker and to each ticker
+        self._all_tickers = []
+        self._by_ticker = {}
+        for i, strategy in enumerate(strategies):
+            tickers = getattr(strategy, "subscribed_tickers", None)
+            if tickers is None:
+                self._all_tickers.append(i)
+            else:
+                for ticker in tickers:
+                    self._by_ticker.setdefault(ticker, []).append(i)
+
+    def _subscribes_to(self, strategy, event_types):
+        subscribed = getattr(strategy, "subscribed_event_types", None)
+        return subscribed is None or any(
+            event_type in subscribed for event_type in event_types
+        )
+
+    def _get_route(self, event_type, ticker):
+        """
+        Returns the strategies subscribing to events of
+        event_type for ticker, in order.
+        """
+        key = (event_type, ticker)
+        route = self._routes.get(key)
+        if route is None:
+            positions = sorted(
+                set(self._all_tickers + self._by_ticker.get(ticker, []))
+            )
+            if event_type == EventType.BAR_BATCH:
+                # The bars of a batch, for the strategies which
+                # do not process batches themselves
+                route = tuple(
+                    self._lst_strategies[i] for i in positions
+                    if self._subscribes_to(
+                        self._lst_strategies[i],
+                        [EventType.BAR, EventType.BAR_BATCH]
+                    ) and not _overrides_batch(self._lst_strategies[i])
+                )
+            else:
+                route = tuple(
+                    self._lst_strategies[i] for i in positions
+                    if self._subscribes_to(self._lst_strategies[i], [event_type])
+                )
+            self._routes[key] = route
+        return route
+
+    def _get_batch_route(self):
+        """
+        Returns the strategies subscribing to bars which
+        override calculate_signals_batch, in order, and whether
+        any other strategy subscribes to bars.
+        """
+        if self._batch_route is None:
+            subscribers = [
+                strategy for strategy in self._lst_strategies
+                if self._subscribes_to(
+                    strategy, [EventType.BAR, EventType.BAR_BATCH]
+                )
+            ]
+            batch_strategies = tuple(
+                strategy for strategy in subscribers
+                if _overrides_batch(strategy)
+            )
+            self._batch_route = (
+                batch_strategies, len(batch_strategies) < len(subscribers)
+            )
+        return self._batch_route
 
     def calculate_signals(self, event):
-        for strategy in self._lst_strategies:
+        for strategy in self._get_route(event.type, event.ticker):
             strategy.calculate_signals(event)
+
+    def calculate_signals_batch(self, event):
+        batch_strategies, passes_bars = self._get_batch_route()
+        for strategy in batch_strategies:
+            strategy.calculate_signals_batch(event)
+        if not passes_bars:
+            return
+        for bev in event.bar_events():
+            for strategy in self._get_route(EventType.BAR_BATCH, bev.ticker):
+                strategy.calculate_signals(bev)
+
+
+def _overrides_batch(strategy):
+    """
+    Returns True if the strategy processes batches itself
+    rather than with AbstractStrategy.calculate_signals_batch.
+    """
+    method = getattr(type(strategy), "calculate_signals_batch", None)
+    return getattr(method, "__func__", method) is not _default_batch
+
+
+_default_batch = AbstractStrategy.__dict__["calculate_signals_batch"]
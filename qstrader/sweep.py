@@ -0,0 +1,166 @@
+from __future__ import print_function
+
+import itertools
+import multiprocessing
+import numbers
+import os
+
+import pandas as pd
+
+from .event_bus import make_event_bus
+from .price_handler.cache import MemoryPriceCache, PriceCsvCache
+from .price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from .trading_session import TradingSession
+
+
+def parameter_grid(param_grid):
+    """
+    Expands a dict mapping parameter names to lists of values
+    into the list of dicts of every combination of those values.
+    """
+    names = sorted(param_grid)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*[param_grid[name] for name in names])
+    ]
+
+
+class ParameterSweep(object):
+    """
+    ParameterSweep runs independent backtests of a strategy over
+    every combination of a grid of parameters, spread across a
+    pool of processes.
+
+    strategy_factory is called as strategy_factory(events_queue,
+    **params) for each combination of the grid and must return
+    the strategy to backtest. It is sent to the worker processes,
+    so it has to be picklable (a class or a module level function,
+    possibly wrapped with functools.partial).
+
+    Each worker parses the price CSV files once into an in-memory
+    price cache, which is then shared by all of the sessions that
+    it runs. The trade log of each run is written to its own
+    OUTPUT_DIR/sweep/<run> directory and no results are plotted.
+    """
+    def __init__(
+        self, config, strategy_factory, param_grid, tickers,
+        equity, start_date=None, end_date=None,
+        title=None, session_kwargs=None
+    ):
+        """
+        session_kwargs are passed on to each TradingSession,
+        e.g. benchmark, position_sizer or risk_manager. Their
+        values must also be picklable.
+        """
+        self.config = config
+        self.strategy_factory = strategy_factory
+        self.param_grid = param_grid
+        self.tickers = tickers
+        self.equity = equity
+        self.start_date = start_date
+        self.end_date = end_date
+        self.title = title
+        self.session_kwargs = session_kwargs or {}
+        self.price_cache = None
+
+    def load_prices(self):
+        """
+        Reads the price CSV files of the tickers into the
+        in-memory price cache of the current process.
+        """
+        cache_dir = getattr(self.config, "CACHE_DIR", None)
+        self.price_cache = MemoryPriceCache(
+            PriceCsvCache(cache_dir) if cache_dir is not None else None
+        )
+        YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, make_event_bus(), self.tickers,
+            price_cache=self.price_cache
+        )
+
+    def run_session(self, run, params):
+        """
+        Backtests the strategy created with params and returns a
+        dict of the parameters and the scalar statistics of the
+        session (Sharpe ratio, max drawdown...).
+        """
+        if self.price_cache is None:
+            self.load_prices()
+        config = self.config.copy()
+        config.OUTPUT_DIR = os.path.join(
+            os.path.expanduser(self.config.OUTPUT_DIR), "sweep", "%d" % run
+        )
+        if not os.path.isdir(config.OUTPUT_DIR):
+            os.makedirs(config.OUTPUT_DIR)
+
+        events_queue = make_event_bus()
+        price_handler = YahooDailyCsvBarPriceHandler(
+            config.CSV_DATA_DIR, events_queue, self.tickers,
+            start_date=self.start_date, end_date=self.end_date,
+            price_cache=self.price_cache
+        )
+        strategy = self.strategy_factory(events_queue, **params)
+        session = TradingSession(
+            config, strategy, self.tickers, self.equity,
+            self.start_date, self.end_date, events_queue,
+            price_handler=price_handler, title=self.title,
+            **self.session_kwargs
+        )
+        results = session.start_trading(testing=True)
+
+        summary = {"run": run}
+        summary.update(params)
+        for key, value in results.items():
+            if isinstance(value, numbers.Number) and key not in summary:
+                summary[key] = value
+        return summary
+
+    def run(self, processes=None):
+        """
+        Runs a session for every combination of the parameter
+        grid on a pool of processes (one per CPU by default) and
+        returns a DataFrame with one row of parameters and
+        statistics per run. With processes=1 the sessions are
+        run one after another in the current process.
+        """
+        grid = parameter_grid(self.param_grid)
+        if processes == 1:
+            summaries = [
+                self.run_session(run, params)
+                for run, params in enumerate(grid)
+            ]
+        else:
+            pool = multiprocessing.Pool(
+                processes, initializer=_init_worker, initargs=(self,)
+            )
+            try:
+                summaries = pool.map(
+                    _run_worker_session, list(enumerate(grid)), chunksize=1
+                )
+            finally:
+                pool.close()
+                pool.join()
+
+        names = sorted(self.param_grid)
+        df = pd.DataFrame(summaries)
+        columns = ["run"] + names + sorted(
+            column for column in df.columns
+            if column != "run" and column not in names
+        )
+        return df[columns].set_index("run")
+
+
+_worker_sweep = None
+
+
+def _init_worker(sweep):
+    """
+    Loads the price data of the sweep once per worker process.
+    """
+    global _worker_sweep
+    _worker_sweep = sweep
+    _worker_sweep.load_prices()
+
+
+def _run_worker_session(run_params):
+    run, params = run_params
+    return _worker_sweep.run_session(run, params)
@@ -0,0 +1,74 @@
+import numpy as np
+
+from .compat import intern
+
+
+class SymbolTable(object):
+    """
+    SymbolTable assigns a dense integer id to every ticker symbol,
+    in the order in which they are first interned (usually when
+    they are subscribed to by a price handler), and keeps it for
+    the whole session, even if the ticker is unsubscribed.
+
+    Events carry the id of their ticker alongside its symbol, so
+    that per-ticker state (prices, positions...) can be kept in
+    numpy arrays indexed by id rather than in dicts keyed by
+    symbol. The symbols themselves are interned strings, so that
+    the remaining symbol comparisons are identity checks.
+    """
+    def __init__(self, symbols=None):
+        """
+        Parameters:
+        symbols - An optional list of ticker symbols to intern,
+            taking the ids 0, 1, 2...
+        """
+        self.ids = {}
+        self.symbols = []
+        if symbols is not None:
+            for symbol in symbols:
+                self.intern(symbol)
+
+    def intern(self, symbol):
+        """
+        Returns the id of a ticker symbol, assigning it the next
+        free id on first use.
+        """
+        ticker_id = self.ids.get(symbol)
+        if ticker_id is None:
+            if isinstance(symbol, str):
+                symbol = intern(symbol)
+            ticker_id = len(self.symbols)
+            self.ids[symbol] = ticker_id
+            self.symbols.append(symbol)
+        return ticker_id
+
+    def intern_many(self, symbols):
+        """
+        Returns an int64 array of the ids of a list of ticker
+        symbols, interning the new ones.
+        """
+        return np.array(
+            [self.intern(symbol) for symbol in symbols], dtype=np.int64
+        )
+
+    def get_id(self, symbol, default=None):
+        """
+        Returns the id of a ticker symbol, or default if the
+        symbol has never been interned.
+        """
+        return self.ids.get(symbol, default)
+
+    def get_symbol(self, ticker_id):
+        """
+        Returns the ticker symbol of an id.
+        """
+        return self.symbols[ticker_id]
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self.ids
+
+    def __iter__(self):
+        return iter(self.symbols)
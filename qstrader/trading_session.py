@@ -1,13 +1,18 @@
 from __future__ import print_function
 from datetime import datetime
+import threading
+from timeit import default_timer
 from .compat import queue
 from .event import EventType
+from .event_bus import DequeEventBus
+from .price_handler.tape import EventTapeWriter
 from .price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
 from .price_parser import PriceParser
+from .profiling import SessionProfiler
 from .position_sizer.fixed import FixedPositionSizer
 from .risk_manager.example import ExampleRiskManager
 from .portfolio_handler import PortfolioHandler
-from .compliance.example import ExampleCompliance
+from .compliance.buffered import BufferedCompliance
 from .execution_handler.ib_simulated import IBSimulatedExecutionHandler
 from .statistics.tearsheet import TearsheetStatistics
 
@@ -25,11 +30,42 @@ class TradingSession(object):
         compliance=None, position_sizer=None,
         execution_handler=None, risk_manager=None,
         statistics=None, sentiment_handler=None,
-        title=None, benchmark=None
+        title=None, benchmark=None, live_timeout=1.0,
+        profile=False, coalesce_updates=False,
+        record_tape=None, record_trades=False
     ):
         """
         Set up the backtest variables according to
         what has been passed in.
+
+        live_timeout is the number of seconds a live session
+        waits on an empty events queue before polling the price
+        handler with stream_next.
+
+        If profile is True, the wall time and number of calls of
+        each component are recorded by a SessionProfiler, broken
+        down by event type, and reported when the session ends.
+
+        If coalesce_updates is True, the portfolio is revalued and
+        the statistics are updated once per distinct timestamp,
+        after all of the price events of that timestamp (and the
+        orders and fills that they led to) have been processed,
+        instead of after every price event. Within a timestamp,
+        position sizers then see the equity as of the previous
+        timestamp, apart from the positions that were traded. In
+        backtests, the update is run by the price handler just before
+        it stores the first price of the next timestamp, so that the
+        portfolio is never valued with the prices of a later bar.
+
+        Trades are recorded by a BufferedCompliance by default, which
+        writes from a background thread in live sessions, and the
+        compliance module is closed once the session is over.
+
+        If record_tape is a directory, the price events consumed by
+        the session are recorded there, in order, as an event tape
+        that a ReplayPriceHandler can stream back, skipping all data
+        loading on later runs. The signal, order and fill events are
+        recorded as well if record_trades is True.
         """
         self.config = config
         self.strategy = strategy
@@ -49,12 +85,24 @@ class TradingSession(object):
         self.title = title
         self.benchmark = benchmark
         self.session_type = session_type
+        self.end_session_time = end_session_time
+        self.live_timeout = live_timeout
+        self.profiler = SessionProfiler() if profile else None
+        self.coalesce_updates = coalesce_updates
+        self._pending_update_time = None
+        self.record_tape = record_tape
+        self.record_trades = record_trades
+        self.tape_writer = None
         self._config_session()
         self.cur_time = None
+        if self.coalesce_updates and self.session_type == "backtest":
+            self.price_handler.before_store = self._before_price_store
 
         if self.session_type == "live":
             if self.end_session_time is None:
                 raise Exception("Must specify an end_session_time when live trading")
+            if isinstance(self.events_queue, DequeEventBus):
+                raise Exception("Must use a thread-safe events queue when live trading")
 
     def _config_session(self):
         """
@@ -65,7 +113,8 @@ class TradingSession(object):
             self.price_handler = YahooDailyCsvBarPriceHandler(
                 self.config.CSV_DATA_DIR, self.events_queue,
                 self.tickers, start_date=self.start_date,
-                end_date=self.end_date
+                end_date=self.end_date,
+                cache_dir=getattr(self.config, "CACHE_DIR", None)
             )
 
         if self.position_sizer is None:
@@ -84,7 +133,9 @@ class TradingSession(object):
             )
 
         if self.compliance is None:
-            self.compliance = ExampleCompliance(self.config)
+            self.compliance = BufferedCompliance(
+                self.config, background=self.session_type == "live"
+            )
 
         if self.execution_handler is None:
             self.execution_handler = IBSimulatedExecutionHandler(
@@ -99,11 +150,160 @@ class TradingSession(object):
                 self.title, self.benchmark
             )
 
+        if self.record_tape is not None:
+            symbols = getattr(self.price_handler, "symbols", None)
+            self.tape_writer = EventTapeWriter(
+                self.record_tape,
+                symbols=None if symbols is None else list(symbols),
+                record_trades=self.record_trades
+            )
+
     def _continue_loop_condition(self):
-        if self.session_type == "backtest":
-            return self.price_handler.continue_backtest
-        else:
-            return datetime.now() < self.end_session_time
+        return self.price_handler.continue_backtest
+
+    def _process_event(self, event):
+        """
+        Directs an event taken from the events queue to either
+        the strategy, the portfolio handler or the execution
+        handler, depending upon its type.
+        """
+        if event is not None:
+            if self.tape_writer is not None:
+                self.tape_writer.record(event)
+            if (
+                event.type == EventType.TICK or
+                event.type == EventType.BAR or
+                event.type == EventType.BAR_BATCH
+            ):
+                self._before_price_store(event.time)
+                if self.price_handler.pushes_events:
+                    # Only stored now, on the session thread
+                    self.price_handler.store_pushed_event(event)
+                self.cur_time = event.time
+                # Generate any sentiment events here
+                if self.sentiment_handler is not None:
+                    self.sentiment_handler.stream_next(
+                        stream_date=self.cur_time
+                    )
+                if event.type == EventType.BAR_BATCH:
+                    self.strategy.calculate_signals_batch(event)
+                    # Several tickers have printed at once
+                    ticker = None
+                else:
+                    self.strategy.calculate_signals(event)
+                    ticker = event.ticker
+                if self.coalesce_updates:
+                    self._pending_update_time = event.time
+                else:
+                    self.portfolio_handler.update_portfolio_value(ticker)
+                    self.statistics.update(event.time, self.portfolio_handler)
+            elif event.type == EventType.SENTIMENT:
+                self.strategy.calculate_signals(event)
+            elif event.type == EventType.SIGNAL:
+                self.portfolio_handler.on_signal(event)
+            elif event.type == EventType.ORDER:
+                self.execution_handler.execute_order(event)
+            elif event.type == EventType.FILL:
+                self.portfolio_handler.on_fill(event)
+            else:
+                raise NotImplemented("Unsupported event.type '%s'" % event.type)
+
+    def _before_price_store(self, time):
+        """
+        Runs the coalesced update of the pending timestamp once a
+        price event with a later time is about to be stored.
+        """
+        if (
+            self._pending_update_time is not None and
+            time != self._pending_update_time
+        ):
+            self._update_portfolio_statistics()
+
+    def _update_portfolio_statistics(self):
+        """
+        Revalues the whole portfolio and updates the statistics
+        for the timestamp whose updates have been coalesced.
+        """
+        self.portfolio_handler.update_portfolio_value()
+        self.statistics.update(
+            self._pending_update_time, self.portfolio_handler
+        )
+        self._pending_update_time = None
+
+    def _run_live_session(self):
+        """
+        Blocks on the events queue rather than polling it, so that
+        an idle live session does not use any CPU. Price handlers
+        that receive streamed prices (e.g. IGTickPriceHandler) push
+        their events straight onto the queue, which wakes the loop.
+        Other price handlers are polled with stream_next whenever
+        the queue stays empty for live_timeout seconds.
+
+        The end_session_time is enforced by a timer that places a
+        sentinel onto the queue, instead of checking the clock on
+        every iteration.
+        """
+        end_session = object()
+        timer = threading.Timer(
+            max(0.0, (self.end_session_time - datetime.now()).total_seconds()),
+            self.events_queue.put, args=(end_session,)
+        )
+        timer.daemon = True
+        timer.start()
+        try:
+            while True:
+                try:
+                    event = self.events_queue.get(True, self.live_timeout)
+                except queue.Empty:
+                    self.price_handler.stream_next()
+                else:
+                    if event is end_session:
+                        break
+                    self._process_event(event)
+        finally:
+            timer.cancel()
+
+    def _run_backtest_session(self):
+        """
+        Polls the events queue, streaming the next price event
+        from the price handler whenever it is empty, until the
+        price handler runs out of data.
+        """
+        while self._continue_loop_condition():
+            try:
+                event = self.events_queue.get(False)
+            except queue.Empty:
+                self.price_handler.stream_next()
+            else:
+                self._process_event(event)
+
+    def _instrument_session(self):
+        """
+        Wraps the event dispatch and the methods of each session
+        component that it calls with the timers of the profiler.
+        """
+        components = [
+            (self, "_process_event", "session", True),
+            (self.price_handler, "stream_next", "price_handler", False),
+            (self.strategy, "calculate_signals", "strategy", False),
+            (self.strategy, "calculate_signals_batch", "strategy", False),
+            (self.portfolio_handler, "update_portfolio_value", "portfolio_handler", False),
+            (self.portfolio_handler, "on_signal", "portfolio_handler", False),
+            (self.portfolio_handler, "on_fill", "portfolio_handler", False),
+            (self.execution_handler, "execute_order", "execution_handler", False),
+            (self.statistics, "update", "statistics", False),
+        ]
+        if self.sentiment_handler is not None:
+            components.append(
+                (self.sentiment_handler, "stream_next", "sentiment_handler", False)
+            )
+        for obj, method_name, name, event_arg in components:
+            if not hasattr(obj, method_name):
+                continue
+            self.profiler.instrument(
+                obj, method_name, "%s.%s" % (name, method_name.lstrip("_")),
+                event_arg=event_arg
+            )
 
     def _run_session(self):
         """
@@ -115,39 +315,30 @@ class TradingSession(object):
         """
         if self.session_type == "backtest":
             print("Running Backtest...")
+            run = self._run_backtest_session
         else:
             print("Running Realtime Session until %s" % self.end_session_time)
+            run = self._run_live_session
 
-        while self._continue_loop_condition():
-            try:
-                event = self.events_queue.get(False)
-            except queue.Empty:
-                self.price_handler.stream_next()
+        try:
+            if self.profiler is None:
+                run()
             else:
-                if event is not None:
-                    if (
-                        event.type == EventType.TICK or
-                        event.type == EventType.BAR
-                    ):
-                        self.cur_time = event.time
-                        # Generate any sentiment events here
-                        if self.sentiment_handler is not None:
-                            self.sentiment_handler.stream_next(
-                                stream_date=self.cur_time
-                            )
-                        self.strategy.calculate_signals(event)
-                        self.portfolio_handler.update_portfolio_value()
-                        self.statistics.update(event.time, self.portfolio_handler)
-                    elif event.type == EventType.SENTIMENT:
-                        self.strategy.calculate_signals(event)
-                    elif event.type == EventType.SIGNAL:
-                        self.portfolio_handler.on_signal(event)
-                    elif event.type == EventType.ORDER:
-                        self.execution_handler.execute_order(event)
-                    elif event.type == EventType.FILL:
-                        self.portfolio_handler.on_fill(event)
-                    else:
-                        raise NotImplemented("Unsupported event.type '%s'" % event.type)
+                self._instrument_session()
+                t0 = default_timer()
+                try:
+                    run()
+                finally:
+                    self.profiler.session_time += default_timer() - t0
+                    self.profiler.restore()
+        finally:
+            try:
+                if self._pending_update_time is not None:
+                    self._update_portfolio_statistics()
+            finally:
+                self.compliance.close()
+                if self.tape_writer is not None:
+                    self.tape_writer.close()
 
     def start_trading(self, testing=False):
         """
@@ -163,6 +354,10 @@ class TradingSession(object):
                 results["max_drawdown_pct"] * 100.0
             )
         )
+        if self.profiler is not None:
+            print("---------------------------------")
+            print(self.profiler)
+            results["profile"] = self.profiler.report()
         if not testing:
             self.statistics.plot_results()
         return results
@@ -0,0 +1,125 @@
+import datetime
+import random
+import unittest
+
+from qstrader.array_portfolio import ArrayPortfolio
+from qstrader.event import BarEvent
+from qstrader.portfolio import Portfolio
+from qstrader.price_parser import PriceParser
+from qstrader.price_handler.base import AbstractBarPriceHandler
+
+
+class MovingPriceHandlerMock(AbstractBarPriceHandler):
+    def __init__(self, tickers):
+        self.tickers = dict(
+            (ticker, {"close": PriceParser.parse(100.0)})
+            for ticker in tickers
+        )
+
+    def set_close(self, ticker, close_price):
+        self._store_event(BarEvent(
+            ticker, datetime.datetime(2017, 1, 2), 86400, close_price,
+            close_price, close_price, close_price, 0
+        ))
+
+    def get_last_close(self, ticker):
+        return self.tickers[ticker]["close"]
+
+
+class TestArrayPortfolio(unittest.TestCase):
+    """
+    Test that the ArrayPortfolio keeps the same cash, equity,
+    PnL, open positions and closed positions as the Portfolio
+    over random trades in more tickers than its initial
+    capacity, with both full and incremental revaluations.
+    """
+    def assertSamePortfolio(self, array_portfolio, portfolio):
+        self.assertEqual(array_portfolio.cur_cash, portfolio.cur_cash)
+        self.assertEqual(array_portfolio.equity, portfolio.equity)
+        self.assertEqual(
+            array_portfolio.unrealised_pnl, portfolio.unrealised_pnl
+        )
+        self.assertEqual(array_portfolio.realised_pnl, portfolio.realised_pnl)
+        self.assertEqual(
+            sorted(array_portfolio.positions), sorted(portfolio.positions)
+        )
+
+    def test_matches_portfolio(self):
+        rnd = random.Random(1)
+        tickers = ["T%02d" % i for i in range(40)]
+        ph = MovingPriceHandlerMock(tickers)
+        cash = PriceParser.parse(1000000.00)
+        array_portfolio = ArrayPortfolio(ph, cash, capacity=8)
+        portfolio = Portfolio(ph, cash)
+
+        for i in range(3000):
+            ticker = rnd.choice(tickers)
+            ph.set_close(ticker, PriceParser.parse(
+                max(1.0, PriceParser.display(ph.get_last_close(ticker)) + rnd.gauss(0.0, 1.0))
+            ))
+            if i % 50 == 0:
+                array_portfolio._update_portfolio()
+                portfolio._update_portfolio()
+            else:
+                array_portfolio._update_position_value(ticker)
+                portfolio._update_position_value(ticker)
+            if i % 5 == 0:
+                action = rnd.choice(["BOT", "SLD"])
+                quantity = rnd.choice([10, 50, 100])
+                if ticker in portfolio.positions and rnd.random() < 0.3:
+                    # Close the position out
+                    net = portfolio.positions[ticker].net
+                    self.assertEqual(array_portfolio.positions[ticker].net, net)
+                    action = "SLD" if net > 0 else "BOT"
+                    quantity = abs(net)
+                for p in [array_portfolio, portfolio]:
+                    p.transact_position(
+                        action, ticker, quantity,
+                        ph.get_last_close(ticker), PriceParser.parse(1.00)
+                    )
+            self.assertSamePortfolio(array_portfolio, portfolio)
+
+        self.assertTrue(len(array_portfolio.tickers) > 8)
+        self.assertTrue(len(portfolio.closed_positions) > 0)
+        self.assertEqual(
+            [p.__dict__ for p in array_portfolio.closed_positions],
+            [p.__dict__ for p in portfolio.closed_positions]
+        )
+        for ticker in portfolio.positions:
+            self.assertEqual(
+                array_portfolio.positions[ticker].to_position().__dict__,
+                portfolio.positions[ticker].__dict__
+            )
+            self.assertEqual(
+                array_portfolio.positions[ticker].market_value,
+                portfolio.positions[ticker].market_value
+            )
+        self.assertRaises(KeyError, lambda: array_portfolio.positions["XYZ"])
+
+    def test_shared_symbols(self):
+        """
+        Test that the rows of the tickers are their ids in the
+        symbols of the price handler, including the ids of
+        tickers subscribed to after the columns were allocated.
+        """
+        tickers = ["T%02d" % i for i in range(20)]
+        ph = MovingPriceHandlerMock(tickers)
+        ph.symbols.intern("SPY")
+        array_portfolio = ArrayPortfolio(
+            ph, PriceParser.parse(100000.00), capacity=4, symbols=ph.symbols
+        )
+        for ticker in tickers:
+            ph.symbols.intern(ticker)
+        self.assertNotIn("T19", array_portfolio.positions)
+        array_portfolio.transact_position(
+            "BOT", "T19", 10, ph.get_last_close("T19"), PriceParser.parse(1.00)
+        )
+        slot = ph.get_ticker_id("T19")
+        self.assertEqual(slot, 20)
+        self.assertTrue(array_portfolio.is_open[slot])
+        self.assertEqual(array_portfolio.columns["quantity"][slot], 10)
+        self.assertEqual(list(array_portfolio.positions), ["T19"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+import numpy as np
+
+from qstrader.arrays import grow
+
+
+class TestGrow(unittest.TestCase):
+    """
+    Test that grown arrays keep their values, dtype and trailing
+    dimensions, the new rows being set to the fill value.
+    """
+    def test_grow(self):
+        column = np.array([3, -2], dtype=np.int64)
+        grown = grow(column, 4)
+        self.assertEqual(grown.dtype, np.int64)
+        self.assertEqual(list(grown), [3, -2, 0, 0])
+
+    def test_grow_matrix(self):
+        matrix = np.array([[1.5, 2.5]])
+        grown = grow(matrix, 3, np.nan)
+        self.assertEqual(grown.shape, (3, 2))
+        self.assertEqual(list(grown[0]), [1.5, 2.5])
+        self.assertTrue(np.isnan(grown[1:]).all())
+
+    def test_grow_datetimes(self):
+        timestamps = np.array(["2017-01-02"], dtype="datetime64[ns]")
+        grown = grow(timestamps, 2)
+        self.assertEqual(grown.dtype, timestamps.dtype)
+        self.assertEqual(grown[0], timestamps[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
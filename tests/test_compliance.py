@@ -0,0 +1,89 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from munch import munchify
+
+from qstrader.compliance.buffered import BufferedCompliance
+from qstrader.compliance.example import ExampleCompliance
+from qstrader.event import FillEvent
+from qstrader.price_parser import PriceParser
+
+
+class TestBufferedCompliance(unittest.TestCase):
+    """
+    Test that the buffered compliance modules, with or without
+    a writer thread, write the same trade log as the
+    ExampleCompliance, and only write buffered trades out when
+    the buffer is full or the module is closed.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config = munchify({"OUTPUT_DIR": self.tmp_dir})
+        self.fills = [
+            FillEvent(
+                datetime.datetime(2017, 1, 2) + datetime.timedelta(minutes=i),
+                "AMZN" if i % 2 else "GOOG", "BOT" if i % 3 else "SLD",
+                100 + i, "ARCA", PriceParser.parse(700.0 + i / 8.0),
+                PriceParser.parse(1.3)
+            )
+            for i in range(25)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _read_tradelog(self, compliance):
+        with open(os.path.join(self.tmp_dir, compliance.csv_filename)) as f:
+            return f.read()
+
+    def _record_trades(self, compliance):
+        for fill in self.fills:
+            compliance.record_trade(fill)
+        compliance.close()
+        return self._read_tradelog(compliance)
+
+    def test_same_tradelog(self):
+        expected = self._record_trades(ExampleCompliance(self.config))
+        self.assertEqual(len(expected.splitlines()), 1 + len(self.fills))
+        for background in [False, True]:
+            compliance = BufferedCompliance(
+                self.config, buffer_size=10, background=background
+            )
+            self.assertEqual(self._record_trades(compliance), expected)
+
+    def test_buffering(self):
+        compliance = BufferedCompliance(
+            self.config, buffer_size=10, flush_interval=3600.0
+        )
+        for fill in self.fills[:9]:
+            compliance.record_trade(fill)
+        self.assertEqual(len(self._read_tradelog(compliance).splitlines()), 1)
+        compliance.record_trade(self.fills[9])
+        self.assertEqual(len(self._read_tradelog(compliance).splitlines()), 11)
+        compliance.record_trade(self.fills[10])
+        compliance.close()
+        compliance.close()
+        self.assertEqual(len(self._read_tradelog(compliance).splitlines()), 12)
+
+    def test_flush_interval(self):
+        compliance = BufferedCompliance(
+            self.config, buffer_size=10, flush_interval=0.0
+        )
+        compliance.record_trade(self.fills[0])
+        self.assertEqual(len(self._read_tradelog(compliance).splitlines()), 2)
+        compliance.close()
+
+    def test_lazy_open(self):
+        for background in [False, True]:
+            compliance = BufferedCompliance(self.config, background=background)
+            self.assertIsNone(compliance.csvfile)
+            self.assertIsNone(compliance.writer_thread)
+            compliance.close()
+            self.assertEqual(len(self._read_tradelog(compliance).splitlines()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import datetime
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.compat import pickle
+from qstrader.event import (
+    BarBatchEvent, BarEvent, EventType, FillEvent, OrderEvent,
+    SentimentEvent, SignalEvent, TickEvent
+)
+
+
+class TestEvents(unittest.TestCase):
+    """
+    Test that the compact events keep the attributes of the
+    events, whether their time is given as a timestamp or as
+    int64 nanoseconds.
+    """
+    def setUp(self):
+        self.time = pd.Timestamp("2017-01-03 09:30:00")
+
+    def _events(self):
+        return [
+            TickEvent("SPY", self.time, 1, 2),
+            BarEvent("SPY", self.time, 60, 1, 2, 3, 4, 100, 5),
+            BarBatchEvent(
+                self.time, 60, ["SPY"], np.array([0]), np.array([1]),
+                np.array([2]), np.array([3]), np.array([4]),
+                np.array([100]), np.array([5])
+            ),
+            SignalEvent("SPY", "BOT", 100),
+            OrderEvent("SPY", "BOT", 100),
+            FillEvent(self.time, "SPY", "BOT", 100, "ARCA", 4, 1),
+            SentimentEvent(self.time, "SPY", 1),
+        ]
+
+    def test_slots(self):
+        for event in self._events():
+            self.assertFalse(hasattr(event, "__dict__"))
+            self.assertRaises(AttributeError, setattr, event, "foo", 1)
+        self.assertEqual(
+            [event.typename for event in self._events()],
+            [
+                "TICK", "BAR", "BAR_BATCH", "SIGNAL",
+                "ORDER", "FILL", "SENTIMENT"
+            ]
+        )
+        self.assertEqual(BarEvent.type, EventType.BAR)
+
+    def test_nanos(self):
+        nanos = self.time.value
+        for bev in [
+            BarEvent("SPY", nanos, 60, 1, 2, 3, 4, 100, 5),
+            BarEvent("SPY", np.int64(nanos), 60, 1, 2, 3, 4, 100, 5),
+            BarEvent("SPY", self.time, 60, 1, 2, 3, 4, 100, 5),
+        ]:
+            self.assertEqual(bev.nanos, nanos)
+            self.assertEqual(bev.time, self.time)
+            self.assertEqual(
+                str(bev),
+                "Type: EventType.BAR, Ticker: SPY, "
+                "Time: 2017-01-03 09:30:00, Period: 1min, "
+                "Open: 1, High: 2, Low: 3, Close: 4, "
+                "Adj Close: 5, Volume: 100"
+            )
+        tev = TickEvent("SPY", datetime.datetime(2017, 1, 3, 9, 30), 1, 2)
+        self.assertEqual(tev.nanos, nanos)
+        self.assertIsInstance(tev.time, datetime.datetime)
+        tev.time = nanos + 1
+        self.assertEqual(tev.time, self.time + pd.Timedelta(1))
+
+    def test_period_readable(self):
+        for period, readable in [(1, "1sec"), (86400, "1day"), (7, "7sec")]:
+            bev = BarEvent("SPY", self.time, period, 1, 2, 3, 4, 100)
+            self.assertEqual(bev.period_readable, readable)
+
+    def test_pickle(self):
+        bev = BarEvent(
+            "SPY", self.time.value, 60, 1, 2, 3, 4, 100, 5, ticker_id=3
+        )
+        copied = pickle.loads(pickle.dumps(bev, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(str(copied), str(bev))
+        self.assertEqual(copied.ticker_id, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
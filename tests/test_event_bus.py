@@ -0,0 +1,38 @@
+import unittest
+
+from qstrader.compat import queue
+from qstrader.event import SignalEvent
+from qstrader.event_bus import DequeEventBus, make_event_bus
+
+
+class TestDequeEventBus(unittest.TestCase):
+    """
+    Test that the DequeEventBus behaves like a queue.Queue
+    that is only ever used from a single thread.
+    """
+    def setUp(self):
+        self.events_queue = DequeEventBus()
+
+    def test_fifo_order(self):
+        signals = [SignalEvent(ticker, "BOT") for ticker in ["A", "B", "C"]]
+        for signal in signals:
+            self.events_queue.put(signal)
+        self.assertEqual(self.events_queue.qsize(), 3)
+        self.assertFalse(self.events_queue.empty())
+        self.assertIs(self.events_queue.get(False), signals[0])
+        self.assertIs(self.events_queue.get(), signals[1])
+        self.assertIs(self.events_queue.get_nowait(), signals[2])
+        self.assertTrue(self.events_queue.empty())
+
+    def test_get_empty_raises(self):
+        self.assertRaises(queue.Empty, self.events_queue.get, False)
+        self.assertRaises(queue.Empty, self.events_queue.get, True, 1.0)
+
+    def test_event_bus_factory(self):
+        self.assertIsInstance(make_event_bus(), DequeEventBus)
+        self.assertIsInstance(make_event_bus("live"), queue.Queue)
+        self.assertRaises(NotImplementedError, make_event_bus, "paper")
+
+
+if __name__ == "__main__":
+    unittest.main()
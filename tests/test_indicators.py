@@ -0,0 +1,140 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.indicators import (
+    ATR, EMA, SMA, RollingMax, RollingMin, RollingStd,
+    RollingVariance, ZScore
+)
+
+
+def reference_atr(high, low, close, window):
+    atr = []
+    value = 0.0
+    for i in range(len(close)):
+        if i == 0:
+            tr = high[i] - low[i]
+        else:
+            tr = max(
+                high[i] - low[i], abs(high[i] - close[i - 1]),
+                abs(low[i] - close[i - 1])
+            )
+        value += (tr - value) / min(i + 1, window)
+        atr.append(value if i + 1 >= window else np.nan)
+    return np.array(atr)
+
+
+class TestIndicators(unittest.TestCase):
+    """
+    Test that the incremental indicators of several tickers,
+    updated one value at a time or a cross-section at a time,
+    match the same indicators computed with pandas over the
+    whole series of each ticker.
+    """
+    def setUp(self):
+        np.random.seed(42)
+        self.nb_values = 500
+        self.tickers = ["T%02d" % i for i in range(20)]
+        self.closes = 100.0 + np.cumsum(
+            np.random.normal(0.0, 1.0, (self.nb_values, len(self.tickers))),
+            axis=0
+        )
+        spreads = np.abs(np.random.normal(0.0, 0.5, self.closes.shape))
+        self.highs = self.closes + spreads
+        self.lows = self.closes - spreads
+
+    def _updated(self, indicator, *columns):
+        """
+        Returns the values of indicator for every ticker, updating
+        half of the tickers one at a time and the other half with
+        update_many.
+        """
+        values = np.zeros(self.closes.shape)
+        half = len(self.tickers) // 2
+        for t in range(self.nb_values):
+            for i, ticker in enumerate(self.tickers[:half]):
+                values[t, i] = indicator.update(
+                    ticker, *[column[t, i] for column in columns]
+                )
+            values[t, half:] = indicator.update_many(
+                self.tickers[half:], *[column[t, half:] for column in columns]
+            )
+        return values
+
+    def assertMatches(self, values, expected):
+        np.testing.assert_allclose(values, expected, rtol=1e-9, atol=1e-9)
+
+    def test_moving_averages(self):
+        df = pd.DataFrame(self.closes)
+        self.assertMatches(
+            self._updated(SMA(20, capacity=4), self.closes),
+            df.rolling(20).mean().values
+        )
+        self.assertMatches(
+            self._updated(EMA(20, capacity=4), self.closes),
+            df.ewm(span=20, adjust=False, min_periods=20).mean().values
+        )
+
+    def test_sma_of_integers_is_exact(self):
+        sma = SMA(300)
+        prices = np.random.randint(10 ** 8, 10 ** 10, 1000)
+        for i, price in enumerate(prices):
+            value = sma.update("AAPL", price)
+            if i >= 299:
+                self.assertEqual(value, np.mean(prices[i - 299:i + 1]))
+
+    def test_dispersion(self):
+        df = pd.DataFrame(self.closes)
+        rolling = df.rolling(30)
+        self.assertMatches(
+            self._updated(RollingVariance(30), self.closes),
+            rolling.var().values
+        )
+        self.assertMatches(
+            self._updated(RollingStd(30, ddof=0), self.closes),
+            rolling.std(ddof=0).values
+        )
+        self.assertMatches(
+            self._updated(ZScore(30), self.closes),
+            ((df - rolling.mean()) / rolling.std()).values
+        )
+
+    def test_min_max(self):
+        df = pd.DataFrame(np.round(self.closes))
+        self.assertMatches(
+            self._updated(RollingMax(15, capacity=4), df.values),
+            df.rolling(15).max().values
+        )
+        self.assertMatches(
+            self._updated(RollingMin(15), df.values),
+            df.rolling(15).min().values
+        )
+
+    def test_atr(self):
+        expected = np.column_stack([
+            reference_atr(
+                self.highs[:, i], self.lows[:, i], self.closes[:, i], 14
+            )
+            for i in range(len(self.tickers))
+        ])
+        self.assertMatches(
+            self._updated(ATR(14), self.highs, self.lows, self.closes),
+            expected
+        )
+
+    def test_lookup(self):
+        sma = SMA(2)
+        self.assertEqual(np.isnan(sma.update("SPY", 1.0)), True)
+        self.assertFalse(sma.is_ready("SPY"))
+        sma.update("SPY", 2.0)
+        self.assertTrue(sma.is_ready("SPY"))
+        self.assertEqual(sma["SPY"], 1.5)
+        self.assertIn("SPY", sma)
+        self.assertFalse(sma.is_ready("AGG"))
+        self.assertRaises(KeyError, lambda: sma["AGG"])
+        self.assertRaises(ValueError, SMA, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
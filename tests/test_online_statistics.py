@@ -0,0 +1,162 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader import settings
+from qstrader.price_parser import PriceParser
+from qstrader.statistics.online import OnlineStatistics
+from qstrader.statistics.tearsheet import TearsheetStatistics
+
+
+class PortfolioMock(object):
+    def __init__(self, equity):
+        self.equity = equity
+        self.closed_positions = []
+
+
+class PriceHandlerMock(object):
+    def get_last_close(self, ticker):
+        return None
+
+
+class PortfolioHandlerMock(object):
+    def __init__(self, portfolio):
+        self.portfolio = portfolio
+        self.price_handler = PriceHandlerMock()
+
+
+class TestOnlineStatistics(unittest.TestCase):
+    """
+    Test that the streaming statistics of a random equity
+    curve match those computed with pandas over the whole
+    curve, at every step of the session.
+    """
+    def setUp(self):
+        self.config = settings.TEST
+
+    def test_matches_pandas(self):
+        np.random.seed(42)
+        equity = 100000.0 * np.exp(np.cumsum(np.random.normal(0.0, 0.01, 300)))
+        equity = np.round(equity, 2)
+        portfolio = PortfolioMock(PriceParser.parse(equity[0]))
+        portfolio_handler = PortfolioHandlerMock(portfolio)
+        statistics = OnlineStatistics(
+            self.config, portfolio_handler, periods=252, window=50
+        )
+
+        for i, value in enumerate(equity):
+            portfolio.equity = PriceParser.parse(value)
+            statistics.update(i, portfolio_handler)
+            # A repeated timestamp with the same equity changes nothing
+            statistics.update(i, portfolio_handler)
+
+            if i % 37 == 0 or i == len(equity) - 1:
+                equity_s = pd.Series(equity[:i + 1])
+                returns_s = equity_s.pct_change().fillna(0.0)
+                if i > 0:
+                    self.assertAlmostEqual(
+                        statistics.sharpe,
+                        np.sqrt(252) * returns_s.mean() / returns_s.std()
+                    )
+                rolling = returns_s.rolling(window=50)
+                rolling_sharpe = (
+                    np.sqrt(252) * rolling.mean() / rolling.std()
+                ).iloc[-1]
+                if np.isnan(rolling_sharpe):
+                    self.assertTrue(np.isnan(statistics.rolling_sharpe))
+                else:
+                    self.assertAlmostEqual(
+                        statistics.rolling_sharpe, rolling_sharpe
+                    )
+
+                hwm = np.maximum.accumulate(equity[:i + 1])
+                drawdowns = (hwm - equity[:i + 1]) / hwm
+                self.assertAlmostEqual(statistics.drawdown, drawdowns[-1])
+                self.assertAlmostEqual(
+                    statistics.max_drawdown, drawdowns.max()
+                )
+                in_drawdown = (drawdowns > 0).astype(int)
+                runs = "".join(map(str, in_drawdown)).split("0")
+                self.assertEqual(
+                    statistics.max_drawdown_duration, max(map(len, runs))
+                )
+                self.assertEqual(statistics.drawdown_duration, len(runs[-1]))
+
+        results = statistics.get_results()
+        self.assertEqual(results["equity"], equity[-1])
+        self.assertEqual(results["max_drawdown_pct"], statistics.max_drawdown)
+        self.assertTrue(statistics.max_drawdown_duration > 0)
+
+    def test_repeated_timestamps(self):
+        """
+        Test that the last equity of each timestamp is kept, as
+        TearsheetStatistics keeps it, when the equity changes
+        within a timestamp.
+        """
+        np.random.seed(7)
+        portfolio = PortfolioMock(PriceParser.parse(100000.0))
+        portfolio_handler = PortfolioHandlerMock(portfolio)
+        statistics = OnlineStatistics(
+            self.config, portfolio_handler, periods=252, window=20
+        )
+        tearsheet = TearsheetStatistics(
+            self.config, portfolio_handler, title=["Repeated"]
+        )
+        timestamps = pd.date_range("2017-01-02", periods=120, freq="D")
+        value = 100000.0
+        for timestamp in timestamps:
+            for j in range(np.random.randint(1, 4)):
+                value = round(value * np.exp(np.random.normal(0.0, 0.01)), 2)
+                portfolio.equity = PriceParser.parse(value)
+                statistics.update(timestamp, portfolio_handler)
+                tearsheet.update(timestamp, portfolio_handler)
+
+        equity = tearsheet.equity
+        self.assertEqual(len(equity), len(timestamps))
+        returns_s = equity.pct_change().fillna(0.0)
+        self.assertAlmostEqual(
+            statistics.sharpe,
+            np.sqrt(252) * returns_s.mean() / returns_s.std()
+        )
+        rolling = returns_s.rolling(window=20)
+        self.assertAlmostEqual(
+            statistics.rolling_sharpe,
+            (np.sqrt(252) * rolling.mean() / rolling.std()).iloc[-1]
+        )
+        hwm = np.maximum.accumulate(equity.values)
+        drawdowns = (hwm - equity.values) / hwm
+        self.assertAlmostEqual(statistics.max_drawdown, drawdowns.max())
+        self.assertAlmostEqual(statistics.drawdown, drawdowns[-1])
+        results = tearsheet.get_results()
+        self.assertAlmostEqual(
+            results["max_drawdown_pct"], statistics.max_drawdown
+        )
+        self.assertEqual(statistics.get_results()["equity"], equity.iloc[-1])
+
+    def test_flat_window_after_long_session(self):
+        """
+        Test that the rolling window statistics do not drift over
+        a long session, so that a window of flat returns has no
+        variance and no rolling Sharpe ratio.
+        """
+        np.random.seed(11)
+        portfolio = PortfolioMock(PriceParser.parse(100000.0))
+        portfolio_handler = PortfolioHandlerMock(portfolio)
+        statistics = OnlineStatistics(
+            self.config, portfolio_handler, periods=252, window=20
+        )
+        value = 100000.0
+        for i in range(5000):
+            value = round(value * np.exp(np.random.normal(0.0, 0.01)), 2)
+            portfolio.equity = PriceParser.parse(value)
+            statistics.update(i, portfolio_handler)
+        for i in range(5000, 5020):
+            statistics.update(i, portfolio_handler)
+
+        self.assertEqual(statistics.window_m2, 0.0)
+        self.assertTrue(np.isnan(statistics.rolling_sharpe))
+
+
+if __name__ == "__main__":
+    unittest.main()
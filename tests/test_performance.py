@@ -0,0 +1,121 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.statistics import performance as perf
+
+
+class TestCreateDrawdowns(unittest.TestCase):
+    """
+    Test the drawdown series, maximum drawdown and longest
+    drawdown duration of a small cumulative returns curve.
+    """
+    def test_create_drawdowns(self):
+        index = pd.date_range("2017-01-02", periods=8, freq="D")
+        cum_returns = pd.Series(
+            [1.0, 1.1, 1.0, 0.9, 1.2, 1.2, 1.08, 1.3], index=index
+        )
+        drawdown, max_dd, duration = perf.create_drawdowns(cum_returns)
+        self.assertEqual(drawdown.name, "Drawdown")
+        self.assertTrue(drawdown.index.equals(index))
+        np.testing.assert_allclose(
+            drawdown.values,
+            [0.0, 0.0, 0.1 / 1.1, 0.2 / 1.1, 0.0, 0.0, 0.1, 0.0]
+        )
+        self.assertAlmostEqual(max_dd, 0.2 / 1.1)
+        self.assertEqual(duration, 2)
+
+    def test_create_drawdowns_no_drawdown(self):
+        cum_returns = pd.Series([1.0, 1.1, 1.2])
+        drawdown, max_dd, duration = perf.create_drawdowns(cum_returns)
+        self.assertEqual(list(drawdown), [0.0, 0.0, 0.0])
+        self.assertEqual(max_dd, 0.0)
+        self.assertEqual(duration, 0)
+
+
+class TestAggregateReturns(unittest.TestCase):
+    """
+    Test the compounding of returns by year, month and ISO
+    week, including a Sunday which belongs to the last ISO
+    week of the previous year.
+    """
+    def setUp(self):
+        index = pd.DatetimeIndex([
+            "2016-12-30", "2017-01-01", "2017-01-02",
+            "2017-01-03", "2017-02-01"
+        ])
+        self.returns = pd.Series([0.1, -0.1, 0.05, 0.02, -0.5], index=index)
+
+    def test_yearly(self):
+        yearly = perf.aggregate_returns(self.returns, "yearly")
+        self.assertEqual(list(yearly.index), [2016, 2017])
+        np.testing.assert_allclose(
+            yearly.values, [0.1, 0.9 * 1.05 * 1.02 * 0.5 - 1]
+        )
+
+    def test_monthly(self):
+        monthly = perf.aggregate_returns(self.returns, "monthly")
+        self.assertEqual(list(monthly.index), [(2016, 12), (2017, 1), (2017, 2)])
+        np.testing.assert_allclose(
+            monthly.values, [0.1, 0.9 * 1.05 * 1.02 - 1, -0.5]
+        )
+
+    def test_weekly(self):
+        weekly = perf.aggregate_returns(self.returns, "weekly")
+        self.assertEqual(
+            list(weekly.index),
+            [(2016, 12, 52), (2017, 1, 1), (2017, 1, 52), (2017, 2, 5)]
+        )
+        np.testing.assert_allclose(
+            weekly.values, [0.1, 1.05 * 1.02 - 1, -0.1, -0.5]
+        )
+
+    def test_same_as_groupby(self):
+        """
+        Test that the returns agree with those of the compounding
+        of each group with Series.cumsum, up to floating point
+        rounding, NaN returns included.
+        """
+        def cumulate_returns(x):
+            return np.exp(np.log(1 + x).cumsum()).iloc[-1] - 1
+
+        group_keys = {
+            "weekly": [
+                lambda x: x.year, lambda x: x.month,
+                lambda x: x.isocalendar()[1]
+            ],
+            "monthly": [lambda x: x.year, lambda x: x.month],
+            "yearly": [lambda x: x.year]
+        }
+        np.random.seed(5)
+        returns = pd.Series(
+            np.random.normal(0.0, 0.01, 1500),
+            index=pd.date_range("2009-01-01", periods=1500, freq="D")
+        )
+        returns[np.random.random(1500) < 0.05] = np.nan
+        returns.iloc[-1] = np.nan
+        for convert_to, keys in group_keys.items():
+            aggregated = perf.aggregate_returns(returns, convert_to)
+            expected = returns.groupby(keys).apply(cumulate_returns)
+            self.assertEqual(list(aggregated.index), list(expected.index))
+            self.assertTrue(np.isnan(aggregated.values).any())
+            # exp(x) - 1 loses precision next to expm1 for small x
+            np.testing.assert_allclose(
+                aggregated.values, expected.values, rtol=1e-12, atol=1e-15
+            )
+            np.testing.assert_array_equal(
+                np.isnan(aggregated.values), np.isnan(expected.values)
+            )
+
+        empty = perf.aggregate_returns(returns.iloc[:0], "monthly")
+        self.assertEqual(len(empty), 0)
+
+    def test_invalid_period(self):
+        self.assertRaises(
+            ValueError, perf.aggregate_returns, self.returns, "daily"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
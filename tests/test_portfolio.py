@@ -1,8 +1,9 @@
+import random
 import unittest
 
 from qstrader.portfolio import Portfolio
 from qstrader.price_parser import PriceParser
-from qstrader.price_handler.base import AbstractTickPriceHandler
+from qstrader.price_handler.base import AbstractTickPriceHandler, AbstractBarPriceHandler
 
 
 class PriceHandlerMock(AbstractTickPriceHandler):
@@ -100,5 +101,61 @@ class TestAmazonGooglePortfolio(unittest.TestCase):
         self.assertEqual(PriceParser.display(self.portfolio.realised_pnl), -899.50)
 
 
+class MovingPriceHandlerMock(AbstractBarPriceHandler):
+    def __init__(self, tickers):
+        self.closes = dict(
+            (ticker, PriceParser.parse(100.0)) for ticker in tickers
+        )
+
+    def get_last_close(self, ticker):
+        return self.closes[ticker]
+
+
+class TestIncrementalPortfolioValuation(unittest.TestCase):
+    """
+    Test that revaluing only the position whose ticker has
+    just printed keeps the same equity and unrealised PnL as
+    revaluing every position, through opening, adding to,
+    reducing and closing positions.
+    """
+    def test_incremental_matches_full_update(self):
+        rnd = random.Random(42)
+        tickers = ["T%02d" % i for i in range(20)]
+        ph = MovingPriceHandlerMock(tickers)
+        cash = PriceParser.parse(1000000.00)
+        incremental = Portfolio(ph, cash)
+        full = Portfolio(MovingPriceHandlerMock(tickers), cash)
+        full.price_handler.closes = ph.closes
+
+        for i in range(2000):
+            ticker = rnd.choice(tickers)
+            ph.closes[ticker] = PriceParser.parse(
+                max(1.0, PriceParser.display(ph.closes[ticker]) + rnd.gauss(0.0, 1.0))
+            )
+            incremental._update_position_value(ticker)
+            full._update_portfolio()
+            if i % 7 == 0:
+                action = rnd.choice(["BOT", "SLD"])
+                quantity = rnd.choice([10, 50, 100])
+                pt = incremental.positions.get(ticker)
+                if pt is not None and rnd.random() < 0.3:
+                    # Close the position out
+                    action = "SLD" if pt.net > 0 else "BOT"
+                    quantity = abs(pt.net)
+                commission = PriceParser.parse(1.00)
+                for portfolio in [incremental, full]:
+                    portfolio.transact_position(
+                        action, ticker, quantity,
+                        ph.closes[ticker], commission
+                    )
+                full._update_portfolio()
+            self.assertEqual(incremental.equity, full.equity)
+            self.assertEqual(incremental.unrealised_pnl, full.unrealised_pnl)
+        self.assertTrue(len(incremental.closed_positions) > 0)
+        self.assertEqual(
+            len(incremental.closed_positions), len(full.closed_positions)
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
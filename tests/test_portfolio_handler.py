@@ -83,6 +83,11 @@ class TestSimpleSignalOrderFillCycleForPortfolioHandler(unittest.TestCase):
         self.assertEqual(order.ticker, "MSFT")
         self.assertEqual(order.action, "BOT")
         self.assertEqual(order.quantity, 0)
+        self.assertIsNone(order.ticker_id)
+
+        signal_event = SignalEvent("MSFT", "BOT", ticker_id=3)
+        order = self.portfolio_handler._create_order_from_signal(signal_event)
+        self.assertEqual(order.ticker_id, 3)
 
     def test_place_orders_onto_queue_basic_check(self):
         """
@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from qstrader.price_handler.cache import PriceCsvCache
+from qstrader.price_handler.historic_csv_tick import HistoricCSVTickPriceHandler
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.compat import queue
+from qstrader import settings
+
+
+class TestPriceCsvCache(unittest.TestCase):
+    """
+    Test that parsed price CSV files are stored in and
+    re-read from the binary cache, and that a cached copy
+    is invalidated when its CSV file changes.
+    """
+    def setUp(self):
+        """
+        Copy a daily and a tick CSV fixture into a temporary
+        directory and create an empty cache next to it.
+        """
+        self.config = settings.TEST
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_dir = os.path.join(self.tmp_dir, "csv")
+        os.makedirs(self.csv_dir)
+        for ticker in ["SPY", "GOOG"]:
+            shutil.copy(
+                os.path.join(self.config.CSV_DATA_DIR, "%s.csv" % ticker),
+                self.csv_dir
+            )
+        self.cache = PriceCsvCache(os.path.join(self.tmp_dir, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _read(self, ticker, handler_cls):
+        read_calls = []
+
+        def read_func(path):
+            read_calls.append(path)
+            return handler_cls.read_price_csv(path)
+
+        df = self.cache.read_csv(
+            os.path.join(self.csv_dir, "%s.csv" % ticker),
+            handler_cls.__name__, read_func
+        )
+        return df, len(read_calls)
+
+    def test_round_trip(self):
+        """
+        The second read is served from the cache and is
+        identical to the parsed CSV, for bars and ticks.
+        """
+        for ticker, handler_cls in [
+            ("SPY", YahooDailyCsvBarPriceHandler),
+            ("GOOG", HistoricCSVTickPriceHandler)
+        ]:
+            df_csv, nb_reads = self._read(ticker, handler_cls)
+            self.assertEqual(nb_reads, 1)
+            df_cache, nb_reads = self._read(ticker, handler_cls)
+            self.assertEqual(nb_reads, 0)
+            pd.testing.assert_frame_equal(
+                df_cache, df_csv, check_dtype=False
+            )
+
+    def test_mtime_invalidation(self):
+        """
+        Touching the CSV file forces it to be parsed again.
+        """
+        self._read("SPY", YahooDailyCsvBarPriceHandler)
+        csv_path = os.path.join(self.csv_dir, "SPY.csv")
+        stat = os.stat(csv_path)
+        os.utime(csv_path, (stat.st_atime, stat.st_mtime + 10))
+        df, nb_reads = self._read("SPY", YahooDailyCsvBarPriceHandler)
+        self.assertEqual(nb_reads, 1)
+        df, nb_reads = self._read("SPY", YahooDailyCsvBarPriceHandler)
+        self.assertEqual(nb_reads, 0)
+
+    def test_price_handler_with_cache(self):
+        """
+        A price handler built from the cache streams the
+        same bars as one built from the CSV files.
+        """
+        cache_dir = os.path.join(self.tmp_dir, "cache")
+        closes = []
+        for i in range(2):
+            events_queue = queue.Queue()
+            price_handler = YahooDailyCsvBarPriceHandler(
+                self.csv_dir, events_queue, ["SPY"],
+                cache_dir=cache_dir
+            )
+            for j in range(5):
+                price_handler.stream_next()
+            closes.append(price_handler.get_last_close("SPY"))
+        self.assertEqual(closes[0], closes[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
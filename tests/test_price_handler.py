@@ -1,8 +1,15 @@
+import datetime
+import os
+import shutil
+import tempfile
 import unittest
 
 from qstrader.price_parser import PriceParser
 from qstrader.price_handler.historic_csv_tick import HistoricCSVTickPriceHandler
+from qstrader.price_handler.iq_feed_intraday_csv_bar import IQFeedIntradayCsvBarPriceHandler
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
 from qstrader.compat import queue
+from qstrader.event import EventType
 from qstrader import settings
 
 
@@ -188,5 +195,245 @@ class TestPriceHandlerSimpleCase(unittest.TestCase):
         # self.assertEqual(PriceParser.display(ask, 5), None)
 
 
+class TestYahooDailyCsvBarPriceHandler(unittest.TestCase):
+    """
+    Test that the array-backed bar stream of the
+    YahooDailyCsvBarPriceHandler emits bars in a
+    deterministic (date, ticker) order, restricted to
+    the requested start and end dates.
+    """
+    def setUp(self):
+        """
+        Set up the PriceHandler object with SPY and AGG
+        over the first two trading days of November 2006.
+        """
+        self.config = settings.TEST
+        self.events_queue = queue.Queue()
+        self.price_handler = YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, self.events_queue,
+            ["SPY", "AGG"],
+            start_date=datetime.datetime(2006, 11, 1),
+            end_date=datetime.datetime(2006, 11, 3)
+        )
+
+    def test_stream_all_bars(self):
+        """
+        Stream every bar and check ordering, prices and
+        the end of the backtest.
+        """
+        bars = []
+        while self.price_handler.continue_backtest:
+            self.price_handler.stream_next()
+            while not self.events_queue.empty():
+                bars.append(self.events_queue.get(False))
+        self.assertEqual(
+            [(bar.ticker, bar.time.strftime("%Y-%m-%d")) for bar in bars],
+            [
+                ("AGG", "2006-11-01"), ("SPY", "2006-11-01"),
+                ("AGG", "2006-11-02"), ("SPY", "2006-11-02")
+            ]
+        )
+        bar = bars[1]
+        self.assertEqual(bar.period, 86400)
+        self.assertEqual(PriceParser.display(bar.open_price, 6), 138.220001)
+        self.assertEqual(PriceParser.display(bar.close_price, 6), 136.860001)
+        self.assertEqual(PriceParser.display(bar.adj_close_price, 6), 110.530905)
+        self.assertEqual(bar.volume, 83005600)
+        self.assertIsInstance(bar.close_price, int)
+        self.assertEqual(
+            self.price_handler.get_last_close("SPY"),
+            PriceParser.parse(136.779999)
+        )
+
+
+class TestHeapMergePriceHandlers(unittest.TestCase):
+    """
+    Test that the "heap" merge of the CSV price handlers
+    streams the same events as the "sort" merge, ordered
+    by (timestamp, ticker).
+    """
+    def setUp(self):
+        self.config = settings.TEST
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _stream(self, price_handler, events_queue):
+        events = []
+        while price_handler.continue_backtest:
+            price_handler.stream_next()
+            while not events_queue.empty():
+                event = events_queue.get(False)
+                if event.type == EventType.TICK:
+                    events.append(
+                        (event.time, event.ticker, event.bid, event.ask)
+                    )
+                else:
+                    events.append(
+                        (
+                            event.time, event.ticker, event.open_price,
+                            event.high_price, event.low_price,
+                            event.close_price, event.volume,
+                            event.adj_close_price
+                        )
+                    )
+        return events
+
+    def _stream_both(self, handler_cls, *args, **kwargs):
+        results = []
+        for merge_kwargs in [{"merge": "sort"}, {"merge": "heap"}]:
+            merge_kwargs.update(kwargs)
+            events_queue = queue.Queue()
+            price_handler = handler_cls(
+                args[0], events_queue, *args[1:], **merge_kwargs
+            )
+            results.append(self._stream(price_handler, events_queue))
+        return results
+
+    def test_historic_csv_tick(self):
+        sort_events, heap_events = self._stream_both(
+            HistoricCSVTickPriceHandler, self.config.CSV_DATA_DIR,
+            ["GOOG", "AMZN", "MSFT"], chunksize=4
+        )
+        self.assertEqual(len(heap_events), 30)
+        self.assertEqual(heap_events, sort_events)
+
+    def test_equal_timestamps(self):
+        """
+        Test that ticks with the same time are streamed in
+        ticker order by both merges, whatever the order of
+        the subscriptions.
+        """
+        for ticker, price in [("MSFT", 50.0), ("GOOG", 700.0), ("AMZN", 600.0)]:
+            with open(os.path.join(self.tmp_dir, "%s.csv" % ticker), "w") as f:
+                f.write("Ticker,Time,Bid,Ask\n")
+                for i in range(6):
+                    if ticker == "AMZN" and i % 2:
+                        continue
+                    f.write("%s,01.02.2016 00:00:%02d.000,%s,%s\n" % (
+                        ticker, i // 2, price + i, price + i + 0.01
+                    ))
+        sort_events, heap_events = self._stream_both(
+            HistoricCSVTickPriceHandler, self.tmp_dir,
+            ["MSFT", "GOOG", "AMZN"], chunksize=2
+        )
+        self.assertEqual(len(heap_events), 6 + 6 + 3)
+        self.assertEqual(heap_events, sort_events)
+        self.assertEqual(
+            [event[1] for event in sort_events[:5]],
+            ["AMZN", "GOOG", "GOOG", "MSFT", "MSFT"]
+        )
+        self.assertEqual(
+            [event[2] for event in sort_events if event[1] == "GOOG"],
+            [PriceParser.parse(700.0 + i) for i in range(6)]
+        )
+
+    def test_yahoo_daily_csv_bar(self):
+        sort_events, heap_events = self._stream_both(
+            YahooDailyCsvBarPriceHandler, self.config.CSV_DATA_DIR,
+            ["SPY", "AGG", "AAPL"],
+            start_date=datetime.datetime(2010, 1, 1),
+            end_date=datetime.datetime(2011, 1, 1)
+        )
+        self.assertEqual(len(heap_events), 3 * 252)
+        self.assertEqual(heap_events, sort_events)
+
+    def test_iq_feed_intraday_csv_bar(self):
+        for ticker, price in [("AAA", 10.0), ("BBB", 20.0)]:
+            with open(os.path.join(self.tmp_dir, "%s.csv" % ticker), "w") as f:
+                for minute in range(30):
+                    if ticker == "BBB" and minute % 3 == 0:
+                        continue
+                    f.write(
+                        "2016-01-04 09:%02d:00,%s,%s,%s,%s,%d,0\n" % (
+                            minute, price + minute, price + minute - 0.5,
+                            price + minute + 0.5, price + minute + 0.25,
+                            1000 + minute
+                        )
+                    )
+        sort_events, heap_events = self._stream_both(
+            IQFeedIntradayCsvBarPriceHandler, self.tmp_dir,
+            ["BBB", "AAA"],
+            start_date=datetime.datetime(2016, 1, 4, 9, 5),
+            end_date=datetime.datetime(2016, 1, 4, 9, 25),
+            chunksize=7
+        )
+        self.assertEqual(len(heap_events), 20 + 13)
+        self.assertEqual(heap_events, sort_events)
+        self.assertEqual(
+            heap_events[0][:2],
+            (datetime.datetime(2016, 1, 4, 9, 5), "AAA")
+        )
+
+
+class TestBarBatchPriceHandlers(unittest.TestCase):
+    """
+    Test that the batched bar price handlers emit one
+    BarBatchEvent per timestamp holding the same bars as the
+    BarEvents streamed without batching.
+    """
+    def setUp(self):
+        self.config = settings.TEST
+
+    def _stream(self, price_handler, events_queue):
+        batches = []
+        bars = []
+        while price_handler.continue_backtest:
+            price_handler.stream_next()
+            while not events_queue.empty():
+                event = events_queue.get(False)
+                if event.type == EventType.BAR_BATCH:
+                    batches.append(event)
+                    bar_events = list(event.bar_events())
+                else:
+                    bar_events = [event]
+                for bev in bar_events:
+                    bars.append(
+                        (
+                            bev.time, bev.ticker, bev.open_price,
+                            bev.high_price, bev.low_price,
+                            bev.close_price, bev.volume,
+                            bev.adj_close_price, bev.ticker_id
+                        )
+                    )
+        return batches, bars
+
+    def test_yahoo_daily_csv_bar(self):
+        results = []
+        for batch in [False, True]:
+            events_queue = queue.Queue()
+            price_handler = YahooDailyCsvBarPriceHandler(
+                self.config.CSV_DATA_DIR, events_queue,
+                ["SPY", "AGG", "AAPL"],
+                start_date=datetime.datetime(2010, 1, 1),
+                end_date=datetime.datetime(2011, 1, 1),
+                batch=batch
+            )
+            results.append(self._stream(price_handler, events_queue))
+            self.assertEqual(
+                price_handler.get_last_close("AGG"),
+                PriceParser.parse(105.75)
+            )
+        (_, bars), (batches, batch_bars) = results
+        self.assertEqual(len(batches), 252)
+        self.assertEqual(len(set(b.time for b in batches)), 252)
+        # Ticker ids follow the order of subscription
+        self.assertEqual(batches[0].tickers, ["SPY", "AGG", "AAPL"])
+        self.assertEqual(list(batches[0].ticker_ids), [2, 1, 0])
+        self.assertEqual(batch_bars, bars)
+        self.assertEqual(
+            set((bar[1], bar[-1]) for bar in bars),
+            set([("SPY", 0), ("AGG", 1), ("AAPL", 2)])
+        )
+
+    def test_batch_requires_sort_merge(self):
+        self.assertRaises(
+            ValueError, YahooDailyCsvBarPriceHandler,
+            self.config.CSV_DATA_DIR, queue.Queue(), ["SPY"],
+            merge="heap", batch=True
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,164 @@
+import datetime
+import random
+import unittest
+
+import numpy as np
+
+from qstrader import settings
+from qstrader.compat import queue
+from qstrader.event import EventType
+from qstrader.price_handler.history import PriceHistory
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.symbols import SymbolTable
+
+
+class TestPriceHistory(unittest.TestCase):
+    """
+    Test that the ring buffers return the same last values
+    as lists of every appended value, across many wraps of
+    the buffers, for more tickers than the initial rows.
+    """
+    def test_matches_lists(self):
+        rnd = random.Random(3)
+        tickers = ["T%d" % i for i in range(6)]
+        fields = [("close", np.int64)]
+        for capacity in [1, 3, 8]:
+            history = PriceHistory(capacity, fields, nb_tickers=2)
+            closes = dict((ticker, []) for ticker in tickers)
+            for i in range(200):
+                if i % 7 == 0:
+                    batch = rnd.sample(tickers, 3)
+                    values = [rnd.randint(1, 10 ** 9) for t in batch]
+                    history.append_many(batch, close=np.array(values))
+                    for ticker, value in zip(batch, values):
+                        closes[ticker].append(value)
+                else:
+                    ticker = rnd.choice(tickers[:5])
+                    value = rnd.randint(1, 10 ** 9)
+                    history.append(ticker, close=value)
+                    closes[ticker].append(value)
+
+                for ticker in tickers:
+                    if not closes[ticker]:
+                        self.assertNotIn(ticker, history)
+                        continue
+                    kept = closes[ticker][-capacity:]
+                    self.assertEqual(history.get_count(ticker), len(kept))
+                    self.assertEqual(
+                        history.get_history(ticker, "close").tolist(), kept
+                    )
+                    self.assertEqual(
+                        history.get_history(ticker, "close", 2).tolist(),
+                        kept[-2:]
+                    )
+
+                n = min(2, capacity)
+                matrix = history.get_latest_matrix(
+                    tickers + ["XYZ"], "close", n
+                )
+                self.assertEqual(matrix.shape, (len(tickers) + 1, n))
+                for row, ticker in zip(matrix, tickers + ["XYZ"]):
+                    kept = closes.get(ticker, [])[-n:]
+                    expected = [np.nan] * (n - len(kept)) + kept
+                    np.testing.assert_array_equal(row, expected)
+
+    def test_views(self):
+        history = PriceHistory(4, [("close", np.int64)])
+        for value in range(10):
+            history.append("SPY", close=value)
+        view = history.get_history("SPY", "close")
+        self.assertEqual(view.tolist(), [6, 7, 8, 9])
+        self.assertTrue(np.shares_memory(view, history.buffers["close"]))
+        self.assertFalse(view.flags.writeable)
+        self.assertRaises(KeyError, history.get_history, "AGG", "close")
+        self.assertRaises(
+            ValueError, history.get_latest_matrix, ["SPY"], "close", 5
+        )
+
+    def test_ticker_ids(self):
+        symbols = SymbolTable(["SPY", "AGG", "IBM"])
+        history = PriceHistory(
+            2, [("close", np.int64)], nb_tickers=1, symbols=symbols
+        )
+        self.assertNotIn("AGG", history)
+        history.append(1, close=5)
+        history.append_many(np.array([1, 0]), close=np.array([6, 7]))
+        self.assertEqual(history.get_history("AGG", "close").tolist(), [5, 6])
+        self.assertEqual(history.get_history("SPY", "close").tolist(), [7])
+        self.assertEqual(len(history), 2)
+        self.assertNotIn("IBM", history)
+        np.testing.assert_array_equal(
+            history.get_latest_matrix(["IBM", "SPY"], "close"), [[np.nan], [7]]
+        )
+
+
+class TestPriceHandlerHistory(unittest.TestCase):
+    """
+    Test that the price handlers keep the history of the bars
+    that they stream, with or without batching.
+    """
+    def setUp(self):
+        self.config = settings.TEST
+
+    def test_yahoo_daily_csv_bar(self):
+        for batch in [False, True]:
+            events_queue = queue.Queue()
+            price_handler = YahooDailyCsvBarPriceHandler(
+                self.config.CSV_DATA_DIR, events_queue, ["SPY", "AGG"],
+                start_date=datetime.datetime(2010, 1, 1),
+                end_date=datetime.datetime(2010, 3, 1),
+                batch=batch, history_size=5
+            )
+            bars = []
+            while price_handler.continue_backtest:
+                price_handler.stream_next()
+                while not events_queue.empty():
+                    event = events_queue.get(False)
+                    if event.type == EventType.BAR_BATCH:
+                        bars.extend(event.bar_events())
+                    else:
+                        bars.append(event)
+
+            spy_bars = [bev for bev in bars if bev.ticker == "SPY"][-5:]
+            self.assertEqual(
+                price_handler.get_history("SPY", "adj_close").tolist(),
+                [bev.adj_close_price for bev in spy_bars]
+            )
+            self.assertEqual(
+                price_handler.get_history("SPY", "volume", 2).tolist(),
+                [bev.volume for bev in spy_bars[-2:]]
+            )
+            self.assertEqual(
+                list(price_handler.get_history("SPY", "timestamp")),
+                [np.datetime64(bev.time, "ns") for bev in spy_bars]
+            )
+            matrix = price_handler.get_latest_matrix(["SPY", "AGG"], "close")
+            self.assertEqual(
+                matrix[:, 0].tolist(),
+                [
+                    price_handler.get_last_close("SPY"),
+                    price_handler.get_last_close("AGG")
+                ]
+            )
+            latest = price_handler.get_latest_prices([
+                price_handler.get_ticker_id("AGG"),
+                price_handler.get_ticker_id("SPY")
+            ])
+            self.assertEqual(
+                latest.tolist(),
+                [
+                    [price_handler.get_last_close(ticker)] * 2
+                    for ticker in ["AGG", "SPY"]
+                ]
+            )
+
+        price_handler = YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, queue.Queue(), ["SPY"]
+        )
+        self.assertRaises(
+            ValueError, price_handler.get_history, "SPY", "close"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import random
 import unittest
 import numpy as np
 from qstrader.price_parser import PriceParser
@@ -58,6 +59,38 @@ class TestPriceParser(unittest.TestCase):
         displayed = PriceParser.display(self.float)
         self.assertEqual(displayed, 10.12)
 
+    def test_unsupported_type(self):
+        self.assertRaises(NotImplementedError, PriceParser.parse, None)
+        self.assertRaises(
+            NotImplementedError, PriceParser.display, np.int32(self.int)
+        )
+
+    def test_parse_array(self):
+        values = [self.float, self.rounded_float, -self.float, 0.0]
+        parsed = PriceParser.parse_array(np.array(values))
+        self.assertEqual(parsed.dtype, np.int64)
+        self.assertEqual(
+            parsed.tolist(), [PriceParser.parse(v) for v in values]
+        )
+        parsed = PriceParser.parse_array(np.array([self.int, 5]))
+        self.assertEqual(parsed.tolist(), [200, 5])
+
+    def test_display_array(self):
+        rnd = random.Random(1)
+        values = [rnd.randint(-10 ** 12, 10 ** 12) for i in range(10000)]
+        values += [v - v % 100000 + 50000 for v in values[:1000]]
+        values += [v - v % 1000 + 500 for v in values[:1000]]
+        values += [10 ** 16 + 123456789, 0, -50000, 50000, 150000]
+        for dp in [0, 2, 4, 7, 8]:
+            self.assertEqual(
+                PriceParser.display_array(np.array(values), dp).tolist(),
+                [PriceParser.display(v, dp) for v in values]
+            )
+        self.assertEqual(
+            PriceParser.display_array(np.array([self.float])).tolist(),
+            [10.12]
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
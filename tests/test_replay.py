@@ -0,0 +1,288 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from munch import munchify
+import pandas as pd
+
+from qstrader.compat import queue
+from qstrader.event import BarEvent, EventType, SignalEvent, TickEvent
+from qstrader.event_bus import make_event_bus
+from qstrader.price_handler.replay import ReplayPriceHandler
+from qstrader.price_handler.tape import EventTape, EventTapeWriter, tape_paths
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.strategy.base import AbstractStrategy
+from qstrader.trading_session import TradingSession
+
+
+class AlternatingStrategy(AbstractStrategy):
+    """
+    Buys a ticker and sells it back every few bars.
+    """
+    def __init__(self, ticker, events_queue):
+        self.ticker = ticker
+        self.events_queue = events_queue
+        self.bars = 0
+
+    def calculate_signals(self, event):
+        if event.type == EventType.BAR and event.ticker == self.ticker:
+            if self.bars % 10 == 0:
+                action = "BOT" if self.bars % 20 == 0 else "SLD"
+                self.events_queue.put(
+                    SignalEvent(
+                        self.ticker, action, 100, ticker_id=event.ticker_id
+                    )
+                )
+            self.bars += 1
+
+
+def streamed_bars(price_handler, events_queue):
+    """
+    Streams every event of a price handler, returning the events
+    and the bars as tuples, those of the batches included.
+    """
+    events = []
+    bars = []
+    while price_handler.continue_backtest:
+        price_handler.stream_next()
+        while not events_queue.empty():
+            event = events_queue.get(False)
+            events.append(event)
+            if event.type == EventType.BAR_BATCH:
+                bar_events = list(event.bar_events())
+            else:
+                bar_events = [event]
+            for bev in bar_events:
+                bars.append((
+                    bev.time, bev.ticker, bev.ticker_id, bev.period,
+                    bev.open_price, bev.high_price, bev.low_price,
+                    bev.close_price, bev.volume, bev.adj_close_price
+                ))
+    return events, bars
+
+
+class TestReplayTradingSession(unittest.TestCase):
+    """
+    Test that a backtest replayed from the tape recorded by a
+    first run consumes the same events, in the same order, and
+    gives the same results.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config = munchify({
+            "CSV_DATA_DIR": "data/csv", "OUTPUT_DIR": self.tmp_dir
+        })
+        self.start_date = datetime.datetime(2010, 1, 1)
+        self.end_date = datetime.datetime(2010, 6, 1)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _run_session(self, tape_dir, price_handler_factory):
+        events_queue = make_event_bus()
+        session = TradingSession(
+            self.config, AlternatingStrategy("SPY", events_queue),
+            ["SPY", "AGG"], 10000.0, self.start_date, self.end_date,
+            events_queue, price_handler=price_handler_factory(events_queue),
+            title=["Replay"], benchmark="SPY",
+            record_tape=os.path.join(self.tmp_dir, tape_dir),
+            record_trades=True
+        )
+        session._run_session()
+        return session
+
+    def _read(self, tape_dir):
+        contents = []
+        for path in tape_paths(os.path.join(self.tmp_dir, tape_dir)):
+            with open(path, "rb") as f:
+                contents.append(f.read())
+        return contents
+
+    def test_replay(self):
+        for batch in [False, True]:
+            session = self._run_session(
+                "recorded", lambda events_queue: YahooDailyCsvBarPriceHandler(
+                    self.config.CSV_DATA_DIR, events_queue, ["SPY", "AGG"],
+                    start_date=self.start_date, end_date=self.end_date,
+                    batch=batch
+                )
+            )
+            replayed = self._run_session(
+                "replayed", lambda events_queue: ReplayPriceHandler(
+                    os.path.join(self.tmp_dir, "recorded"), events_queue
+                )
+            )
+            self.assertEqual(self._read("replayed"), self._read("recorded"))
+            self.assertTrue(
+                replayed.statistics.equity.equals(session.statistics.equity)
+            )
+            self.assertTrue(
+                replayed.statistics.equity_benchmark.equals(
+                    session.statistics.equity_benchmark
+                )
+            )
+            self.assertEqual(
+                [p.__dict__ for p in replayed.portfolio_handler.portfolio.closed_positions],
+                [p.__dict__ for p in session.portfolio_handler.portfolio.closed_positions]
+            )
+
+            tape = EventTape(os.path.join(self.tmp_dir, "recorded"))
+            self.assertEqual(list(tape.symbols), ["SPY", "AGG"])
+            trades = list(tape.trade_events())
+            self.assertEqual(len(trades), tape.nb_trades)
+            self.assertEqual(
+                [event.type for seq, event in trades[:3]],
+                [EventType.SIGNAL, EventType.ORDER, EventType.FILL]
+            )
+            seq, fill = trades[2]
+            self.assertEqual(
+                (fill.ticker, fill.ticker_id, fill.action, fill.quantity),
+                ("SPY", 0, "BOT", 100)
+            )
+            self.assertEqual(fill.exchange, "ARCA")
+            self.assertEqual(fill.timestamp, datetime.datetime(2010, 1, 4))
+            self.assertTrue(0 < seq <= tape.nb_prices)
+
+
+class TestReplayPriceHandler(unittest.TestCase):
+    """
+    Test that a ReplayPriceHandler streams the recorded bars and
+    ticks back with the same values, ids and batches.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_bars(self):
+        for batch in [False, True]:
+            events_queue = queue.Queue()
+            price_handler = YahooDailyCsvBarPriceHandler(
+                "data/csv", events_queue, ["SPY", "AGG", "AAPL"],
+                start_date=datetime.datetime(2010, 1, 1),
+                end_date=datetime.datetime(2010, 3, 1), batch=batch
+            )
+            events, bars = streamed_bars(price_handler, events_queue)
+            writer = EventTapeWriter(
+                self.tmp_dir, symbols=list(price_handler.symbols),
+                buffer_size=7
+            )
+            for event in events:
+                writer.record(event)
+            writer.close()
+            writer.close()
+
+            replay_handler = ReplayPriceHandler(
+                self.tmp_dir, events_queue, history_size=3
+            )
+            replayed_events, replayed_bars = streamed_bars(
+                replay_handler, events_queue
+            )
+            self.assertEqual(replayed_bars, bars)
+            self.assertEqual(
+                [event.type for event in replayed_events],
+                [event.type for event in events]
+            )
+            if batch:
+                self.assertEqual(
+                    [list(event.ticker_ids) for event in replayed_events],
+                    [list(event.ticker_ids) for event in events]
+                )
+            for ticker in ["SPY", "AGG", "AAPL"]:
+                self.assertEqual(
+                    replay_handler.get_last_close(ticker),
+                    price_handler.get_last_close(ticker)
+                )
+            self.assertEqual(
+                replay_handler.get_history("AGG", "close").tolist(),
+                [bar[7] for bar in bars if bar[1] == "AGG"][-3:]
+            )
+
+            # Replaying a window of the tape
+            replay_handler = ReplayPriceHandler(
+                self.tmp_dir, events_queue,
+                start_date=datetime.datetime(2010, 2, 1),
+                end_date=datetime.datetime(2010, 2, 8)
+            )
+            _, window_bars = streamed_bars(replay_handler, events_queue)
+            self.assertEqual(
+                window_bars,
+                [
+                    bar for bar in bars
+                    if datetime.datetime(2010, 2, 1) <= bar[0] < datetime.datetime(2010, 2, 8)
+                ]
+            )
+            # ...which is the window streamed by the CSV price handler
+            _, csv_window_bars = streamed_bars(
+                YahooDailyCsvBarPriceHandler(
+                    "data/csv", events_queue, ["SPY", "AGG", "AAPL"],
+                    start_date=datetime.datetime(2010, 2, 1),
+                    end_date=datetime.datetime(2010, 2, 8), batch=batch
+                ),
+                events_queue
+            )
+            self.assertEqual(
+                [bar[:2] + bar[3:] for bar in window_bars],
+                [bar[:2] + bar[3:] for bar in csv_window_bars]
+            )
+
+    def test_ticks(self):
+        times = [
+            datetime.datetime(2016, 2, 1, 0, 0, 0, i) for i in range(5)
+        ]
+        ticks = [
+            TickEvent("GOOG", times[0], 100, 101),
+            TickEvent("MSFT", times[1], 50, 52),
+            TickEvent("GOOG", times[2], 102, 103),
+            TickEvent("GOOG", pd.Timestamp(times[3]).value, 104, 105),
+        ]
+        writer = EventTapeWriter(self.tmp_dir)
+        for tick in ticks:
+            writer.record(tick)
+        self.assertRaises(
+            ValueError, writer.record,
+            BarEvent("GOOG", times[4], 60, 1, 1, 1, 1, 100)
+        )
+        writer.close()
+
+        events_queue = queue.Queue()
+        price_handler = ReplayPriceHandler(self.tmp_dir, events_queue)
+        self.assertTrue(price_handler.istick())
+        replayed = []
+        while price_handler.continue_backtest:
+            price_handler.stream_next()
+            while not events_queue.empty():
+                replayed.append(events_queue.get(False))
+        self.assertEqual(
+            [(t.time, t.ticker, t.ticker_id, t.bid, t.ask) for t in replayed],
+            [
+                (times[0], "GOOG", 0, 100, 101),
+                (times[1], "MSFT", 1, 50, 52),
+                (times[2], "GOOG", 0, 102, 103),
+                (times[3], "GOOG", 0, 104, 105),
+            ]
+        )
+        self.assertEqual(price_handler.get_best_bid_ask("GOOG"), (104, 105))
+
+    def test_unclosed_tape(self):
+        tape_dir = os.path.join(self.tmp_dir, "lazy")
+        writer = EventTapeWriter(tape_dir)
+        self.assertFalse(os.path.exists(tape_dir))
+        writer.record(TickEvent("GOOG", datetime.datetime(2016, 2, 1), 100, 101))
+        self.assertFalse(os.path.exists(os.path.join(tape_dir, "header.json")))
+        writer.close()
+        tape = EventTape(tape_dir)
+        self.assertEqual((tape.kind, tape.nb_prices, len(tape.prices)), ("tick", 1, 1))
+
+    def test_empty_tape(self):
+        writer = EventTapeWriter(self.tmp_dir)
+        writer.close()
+        tape = EventTape(self.tmp_dir)
+        self.assertEqual((tape.kind, tape.nb_prices, len(tape.prices)), (None, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
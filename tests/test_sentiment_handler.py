@@ -0,0 +1,84 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from qstrader.compat import queue
+from qstrader.event import EventType
+from qstrader.sentiment_handler.sentdex_sentiment_handler import SentdexSentimentHandler
+
+
+class TestSentdexSentimentHandler(unittest.TestCase):
+    """
+    Test that the sentiment of each date is streamed once, on
+    the first bar of the date, in the order of the CSV file,
+    for the subscribed tickers within the start and end dates.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        rows = [
+            "2014-01-02,GOOG,6",
+            "2014-01-02,AMZN,-1",
+            "2014-01-03,GOOG,3",
+            "2014-01-03,AAPL,2",
+            "2014-01-06,AMZN,4",
+            "2014-01-07,GOOG,-3",
+        ]
+        with open(os.path.join(self.tmp_dir, "sentdex.csv"), "w") as f:
+            f.write("date,symbol,sentiment_signal\n")
+            f.write("\n".join(rows) + "\n")
+        self.events_queue = queue.Queue()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _streamed(self, handler, stream_date):
+        handler.stream_next(stream_date=stream_date)
+        events = []
+        while not self.events_queue.empty():
+            events.append(self.events_queue.get(False))
+        return events
+
+    def test_stream_next(self):
+        handler = SentdexSentimentHandler(
+            self.tmp_dir, "sentdex.csv", self.events_queue,
+            tickers=["GOOG", "AMZN"],
+            end_date=datetime.datetime(2014, 1, 6)
+        )
+        first_bar = datetime.datetime(2014, 1, 2, 9, 30)
+        events = self._streamed(handler, first_bar)
+        self.assertEqual(
+            [(e.type, e.timestamp, e.ticker, e.sentiment) for e in events],
+            [
+                (EventType.SENTIMENT, first_bar, "GOOG", 6),
+                (EventType.SENTIMENT, first_bar, "AMZN", -1),
+            ]
+        )
+        # Later bars of the same date do not stream it again
+        self.assertEqual(
+            self._streamed(handler, datetime.datetime(2014, 1, 2, 9, 31)), []
+        )
+        self.assertEqual(
+            [e.ticker for e in self._streamed(
+                handler, datetime.datetime(2014, 1, 3)
+            )],
+            ["GOOG"]
+        )
+        self.assertEqual(
+            self._streamed(handler, datetime.datetime(2014, 1, 4)), []
+        )
+        self.assertEqual(
+            [e.sentiment for e in self._streamed(
+                handler, datetime.datetime(2014, 1, 6)
+            )],
+            [4]
+        )
+        # After the end date
+        self.assertEqual(
+            self._streamed(handler, datetime.datetime(2014, 1, 7)), []
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import datetime
+import unittest
+
+import numpy as np
+
+from qstrader.event import (
+    BarBatchEvent, BarEvent, EventType, SentimentEvent, TickEvent
+)
+from qstrader.strategy.base import AbstractStrategy, Strategies
+
+
+class RecordingStrategy(AbstractStrategy):
+    """
+    Records the events that it is interested in, filtering them
+    itself as strategies do, into a log shared by the strategies.
+    """
+    def __init__(self, name, log, tickers=None, event_types=None):
+        self.name = name
+        self.log = log
+        self.subscribed_tickers = tickers
+        self.subscribed_event_types = event_types
+
+    def calculate_signals(self, event):
+        if (
+            (self.subscribed_tickers is None or event.ticker in self.subscribed_tickers) and
+            (self.subscribed_event_types is None or event.type in self.subscribed_event_types)
+        ):
+            self.log.append((self.name, event.type, event.ticker))
+
+
+class RecordingBatchStrategy(RecordingStrategy):
+    def calculate_signals_batch(self, event):
+        self.log.append((self.name, event.type, len(event)))
+
+
+class UnsubscribedStrategy(AbstractStrategy):
+    """
+    A strategy which declares no subscriptions, and so
+    receives every event.
+    """
+    def __init__(self, log):
+        self.log = log
+
+    def calculate_signals(self, event):
+        self.log.append(("unsubscribed", event.type, event.ticker))
+
+
+class TestStrategies(unittest.TestCase):
+    """
+    Test that Strategies only passes events on to the strategies
+    subscribing to them, and in the same order as calling every
+    strategy in turn would.
+    """
+    def setUp(self):
+        self.time = datetime.datetime(2017, 1, 2)
+        self.tickers = ["SPY", "AGG", "IBM", "GOOG"]
+
+    def _strategies(self, log):
+        return [
+            RecordingStrategy("spy_bars", log, ["SPY"], [EventType.BAR]),
+            UnsubscribedStrategy(log),
+            RecordingStrategy("bars", log, None, [EventType.BAR]),
+            RecordingStrategy("agg", log, ["AGG"]),
+            RecordingStrategy("ibm_spy", log, ["IBM", "SPY", "IBM"]),
+            RecordingBatchStrategy(
+                "batch", log, ["SPY"], [EventType.BAR_BATCH]
+            ),
+            RecordingBatchStrategy("ticks", log, None, [EventType.TICK]),
+        ]
+
+    def _events(self):
+        return [
+            BarEvent("SPY", self.time, 86400, 1, 1, 1, 1, 100, 1),
+            BarEvent("AGG", self.time, 86400, 1, 1, 1, 1, 100, 1),
+            BarEvent("XYZ", self.time, 86400, 1, 1, 1, 1, 100, 1),
+            TickEvent("SPY", self.time, 1, 2),
+            SentimentEvent(self.time, "AGG", 1),
+            BarEvent("SPY", self.time, 86400, 1, 1, 1, 1, 100, 1),
+        ]
+
+    def _batch(self):
+        ticker_ids = np.array([2, 0, 1])
+        prices = np.array([10, 20, 30])
+        return BarBatchEvent(
+            self.time, 86400, self.tickers, ticker_ids,
+            prices, prices, prices, prices, prices, prices
+        )
+
+    def test_routed_events(self):
+        log = []
+        strategies = Strategies(*self._strategies(log))
+        for event in self._events():
+            strategies.calculate_signals(event)
+        self.assertEqual(log, [
+            ("spy_bars", EventType.BAR, "SPY"),
+            ("unsubscribed", EventType.BAR, "SPY"),
+            ("bars", EventType.BAR, "SPY"),
+            ("ibm_spy", EventType.BAR, "SPY"),
+            ("unsubscribed", EventType.BAR, "AGG"),
+            ("bars", EventType.BAR, "AGG"),
+            ("agg", EventType.BAR, "AGG"),
+            ("unsubscribed", EventType.BAR, "XYZ"),
+            ("bars", EventType.BAR, "XYZ"),
+            ("unsubscribed", EventType.TICK, "SPY"),
+            ("ibm_spy", EventType.TICK, "SPY"),
+            ("ticks", EventType.TICK, "SPY"),
+            ("unsubscribed", EventType.SENTIMENT, "AGG"),
+            ("agg", EventType.SENTIMENT, "AGG"),
+            ("spy_bars", EventType.BAR, "SPY"),
+            ("unsubscribed", EventType.BAR, "SPY"),
+            ("bars", EventType.BAR, "SPY"),
+            ("ibm_spy", EventType.BAR, "SPY"),
+        ])
+
+    def test_routed_batch(self):
+        """
+        Test that the strategies processing batches receive the
+        whole batch first, and that the bars are then passed on
+        to the other strategies in the same order as BarEvents.
+        """
+        log = []
+        strategies = Strategies(*self._strategies(log))
+        strategies.calculate_signals_batch(self._batch())
+
+        # Calling every other strategy in turn with each bar, as
+        # without routing, apart from the strategy which only
+        # subscribes to ticks
+        expected = [("batch", EventType.BAR_BATCH, 3)]
+        bar_strategies = [
+            strategy for strategy in self._strategies(expected)
+            if not isinstance(strategy, RecordingBatchStrategy)
+        ]
+        for bev in self._batch().bar_events():
+            for strategy in bar_strategies:
+                strategy.calculate_signals(bev)
+        self.assertEqual(log, expected)
+        self.assertEqual(log[:6], [
+            ("batch", EventType.BAR_BATCH, 3),
+            ("unsubscribed", EventType.BAR, "IBM"),
+            ("bars", EventType.BAR, "IBM"),
+            ("ibm_spy", EventType.BAR, "IBM"),
+            ("spy_bars", EventType.BAR, "SPY"),
+            ("unsubscribed", EventType.BAR, "SPY"),
+        ])
+
+    def test_batch_without_bar_strategies(self):
+        log = []
+        strategies = Strategies(
+            RecordingBatchStrategy("batch", log),
+            RecordingStrategy("ticks", log, None, [EventType.TICK])
+        )
+        strategies.calculate_signals_batch(self._batch())
+        self.assertEqual(log, [("batch", EventType.BAR_BATCH, 3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import datetime
+import functools
+import shutil
+import tempfile
+import unittest
+
+from munch import munchify
+
+from qstrader.event import SignalEvent, EventType
+from qstrader.strategy.base import AbstractStrategy
+from qstrader.sweep import ParameterSweep, parameter_grid
+
+
+class BuyAfterStrategy(AbstractStrategy):
+    """
+    Buys base_quantity units of the ticker once wait_bars
+    bars have been received, then holds.
+    """
+    def __init__(self, ticker, events_queue, wait_bars=0, base_quantity=10):
+        self.ticker = ticker
+        self.events_queue = events_queue
+        self.wait_bars = wait_bars
+        self.base_quantity = base_quantity
+        self.bars = 0
+
+    def calculate_signals(self, event):
+        if event.type == EventType.BAR and event.ticker == self.ticker:
+            if self.bars == self.wait_bars:
+                self.events_queue.put(
+                    SignalEvent(
+                        self.ticker, "BOT",
+                        suggested_quantity=self.base_quantity
+                    )
+                )
+            self.bars += 1
+
+
+class TestParameterSweep(unittest.TestCase):
+    """
+    Test that a parameter sweep runs one session per
+    combination of the grid and that the results gathered
+    from the worker processes match sequential runs.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config = munchify({
+            "CSV_DATA_DIR": "data/csv", "OUTPUT_DIR": self.tmp_dir
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_parameter_grid(self):
+        grid = parameter_grid({"b": [1, 2], "a": ["x", "y", "z"]})
+        self.assertEqual(len(grid), 6)
+        self.assertEqual(grid[0], {"a": "x", "b": 1})
+        self.assertEqual(grid[-1], {"a": "z", "b": 2})
+
+    def test_sweep(self):
+        sweep = ParameterSweep(
+            self.config, functools.partial(BuyAfterStrategy, "SPY"),
+            {"wait_bars": [0, 50], "base_quantity": [10, 20]},
+            ["SPY"], 100000.0,
+            start_date=datetime.datetime(2010, 1, 1),
+            end_date=datetime.datetime(2011, 1, 1),
+            title=["Sweep"]
+        )
+        df = sweep.run(processes=2)
+        self.assertEqual(list(df.index), [0, 1, 2, 3])
+        self.assertEqual(list(df.columns[:2]), ["base_quantity", "wait_bars"])
+        self.assertIn("sharpe", df.columns)
+        self.assertIn("max_drawdown_pct", df.columns)
+        self.assertEqual(list(df["wait_bars"]), [0, 50, 0, 50])
+        self.assertNotEqual(df["sharpe"][0], df["sharpe"][1])
+
+        sequential = sweep.run(processes=1)
+        self.assertTrue((sequential["sharpe"] == df["sharpe"]).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
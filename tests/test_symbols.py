@@ -0,0 +1,38 @@
+import unittest
+
+import numpy as np
+
+from qstrader.symbols import SymbolTable
+
+
+class TestSymbolTable(unittest.TestCase):
+    """
+    Test that tickers are given dense ids in the order in which
+    they are first interned, and that ids are stable.
+    """
+    def test_intern(self):
+        symbols = SymbolTable(["SPY", "AGG"])
+        self.assertEqual(symbols.intern("AGG"), 1)
+        self.assertEqual(symbols.intern("GOOG"), 2)
+        self.assertEqual(
+            list(symbols.intern_many(["GOOG", "IBM", "SPY"])), [2, 3, 0]
+        )
+        self.assertEqual(symbols.intern_many([]).dtype, np.int64)
+        self.assertEqual(list(symbols), ["SPY", "AGG", "GOOG", "IBM"])
+        self.assertEqual(len(symbols), 4)
+        self.assertEqual(symbols.get_symbol(3), "IBM")
+        self.assertEqual(symbols.get_id("IBM"), 3)
+        self.assertIsNone(symbols.get_id("XYZ"))
+        self.assertEqual(symbols.get_id("XYZ", -1), -1)
+        self.assertIn("GOOG", symbols)
+        self.assertNotIn("XYZ", symbols)
+
+    def test_interned_symbols(self):
+        symbols = SymbolTable()
+        ticker = "".join(["GO", "OG"])
+        symbols.intern(ticker)
+        self.assertIs(symbols.get_symbol(0), "GOOG")
+
+
+if __name__ == "__main__":
+    unittest.main()
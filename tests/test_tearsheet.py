@@ -0,0 +1,81 @@
+import random
+import unittest
+
+import pandas as pd
+
+from qstrader import settings
+from qstrader.price_parser import PriceParser
+from qstrader.statistics.tearsheet import TearsheetStatistics
+
+
+class PortfolioMock(object):
+    def __init__(self, equity):
+        self.equity = equity
+        self.closed_positions = []
+
+
+class PriceHandlerMock(object):
+    def __init__(self, close):
+        self.close = close
+
+    def get_last_close(self, ticker):
+        return self.close
+
+
+class PortfolioHandlerMock(object):
+    def __init__(self, portfolio, price_handler):
+        self.portfolio = portfolio
+        self.price_handler = price_handler
+
+
+class TestTearsheetStatistics(unittest.TestCase):
+    """
+    Test that the equity curves stored in arrays keep one
+    value per timestamp, the last one, in display units as
+    PriceParser.display gives them, beyond their initial
+    capacity.
+    """
+    def setUp(self):
+        self.config = settings.TEST
+
+    def test_equity_curves(self):
+        rnd = random.Random(2)
+        portfolio = PortfolioMock(PriceParser.parse(100000.0))
+        price_handler = PriceHandlerMock(PriceParser.parse(100.0))
+        portfolio_handler = PortfolioHandlerMock(portfolio, price_handler)
+        statistics = TearsheetStatistics(
+            self.config, portfolio_handler, title=["Test"],
+            benchmark="SPY", capacity=4
+        )
+
+        equity = {}
+        equity_benchmark = {}
+        timestamps = pd.date_range("2017-01-02", periods=50, freq="D")
+        for timestamp in timestamps:
+            for i in range(rnd.randint(1, 3)):
+                portfolio.equity += rnd.randint(-10 ** 9, 10 ** 9)
+                price_handler.close += rnd.randint(-10 ** 7, 10 ** 7)
+                statistics.update(timestamp, portfolio_handler)
+                equity[timestamp] = PriceParser.display(portfolio.equity)
+                equity_benchmark[timestamp] = PriceParser.display(
+                    price_handler.close
+                )
+
+        self.assertEqual(statistics.nb_updates, len(timestamps))
+        self.assertTrue(len(statistics.timestamps) >= len(timestamps))
+        expected = pd.Series(equity).sort_index()
+        self.assertEqual(list(statistics.equity), list(expected))
+        self.assertTrue(statistics.equity.index.equals(expected.index))
+        self.assertEqual(
+            list(statistics.equity_benchmark),
+            list(pd.Series(equity_benchmark).sort_index())
+        )
+
+        results = statistics.get_results()
+        self.assertTrue(results["equity"].equals(statistics.equity))
+        self.assertEqual(len(results["returns"]), len(timestamps))
+        self.assertEqual(len(results["returns_b"]), len(timestamps))
+
+
+if __name__ == "__main__":
+    unittest.main()
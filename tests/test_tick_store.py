@@ -0,0 +1,110 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from qstrader.price_handler.historic_csv_tick import HistoricCSVTickPriceHandler
+from qstrader.price_handler.mmap_tick import MmapTickPriceHandler
+from qstrader.price_handler.tick_store import TickStore
+from qstrader.price_parser import PriceParser
+from qstrader.compat import queue
+from qstrader import settings
+import qstrader.scripts.convert_tick_csv
+
+
+def stream_ticks(price_handler, events_queue):
+    ticks = []
+    while price_handler.continue_backtest:
+        price_handler.stream_next()
+        while not events_queue.empty():
+            tev = events_queue.get(False)
+            ticks.append((tev.time, tev.ticker, tev.bid, tev.ask))
+    return ticks
+
+
+class TestMmapTickPriceHandler(unittest.TestCase):
+    """
+    Convert the tick CSV fixtures into a tick store and check
+    that the memory-mapped price handler streams the same ticks
+    as the CSV price handler, and that the start and end dates
+    are honoured across several daily files.
+    """
+    def setUp(self):
+        self.config = settings.TEST
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.tmp_dir, "tick_store")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_stream_matches_csv_handler(self):
+        """
+        Stream the GOOG, AMZN and MSFT fixtures from the store.
+        """
+        tickers = ["GOOG", "AMZN", "MSFT"]
+        for ticker in tickers:
+            shutil.copy(
+                os.path.join(self.config.CSV_DATA_DIR, "%s.csv" % ticker),
+                self.tmp_dir
+            )
+        nb_ticks = qstrader.scripts.convert_tick_csv.run(
+            self.tmp_dir, self.store_dir, tickers, 4,
+            config=self.config
+        )
+        self.assertEqual(nb_ticks, {"GOOG": 10, "AMZN": 10, "MSFT": 10})
+
+        events_queue = queue.Queue()
+        csv_ticks = stream_ticks(
+            HistoricCSVTickPriceHandler(
+                self.config.CSV_DATA_DIR, events_queue, tickers
+            ),
+            events_queue
+        )
+        price_handler = MmapTickPriceHandler(
+            self.store_dir, events_queue, tickers, chunksize=3
+        )
+        bid, ask = price_handler.get_best_bid_ask("AMZN")
+        self.assertEqual(PriceParser.display(bid, 5), 502.10001)
+        self.assertEqual(PriceParser.display(ask, 5), 502.11999)
+        mmap_ticks = stream_ticks(price_handler, events_queue)
+        self.assertEqual(mmap_ticks, csv_ticks)
+
+    def test_daily_files_and_date_range(self):
+        """
+        Convert three daily files of one tick per hour and stream
+        from the middle of the first day to the start of the third.
+        """
+        for day in [4, 5, 6]:
+            fname = os.path.join(self.tmp_dir, "XYZ_201601%02d.csv" % day)
+            with open(fname, "w") as f:
+                f.write("Ticker,Time,Bid,Ask\n")
+                for hour in range(24):
+                    f.write(
+                        "XYZ,%02d.01.2016 %02d:00:00.000,%0.5f,%0.5f\n" % (
+                            day, hour, 10.0 + hour, 10.02 + hour
+                        )
+                    )
+        qstrader.scripts.convert_tick_csv.run(
+            self.tmp_dir, self.store_dir, ["XYZ"], 10,
+            config=self.config
+        )
+        store = TickStore(self.store_dir, "XYZ")
+        self.assertEqual(len(store), 72)
+        self.assertEqual(list(store.offsets), [0, 24, 48, 72])
+
+        events_queue = queue.Queue()
+        price_handler = MmapTickPriceHandler(
+            self.store_dir, events_queue, ["XYZ"],
+            start_date=datetime.datetime(2016, 1, 4, 12, 30),
+            end_date=datetime.datetime(2016, 1, 6)
+        )
+        ticks = stream_ticks(price_handler, events_queue)
+        self.assertEqual(len(ticks), 11 + 24)
+        self.assertEqual(ticks[0][0], datetime.datetime(2016, 1, 4, 13))
+        self.assertEqual(ticks[-1][0], datetime.datetime(2016, 1, 5, 23))
+        self.assertEqual(ticks[0][2], PriceParser.parse(23.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,377 @@
+import datetime
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from munch import munchify
+
+from qstrader.compat import queue
+from qstrader.event_bus import make_event_bus
+from qstrader.event import TickEvent, SignalEvent, EventType
+from qstrader.price_handler.base import AbstractTickPriceHandler
+from qstrader.price_handler.tape import EventTape
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.price_parser import PriceParser
+from qstrader.strategy.base import AbstractStrategy
+from qstrader.trading_session import TradingSession
+
+
+class PushTickPriceHandlerMock(AbstractTickPriceHandler):
+    """
+    Pushes a tick onto the events queue from a separate
+    thread every few milliseconds, as a live feed would.
+    """
+    pushes_events = True
+
+    def __init__(self, events_queue, ticker, nb_ticks):
+        self.events_queue = events_queue
+        self.continue_backtest = True
+        self.ticker = ticker
+        self.nb_ticks = nb_ticks
+        self.nb_stream_next = 0
+        price = PriceParser.parse(100.0)
+        self.tickers = {
+            ticker: {
+                "bid": price, "ask": price,
+                "timestamp": datetime.datetime.now()
+            }
+        }
+
+    def start(self):
+        thread = threading.Thread(target=self._push_ticks)
+        thread.daemon = True
+        thread.start()
+
+    def _push_ticks(self):
+        for i in range(self.nb_ticks):
+            price = PriceParser.parse(100.0 + i)
+            tev = TickEvent(self.ticker, datetime.datetime.now(), price, price)
+            self.events_queue.put(tev)
+            time.sleep(0.005)
+
+    def stream_next(self):
+        self.nb_stream_next += 1
+
+
+class CountingStrategy(AbstractStrategy):
+    def __init__(self):
+        self.nb_ticks = 0
+
+    def calculate_signals(self, event):
+        if event.type == EventType.TICK:
+            self.nb_ticks += 1
+
+
+class LatestPriceStrategy(CountingStrategy):
+    """
+    Counts the ticks whose prices are not the latest prices
+    of the price handler when the strategy receives them.
+    """
+    def __init__(self, price_handler):
+        super(LatestPriceStrategy, self).__init__()
+        self.price_handler = price_handler
+        self.nb_mismatches = 0
+
+    def calculate_signals(self, event):
+        super(LatestPriceStrategy, self).calculate_signals(event)
+        if self.price_handler.get_best_bid_ask(event.ticker) != (event.bid, event.ask):
+            self.nb_mismatches += 1
+
+
+class TestLiveTradingSession(unittest.TestCase):
+    """
+    Test that a live session blocks on the events queue, is
+    woken up by pushed price events, which it stores as it
+    processes them, and stops at the end_session_time without
+    polling the price handler.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config = munchify({
+            "CSV_DATA_DIR": self.tmp_dir, "OUTPUT_DIR": self.tmp_dir
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_live_session(self):
+        events_queue = queue.Queue()
+        price_handler = PushTickPriceHandlerMock(events_queue, "XYZ", 20)
+        strategy = LatestPriceStrategy(price_handler)
+        session = TradingSession(
+            self.config, strategy, ["XYZ"], 10000.0,
+            None, None, events_queue,
+            session_type="live",
+            end_session_time=datetime.datetime.now() + datetime.timedelta(seconds=0.5),
+            price_handler=price_handler, title=["Live"],
+            live_timeout=0.2
+        )
+        price_handler.start()
+        t0 = time.time()
+        session._run_session()
+        elapsed = time.time() - t0
+        self.assertEqual(strategy.nb_ticks, 20)
+        # Pushed ticks are stored by the session as they are processed
+        self.assertEqual(strategy.nb_mismatches, 0)
+        self.assertEqual(
+            price_handler.get_best_bid_ask("XYZ"),
+            (PriceParser.parse(119.0), PriceParser.parse(119.0))
+        )
+        self.assertTrue(0.3 < elapsed < 2.0)
+        self.assertTrue(price_handler.nb_stream_next <= 3)
+
+
+class TestProfiledTradingSession(unittest.TestCase):
+    """
+    Test that a profiled backtest records the calls made to
+    each component per event type, and that the components
+    are restored once the session is over.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config = munchify({
+            "CSV_DATA_DIR": "data/csv", "OUTPUT_DIR": self.tmp_dir
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_profiled_backtest(self):
+        strategy = CountingStrategy()
+        session = TradingSession(
+            self.config, strategy, ["SPY"], 10000.0,
+            datetime.datetime(2010, 1, 1), datetime.datetime(2010, 3, 1),
+            make_event_bus(), title=["Profiled"], profile=True
+        )
+        session._run_session()
+        report = session.profiler.report()
+        nb_bars = report.loc[("session.process_event", "BAR"), "calls"]
+        self.assertTrue(nb_bars > 30)
+        self.assertEqual(
+            report.loc[("strategy.calculate_signals", "BAR"), "calls"], nb_bars
+        )
+        self.assertEqual(
+            report.loc[("statistics.update", "BAR"), "calls"], nb_bars
+        )
+        self.assertTrue(
+            report.loc[("price_handler.stream_next", "-"), "calls"] >= nb_bars
+        )
+        self.assertTrue((report["total_time"] >= 0.0).all())
+        self.assertTrue(session.profiler.session_time > 0.0)
+        self.assertNotIn("calculate_signals", strategy.__dict__)
+        self.assertNotIn("_process_event", session.__dict__)
+
+    def test_profiled_batch_backtest(self):
+        """
+        Test that the bars passed on to calculate_signals by the
+        default calculate_signals_batch are not timed twice, and
+        that methods set on the instance are put back.
+        """
+        events_queue = make_event_bus()
+        start_date = datetime.datetime(2010, 1, 1)
+        end_date = datetime.datetime(2010, 3, 1)
+        price_handler = YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, events_queue, ["AGG", "SPY"],
+            start_date=start_date, end_date=end_date, batch=True
+        )
+        strategy = CountingStrategy()
+        calculate_signals = strategy.calculate_signals
+        strategy.calculate_signals = calculate_signals
+        session = TradingSession(
+            self.config, strategy, ["AGG", "SPY"], 10000.0,
+            start_date, end_date, events_queue,
+            price_handler=price_handler, title=["Profiled"], profile=True
+        )
+        session._run_session()
+        report = session.profiler.report()
+        strategy_rows = report.loc["strategy.calculate_signals_batch"]
+        self.assertEqual(list(strategy_rows.index), ["BAR_BATCH"])
+        self.assertNotIn(
+            "strategy.calculate_signals",
+            report.index.get_level_values("component")
+        )
+        self.assertIs(strategy.__dict__["calculate_signals"], calculate_signals)
+
+
+class BuyOnceStrategy(AbstractStrategy):
+    def __init__(self, ticker, events_queue):
+        self.ticker = ticker
+        self.events_queue = events_queue
+        self.invested = False
+
+    def calculate_signals(self, event):
+        if event.type == EventType.BAR and event.ticker == self.ticker:
+            if not self.invested:
+                self.events_queue.put(SignalEvent(self.ticker, "BOT", 100))
+                self.invested = True
+
+
+class TestCoalescedTradingSession(unittest.TestCase):
+    """
+    Test that coalescing the portfolio and statistics updates
+    of a two-ticker daily backtest records the same equity curve,
+    holding a ticker whose bar is not the last of each date, so
+    that the portfolio must be valued before the bars of the next
+    date are stored.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config = munchify({
+            "CSV_DATA_DIR": "data/csv", "OUTPUT_DIR": self.tmp_dir
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _run_session(self, coalesce_updates):
+        events_queue = make_event_bus()
+        session = TradingSession(
+            self.config, BuyOnceStrategy("AGG", events_queue),
+            ["SPY", "AGG"], 10000.0,
+            datetime.datetime(2010, 1, 1), datetime.datetime(2010, 2, 1),
+            events_queue, title=["Coalesced"], benchmark="SPY",
+            coalesce_updates=coalesce_updates
+        )
+        session._run_session()
+        return session
+
+    def test_coalesced_updates(self):
+        session = self._run_session(False)
+        coalesced = self._run_session(True)
+        self.assertEqual(
+            len(coalesced.portfolio_handler.portfolio.positions), 1
+        )
+        self.assertTrue(session.statistics.equity.nunique() > 10)
+        self.assertTrue(
+            coalesced.statistics.equity.equals(session.statistics.equity)
+        )
+        self.assertTrue(
+            coalesced.statistics.equity_benchmark.equals(
+                session.statistics.equity_benchmark
+            )
+        )
+
+
+class BatchCountingStrategy(AbstractStrategy):
+    def __init__(self):
+        self.nb_batches = 0
+        self.nb_bars = 0
+
+    def calculate_signals(self, event):
+        raise AssertionError("Bars should be received in batches")
+
+    def calculate_signals_batch(self, event):
+        self.nb_batches += 1
+        self.nb_bars += len(event)
+
+
+class TestBarBatchTradingSession(unittest.TestCase):
+    """
+    Test that a session fed with BarBatchEvents calls the
+    batch hook of the strategies, falling back on per-bar
+    calculate_signals, and keeps the same equity curve.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config = munchify({
+            "CSV_DATA_DIR": "data/csv", "OUTPUT_DIR": self.tmp_dir
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _run_session(self, strategy_factory, batch):
+        events_queue = make_event_bus()
+        start_date = datetime.datetime(2010, 1, 1)
+        end_date = datetime.datetime(2010, 3, 1)
+        price_handler = YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, events_queue, ["AGG", "SPY"],
+            start_date=start_date, end_date=end_date, batch=batch
+        )
+        strategy = strategy_factory(events_queue)
+        session = TradingSession(
+            self.config, strategy, ["AGG", "SPY"], 10000.0,
+            start_date, end_date, events_queue,
+            price_handler=price_handler, title=["Batch"]
+        )
+        session._run_session()
+        return session, strategy
+
+    def test_batch_session(self):
+        session, _ = self._run_session(
+            lambda events_queue: BuyOnceStrategy("SPY", events_queue), False
+        )
+        batch_session, _ = self._run_session(
+            lambda events_queue: BuyOnceStrategy("SPY", events_queue), True
+        )
+        self.assertEqual(
+            len(batch_session.portfolio_handler.portfolio.positions), 1
+        )
+        self.assertTrue(
+            batch_session.statistics.equity.equals(session.statistics.equity)
+        )
+
+        _, strategy = self._run_session(
+            lambda events_queue: BatchCountingStrategy(), True
+        )
+        self.assertEqual(strategy.nb_batches, len(session.statistics.equity))
+        self.assertEqual(strategy.nb_bars, 2 * strategy.nb_batches)
+
+
+class FailingStrategy(AbstractStrategy):
+    def __init__(self, ticker, events_queue, nb_bars):
+        self.ticker = ticker
+        self.events_queue = events_queue
+        self.nb_bars = nb_bars
+
+    def calculate_signals(self, event):
+        if event.type == EventType.BAR:
+            self.nb_bars -= 1
+            if self.nb_bars == 0:
+                raise ValueError("Strategy failure")
+            self.events_queue.put(SignalEvent(self.ticker, "BOT", 100))
+
+
+class TestFailingTradingSession(unittest.TestCase):
+    """
+    Test that the compliance module and the event tape writer
+    are closed, and the trades and prices recorded so far written
+    out, when a session fails.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config = munchify({
+            "CSV_DATA_DIR": "data/csv", "OUTPUT_DIR": self.tmp_dir
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_failing_session(self):
+        for coalesce_updates in [False, True]:
+            events_queue = make_event_bus()
+            session = TradingSession(
+                self.config, FailingStrategy("SPY", events_queue, 4),
+                ["SPY"], 10000.0,
+                datetime.datetime(2010, 1, 1), datetime.datetime(2010, 3, 1),
+                events_queue, title=["Failing"],
+                coalesce_updates=coalesce_updates,
+                record_tape=os.path.join(self.tmp_dir, "tape")
+            )
+            self.assertRaises(ValueError, session._run_session)
+            self.assertTrue(session.compliance.closed)
+            self.assertTrue(session.compliance.csvfile.closed)
+            with open(os.path.join(
+                self.tmp_dir, session.compliance.csv_filename
+            )) as f:
+                self.assertEqual(len(f.read().splitlines()), 1 + 3)
+            self.assertEqual(len(session.statistics.equity), 3)
+            tape = EventTape(os.path.join(self.tmp_dir, "tape"))
+            self.assertEqual(tape.nb_prices, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()